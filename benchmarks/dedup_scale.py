@@ -0,0 +1,126 @@
+"""
+dedup_scale.py
+---------------
+Mengukur skala DuplicateIndex (core/dedup_index.py) pada jutaan struk:
+waktu membuka index, RSS process, dan latency find().
+
+Index diisi langsung lewat SQL dengan pHash acak (bukan gambar asli;
+pHash acak adalah kasus terburuk BK-tree karena tidak mengelompok).
+
+Yang diukur:
+    build_open    : buka pertama (tree dibangun dari tabel + snapshot disimpan)
+    snapshot_open : buka berikutnya (snapshot dimuat)
+    rss_mb        : kenaikan RSS setelah index terbuka
+    find_p50/p99  : find() dengan radius default (kandidat tidak lolos verifikasi)
+
+Cara pakai (dari root projek):
+    python -m benchmarks.dedup_scale -n 1000000
+    python -m benchmarks.dedup_scale -n 100000 -o dedup.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+import numpy as np
+
+from core.dedup_index import DETAIL_BYTES, DuplicateIndex, ReceiptSignature
+
+
+def _rss_mb() -> float:
+    """RSS process saat ini (Linux /proc); None jika tidak tersedia."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except OSError:
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def fill_index(path: str, n: int, seed: int = 42, chunk: int = 100000):
+    """Mengisi tabel index dengan n baris pHash acak (tanpa BK-tree)."""
+    DuplicateIndex(path).close()   # membuat skema
+
+    rng = random.Random(seed)
+    detail = bytes(DETAIL_BYTES)
+    conn = sqlite3.connect(path)
+    for start in range(0, n, chunk):
+        rows = [
+            (rng.getrandbits(64) - (1 << 63), f"struk {i}", "makanan", 0.0, detail, 0.5)
+            for i in range(start, min(n, start + chunk))
+        ]
+        conn.executemany(
+            "INSERT INTO receipt_phash (phash, text, category, created_at, detail, aspect)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        conn.commit()
+    conn.close()
+
+
+def _open(path: str):
+    gc.collect()
+    rss = _rss_mb()
+    start = time.perf_counter()
+    index = DuplicateIndex(path)
+    seconds = time.perf_counter() - start
+    gc.collect()
+    return index, seconds, (None if rss is None else _rss_mb() - rss)
+
+
+def run(n: int, queries: int = 200, seed: int = 42) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "dedup.sqlite3")
+        fill_index(path, n, seed)
+
+        index, build_seconds, _ = _open(path)
+        assert len(index) == n
+        index.close()
+        del index
+
+        index, open_seconds, rss = _open(path)
+
+        rng = random.Random(seed + 1)
+        latencies = []
+        for _ in range(queries):
+            signature = ReceiptSignature(rng.getrandbits(64), 1, 0.9)
+            start = time.perf_counter()
+            index.find(signature)
+            latencies.append(time.perf_counter() - start)
+        index.close()
+
+    return {
+        "entries": n,
+        "build_open_s": round(build_seconds, 3),
+        "snapshot_open_s": round(open_seconds, 3),
+        "rss_mb": None if rss is None else round(rss, 1),
+        "find_p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 3),
+        "find_p99_ms": round(float(np.percentile(latencies, 99)) * 1000, 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark skala DuplicateIndex.")
+    parser.add_argument("-n", "--entries", type=int, default=1000000)
+    parser.add_argument("-q", "--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("-o", "--output", default=None, help="File output JSON")
+    args = parser.parse_args()
+
+    result = run(args.entries, args.queries, args.seed)
+    for key, value in result.items():
+        print(f"{key:<16} {value}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print("→", args.output)
+
+
+if __name__ == "__main__":
+    main()
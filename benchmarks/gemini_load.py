@@ -0,0 +1,206 @@
+"""
+gemini_load.py
+---------------
+Load test AsyncGeminiClient (core/gemini_client.py) terhadap stub lokal
+(benchmarks/gemini_stub.py) dengan concurrency yang terus dinaikkan.
+
+Per level concurrency dicatat:
+    throughput (request/detik), latency p50 / p95 / p99 / max,
+    jumlah error, dan perilaku retry (jumlah percobaan, retry, 429/500
+    yang diterima stub)
+
+Beban closed-loop: `concurrency` worker masing-masing mengirim request
+berikutnya begitu yang sebelumnya selesai, jadi latency = waktu satu
+prompt (termasuk retry), bukan waktu antri. Setiap request memakai
+prompt unik dan use_cache=False (tanpa cache / coalescing).
+Dengan --stream dipakai streamGenerateContent dan dicatat juga waktu
+sampai potongan pertama (first_chunk).
+
+Cara pakai (dari root projek):
+    python -m benchmarks.gemini_load
+    python -m benchmarks.gemini_load --levels 1 8 32 --requests 400 \\
+        --latency 0.05 --error-rate 0.05 --rate-limit 200 -o load.json
+    python -m benchmarks.gemini_load --stream --levels 4 16
+    python -m benchmarks.gemini_load --url http://127.0.0.1:8765/   # stub terpisah
+
+Perubahan pada client sebaiknya disertai hasil dari harness ini
+(sebelum vs sesudah).
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import time
+
+import numpy as np
+
+from benchmarks.gemini_stub import GeminiStub, start_in_thread
+from core.gemini_client import AsyncGeminiClient
+
+
+DEFAULT_LEVELS = [1, 2, 4, 8, 16, 32, 64]
+
+
+def _percentile(values, q):
+    return round(float(np.percentile(values, q)) * 1000, 2) if values else None
+
+
+async def run_level(base_url: str, concurrency: int, requests: int,
+                    max_retries: int = 3, backoff_base: float = 0.1,
+                    stream: bool = False) -> dict:
+    """
+    Mengirim `requests` prompt lewat `concurrency` worker bersamaan.
+
+    RETURN:
+    result : dict (satu baris laporan)
+    """
+    client = AsyncGeminiClient(
+        api_key="stub",
+        cache=None,
+        api_base=base_url,
+        max_concurrency=concurrency,
+        pool_size=concurrency,
+        timeout=30,
+        max_retries=max_retries,
+        backoff_base=backoff_base
+    )
+
+    latencies = []
+    first_chunks = []
+    errors = 0
+    pending = iter(range(requests))
+
+    async def one(prompt):
+        if not stream:
+            return await client.ask(prompt, use_cache=False)
+
+        start = time.perf_counter()
+        parts = []
+        async for chunk in client.stream(prompt, use_cache=False):
+            if not parts:
+                first_chunks.append(time.perf_counter() - start)
+            parts.append(chunk)
+        return parts[-1] if parts else ""
+
+    async def worker():
+        nonlocal errors
+        for i in pending:
+            start = time.perf_counter()
+            text = await one(f"load test prompt {concurrency}-{i}")
+            latencies.append(time.perf_counter() - start)
+            if text.startswith(("ERROR", "API ERROR")):
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    await client.close()
+
+    result = {
+        "concurrency": concurrency,
+        "requests": requests,
+        "seconds": round(elapsed, 3),
+        "throughput": round(requests / elapsed, 2),
+        "p50_ms": _percentile(latencies, 50),
+        "p95_ms": _percentile(latencies, 95),
+        "p99_ms": _percentile(latencies, 99),
+        "max_ms": round(max(latencies) * 1000, 2),
+        "errors": errors,
+        "attempts": client.stats["requests"],
+        "retries": client.stats["retries"]
+    }
+    if stream:
+        result["first_chunk_p50_ms"] = _percentile(first_chunks, 50)
+        result["first_chunk_p99_ms"] = _percentile(first_chunks, 99)
+    return result
+
+
+def run_load_test(base_url: str, levels, requests: int, stub: GeminiStub = None,
+                  max_retries: int = 3, backoff_base: float = 0.1,
+                  stream: bool = False) -> list:
+    """Menjalankan run_level() untuk setiap level concurrency."""
+    results = []
+    for concurrency in levels:
+        before = dict(stub.stats) if stub is not None else None
+        result = asyncio.run(
+            run_level(base_url, concurrency, requests, max_retries, backoff_base, stream)
+        )
+
+        if stub is not None:
+            result["stub_throttled"] = stub.stats["throttled"] - before["throttled"]
+            result["stub_errors"] = stub.stats["errors"] - before["errors"]
+
+        results.append(result)
+        print(
+            f"c={concurrency:<4} {result['throughput']:>8} req/s  "
+            f"p50 {result['p50_ms']} ms  p95 {result['p95_ms']} ms  p99 {result['p99_ms']} ms  "
+            f"err {result['errors']}  retry {result['retries']}"
+            + (f"  first {result['first_chunk_p50_ms']} ms" if stream else "")
+            + (f"  429 {result['stub_throttled']}  500 {result['stub_errors']}" if stub else "")
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test client Gemini terhadap stub lokal.")
+    parser.add_argument("--url", help="Base URL stub yang sudah berjalan (default: stub in-process)")
+    parser.add_argument("--levels", type=int, nargs="+", default=DEFAULT_LEVELS,
+                        help="Level concurrency")
+    parser.add_argument("-n", "--requests", type=int, default=200, help="Request per level")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    parser.add_argument("--max-concurrency", type=int, default=None)
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--backoff-base", type=float, default=0.1)
+    parser.add_argument("--stream", action="store_true", help="Pakai streamGenerateContent")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("-o", "--output", default=None, help="File output JSON")
+    args = parser.parse_args()
+
+    stub, stop = None, None
+    base_url = args.url
+    if base_url is None:
+        stub = GeminiStub(
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            rate_limit=args.rate_limit,
+            max_concurrency=args.max_concurrency,
+            seed=args.seed
+        )
+        base_url, stop = start_in_thread(stub)
+
+    try:
+        results = run_load_test(base_url, args.levels, args.requests, stub,
+                                args.max_retries, args.backoff_base, args.stream)
+    finally:
+        if stop is not None:
+            stop()
+
+    if args.output:
+        report = {
+            "meta": {
+                "url": args.url or "in-process stub",
+                "stream": args.stream,
+                "stub": None if stub is None else {
+                    "latency": args.latency,
+                    "jitter": args.jitter,
+                    "error_rate": args.error_rate,
+                    "rate_limit": args.rate_limit,
+                    "max_concurrency": args.max_concurrency
+                },
+                "python": platform.python_version(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")
+            },
+            "levels": results
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print("→", args.output)
+
+
+if __name__ == "__main__":
+    main()
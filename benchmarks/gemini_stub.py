@@ -0,0 +1,247 @@
+"""
+gemini_stub.py
+---------------
+Server tiruan (stub) Gemini API lokal untuk pengujian dan load test
+core/gemini_client.py tanpa menyentuh API asli.
+
+Meniru bentuk request / respons:
+    POST /<model>:generateContent?key=...
+        {"contents": [{"parts": [{"text": "..."}]}]}
+        → {"candidates": [{"content": {"parts": [{"text": "..."}]}}]}
+    POST /<model>:streamGenerateContent?alt=sse&key=...
+        → Server-Sent Events "data: {...}" per potongan teks
+
+Perilaku yang bisa diatur:
+    latency / jitter   : lama "berpikir" per request (detik, acak uniform ± jitter)
+    error_rate         : peluang respons 500
+    rate_limit         : request per detik (token bucket) → 429 + Retry-After
+    max_concurrency    : request bersamaan maksimum → 429 + Retry-After
+    stream_chunks      : jumlah potongan untuk streamGenerateContent
+
+Cara pakai:
+    python -m benchmarks.gemini_stub --port 8765 --latency 0.2 --error-rate 0.05
+    GEMINI_API_BASE=http://127.0.0.1:8765/ python main.py
+
+Atau dari kode (dipakai benchmarks/gemini_load.py):
+    stub = GeminiStub(latency=0.1, rate_limit=50)
+    base_url, stop = start_in_thread(stub)
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+
+from aiohttp import web
+
+
+class GeminiStub:
+    """
+    Stub generateContent / streamGenerateContent dengan latency,
+    error, dan throttling yang bisa diatur.
+    """
+
+    def __init__(self, latency: float = 0.1, jitter: float = 0.0, error_rate: float = 0.0,
+                 rate_limit: float = None, max_concurrency: int = None,
+                 retry_after: float = 0.2, stream_chunks: int = 5, seed: int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.max_concurrency = max_concurrency
+        self.retry_after = retry_after
+        self.stream_chunks = stream_chunks
+        self.random = random.Random(seed)
+
+        # Token bucket untuk rate_limit (kapasitas = 1 detik request)
+        self._tokens = rate_limit or 0.0
+        self._last_refill = time.monotonic()
+        self.in_flight = 0
+
+        self.stats = {"requests": 0, "ok": 0, "errors": 0, "throttled": 0}
+
+    # ------------------------------------------------------------------
+    # THROTTLING
+    # ------------------------------------------------------------------
+    def _take_token(self) -> bool:
+        if self.rate_limit is None:
+            return True
+
+        now = time.monotonic()
+        self._tokens = min(
+            self.rate_limit,
+            self._tokens + (now - self._last_refill) * self.rate_limit
+        )
+        self._last_refill = now
+
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _throttled(self) -> bool:
+        if self.max_concurrency is not None and self.in_flight >= self.max_concurrency:
+            return True
+        return not self._take_token()
+
+    def _delay(self) -> float:
+        return max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+    # ------------------------------------------------------------------
+    # RESPON
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _error(status: int, name: str, message: str, headers=None):
+        return web.json_response(
+            {"error": {"code": status, "message": message, "status": name}},
+            status=status,
+            headers=headers
+        )
+
+    @staticmethod
+    def _candidate(text: str) -> dict:
+        return {
+            "candidates": [{
+                "content": {"parts": [{"text": text}], "role": "model"},
+                "finishReason": "STOP"
+            }]
+        }
+
+    async def handle(self, request):
+        target = request.match_info["target"]
+        model, _, method = target.partition(":")
+        if method not in ("generateContent", "streamGenerateContent"):
+            return self._error(404, "NOT_FOUND", f"Unknown method: {target}")
+
+        self.stats["requests"] += 1
+
+        if self._throttled():
+            self.stats["throttled"] += 1
+            return self._error(
+                429, "RESOURCE_EXHAUSTED", "Stub rate limit",
+                headers={"Retry-After": str(self.retry_after)}
+            )
+
+        try:
+            body = await request.json()
+            prompt = body["contents"][0]["parts"][0]["text"]
+        except (ValueError, KeyError, IndexError, TypeError):
+            self.stats["errors"] += 1
+            return self._error(400, "INVALID_ARGUMENT", "Invalid request body")
+
+        self.in_flight += 1
+        try:
+            if self.random.random() < self.error_rate:
+                await asyncio.sleep(self._delay())
+                self.stats["errors"] += 1
+                return self._error(500, "INTERNAL", "Stub internal error")
+
+            answer = f"[{model}] jawaban stub untuk: {prompt[:80]}"
+
+            if method == "generateContent":
+                await asyncio.sleep(self._delay())
+                self.stats["ok"] += 1
+                return web.json_response(self._candidate(answer))
+
+            return await self._stream(request, answer)
+        finally:
+            self.in_flight -= 1
+
+    async def _stream(self, request, answer: str):
+        """Jawaban dipecah menjadi stream_chunks event SSE, latency dibagi rata."""
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+
+        words = answer.split(" ")
+        count = max(1, min(self.stream_chunks, len(words)))
+        size = -(-len(words) // count)
+        starts = range(0, len(words), size)
+        delay = self._delay() / len(starts)
+
+        for i in starts:
+            await asyncio.sleep(delay)
+            text = " ".join(words[i:i + size]) + (" " if i + size < len(words) else "")
+            event = json.dumps(self._candidate(text))
+            await response.write(f"data: {event}\r\n\r\n".encode("utf-8"))
+
+        await response.write_eof()
+        self.stats["ok"] += 1
+        return response
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.add_routes([
+            web.post("/{target}", self.handle),
+            web.post("/v1beta/models/{target}", self.handle),
+        ])
+        return app
+
+
+def start_in_thread(stub: GeminiStub, host: str = "127.0.0.1", port: int = 0):
+    """
+    Menjalankan stub di thread daemon dengan event loop sendiri.
+
+    RETURN:
+    (base_url, stop) : base_url untuk api_base client, stop() untuk mematikan
+    """
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    state = {}
+
+    async def start():
+        runner = web.AppRunner(stub.make_app(), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        state["runner"] = runner
+        state["port"] = runner.addresses[0][1]
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(start())
+        ready.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, name="gemini-stub", daemon=True)
+    thread.start()
+    ready.wait()
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(state["runner"].cleanup(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+    return f"http://{host}:{state['port']}/", stop
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub Gemini API lokal.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("-p", "--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.1, help="Latency per request (detik)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Variasi latency ± (detik)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Peluang respons 500 (0–1)")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Request per detik sebelum 429")
+    parser.add_argument("--max-concurrency", type=int, default=None,
+                        help="Request bersamaan maksimum sebelum 429")
+    parser.add_argument("--retry-after", type=float, default=0.2, help="Header Retry-After untuk 429")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    stub = GeminiStub(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        max_concurrency=args.max_concurrency,
+        retry_after=args.retry_after,
+        seed=args.seed
+    )
+    print(f"Stub Gemini di http://{args.host}:{args.port}/ (GEMINI_API_BASE)")
+    web.run_app(stub.make_app(), host=args.host, port=args.port, access_log=None, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+receipt_bench.py
+-----------------
+Benchmark sintetis untuk throughput OCR dan klasifikasi.
+
+Tujuan:
+    Mengetahui apakah perubahan di preprocess_image, clean_text, atau
+    classify_text membuat sistem lebih cepat/lambat dan lebih/kurang akurat.
+
+Alur:
+1. Membuat gambar struk sintetis secara deterministik (seed tetap) dengan
+   PIL: kata-kata dari category_keywords, harga, noise, dan rotasi kecil.
+   Ground truth (teks & kategori) diketahui.
+2. Mengukur tiap stage per gambar:
+       preprocess → ocr → clean → classify → explain (backward reasoning)
+   lalu menghitung images/sec, p50, dan p99 latency.
+3. Mengukur akurasi: kemiripan token OCR vs ground truth, dan akurasi
+   kategori (dari teks OCR dan dari teks ground truth).
+4. Menulis hasil ke file JSON untuk dibandingkan antar versi.
+
+Cara pakai (dari root projek):
+    python -m benchmarks.receipt_bench -n 200 -o bench.json
+    python -m benchmarks.receipt_bench -n 200 -o new.json --compare bench.json
+
+Jika Tesseract tidak terpasang, stage ocr dilewati dan stage teks
+memakai teks ground truth.
+"""
+
+import argparse
+import difflib
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+from core.backward_chain import backward_reasoning
+from core.ocr_processor import image_to_text, preprocess_image
+from core.search_classifier import category_keywords, classify_text
+from core.text_cleaner import clean_text
+
+
+STAGES = ["preprocess", "ocr", "clean", "classify", "explain"]
+
+
+# ======================================================================
+# 1. GENERATOR STRUK SINTETIS
+# ======================================================================
+def _load_font(size):
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow lama: font bitmap tanpa ukuran
+        return ImageFont.load_default()
+
+
+def make_receipt(rng: random.Random):
+    """
+    Membuat satu struk sintetis.
+
+    RETURN:
+    (lines, category) : baris teks struk dan kategori ground truth
+    """
+    categories = list(category_keywords)
+    category = rng.choice(categories)
+    keywords = category_keywords[category]
+
+    # Mayoritas item dari kategori utama, sedikit pengecoh dari kategori lain
+    n_main = rng.randint(3, 6)
+    items = [rng.choice(keywords) for _ in range(n_main)]
+    for _ in range(rng.randint(0, n_main - 2)):
+        other = rng.choice([c for c in categories if c != category])
+        items.append(rng.choice(category_keywords[other]))
+    rng.shuffle(items)
+
+    lines = ["TOKO MAJU JAYA", f"NO {rng.randint(1000, 9999)}", ""]
+    total = 0
+    for item in items:
+        qty = rng.randint(1, 3)
+        price = rng.randint(2, 90) * 1000
+        total += qty * price
+        lines.append(f"{item.upper()} {qty}x {price}")
+    lines += ["", f"TOTAL {total}", "TERIMA KASIH"]
+
+    return lines, category
+
+
+def render_receipt(lines, rng: random.Random, font, noise=8.0, max_rotation=2.0):
+    """
+    Merender baris teks menjadi gambar grayscale + noise + rotasi.
+    """
+    line_height = int(font.size * 1.5) if hasattr(font, "size") else 16
+    width = 640
+    height = line_height * (len(lines) + 2)
+
+    img = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(img)
+    for i, line in enumerate(lines):
+        draw.text((30, line_height * (i + 1)), line, fill=0, font=font)
+
+    img = img.rotate(rng.uniform(-max_rotation, max_rotation), fillcolor=255, expand=True)
+    img = img.filter(ImageFilter.GaussianBlur(radius=rng.uniform(0.0, 0.8)))
+
+    arr = np.asarray(img, dtype=np.float32)
+    noise_rng = np.random.default_rng(rng.randint(0, 2 ** 31))
+    arr = arr + noise_rng.normal(0, noise, arr.shape)
+    return Image.fromarray(np.clip(arr, 0, 255).astype(np.uint8))
+
+
+def generate_dataset(out_dir, count, seed=42, font_size=28):
+    """
+    Membuat `count` gambar struk di out_dir.
+
+    RETURN:
+    samples : list of dict {"path", "text", "category"}
+    """
+    rng = random.Random(seed)
+    font = _load_font(font_size)
+
+    samples = []
+    for i in range(count):
+        lines, category = make_receipt(rng)
+        path = os.path.join(out_dir, f"receipt_{i:05d}.png")
+        render_receipt(lines, rng, font).save(path)
+        samples.append({"path": path, "text": "\n".join(lines), "category": category})
+
+    return samples
+
+
+# ======================================================================
+# 2. PENGUKURAN
+# ======================================================================
+def _summary(latencies):
+    if not latencies:
+        return {"count": 0, "per_sec": 0.0, "p50_ms": None, "p99_ms": None}
+
+    arr = np.asarray(latencies)
+    return {
+        "count": len(latencies),
+        "per_sec": round(len(latencies) / arr.sum(), 2) if arr.sum() > 0 else None,
+        "p50_ms": round(float(np.percentile(arr, 50)) * 1000, 3),
+        "p99_ms": round(float(np.percentile(arr, 99)) * 1000, 3)
+    }
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def run_benchmark(samples) -> dict:
+    """
+    Menjalankan semua stage untuk setiap sampel.
+
+    RETURN:
+    result : dict {"stages", "accuracy", "ocr_available"}
+    """
+    latencies = {stage: [] for stage in STAGES}
+    ocr_available = True
+    ocr_similarity = []
+    correct_ocr = 0
+    correct_truth = 0
+
+    for sample in samples:
+        processed, seconds = _timed(preprocess_image, sample["path"])
+        latencies["preprocess"].append(seconds)
+
+        text = sample["text"]
+        if ocr_available:
+            try:
+                text, seconds = _timed(image_to_text, processed)
+                latencies["ocr"].append(seconds)
+            except Exception:
+                # Tesseract tidak tersedia → pakai teks ground truth
+                ocr_available = False
+                text = sample["text"]
+
+        truth_tokens = clean_text(sample["text"])
+        tokens, seconds = _timed(clean_text, text)
+        latencies["clean"].append(seconds)
+
+        (category, _), seconds = _timed(classify_text, text)
+        latencies["classify"].append(seconds)
+
+        # explain = backward reasoning untuk kategori hasil klasifikasi
+        _, seconds = _timed(backward_reasoning, text, category)
+        latencies["explain"].append(seconds)
+
+        if ocr_available:
+            ocr_similarity.append(difflib.SequenceMatcher(None, truth_tokens, tokens).ratio())
+            correct_ocr += category == sample["category"]
+
+        correct_truth += classify_text(sample["text"])[0] == sample["category"]
+
+    n = len(samples)
+    return {
+        "ocr_available": ocr_available,
+        "stages": {stage: _summary(values) for stage, values in latencies.items()},
+        "accuracy": {
+            "ocr_token_similarity": (
+                round(float(np.mean(ocr_similarity)), 4) if ocr_similarity else None
+            ),
+            "category_from_ocr": round(correct_ocr / n, 4) if ocr_available and n else None,
+            "category_from_truth": round(correct_truth / n, 4) if n else None
+        }
+    }
+
+
+def compare(baseline: dict, current: dict, tolerance: float = 0.10) -> list:
+    """
+    Membandingkan hasil benchmark dengan baseline.
+
+    RETURN:
+    regressions : list of string
+        Stage yang p50-nya lebih lambat > tolerance, atau akurasi yang turun.
+    """
+    regressions = []
+    for stage, now in current["stages"].items():
+        before = baseline.get("stages", {}).get(stage)
+        if not before or before.get("p50_ms") is None or now.get("p50_ms") is None:
+            continue
+        if now["p50_ms"] > before["p50_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{stage}: p50 {before['p50_ms']} ms → {now['p50_ms']} ms"
+            )
+
+    for metric, now in current["accuracy"].items():
+        before = baseline.get("accuracy", {}).get(metric)
+        if before is not None and now is not None and now < before:
+            regressions.append(f"{metric}: {before} → {now}")
+
+    return regressions
+
+
+# ======================================================================
+# 3. COMMAND LINE
+# ======================================================================
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OCR & klasifikasi struk sintetis.")
+    parser.add_argument("-n", "--count", type=int, default=100, help="Jumlah struk sintetis")
+    parser.add_argument("-s", "--seed", type=int, default=42, help="Seed generator")
+    parser.add_argument("-o", "--output", default="benchmark_results.json", help="File output JSON")
+    parser.add_argument("--compare", help="File JSON baseline untuk deteksi regresi")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Toleransi perlambatan p50 (default 0.10 = 10%%)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="receipt_bench_") as out_dir:
+        samples = generate_dataset(out_dir, args.count, args.seed)
+        result = run_benchmark(samples)
+
+    result["meta"] = {
+        "count": args.count,
+        "seed": args.seed,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")
+    }
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+
+    for stage, summary in result["stages"].items():
+        print(f"{stage:<11} {summary['count']:>6}  {summary['per_sec'] or 0:>10} /s  "
+              f"p50 {summary['p50_ms']} ms  p99 {summary['p99_ms']} ms")
+    print("accuracy:", result["accuracy"])
+    print("→", args.output)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(json.load(f), result, args.tolerance)
+        if regressions:
+            print("REGRESI:")
+            for line in regressions:
+                print("  -", line)
+            sys.exit(1)
+        print("Tidak ada regresi.")
+
+
+if __name__ == "__main__":
+    main()
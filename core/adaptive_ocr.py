@@ -0,0 +1,199 @@
+"""
+adaptive_ocr.py
+----------------
+Mode OCR adaptif berbasis confidence dengan early exit.
+
+preprocess_image() selalu memakai Otsu threshold + blur 3x3 yang sama.
+Untuk struk yang bersih itu berlebihan, untuk foto miring / gelap / kotor
+hasilnya buruk tanpa fallback. Mode adaptif:
+
+1. Jalankan tier paling murah dulu
+2. Baca confidence per kata dari Tesseract
+3. Jika confidence rata-rata >= min_confidence → selesai (early exit)
+4. Jika tidak → naik ke tier berikutnya yang lebih berat
+5. Jika semua tier di bawah ambang → pakai hasil dengan confidence tertinggi
+
+Tier:
+    fast      : Otsu threshold saja
+    standard  : Otsu + Gaussian blur (sama dengan preprocess_image)
+    adaptive  : median blur + adaptive threshold (pencahayaan tidak rata)
+    heavy     : deskew + denoise (Non-Local Means) + adaptive threshold
+
+Statistik seberapa sering tiap tier dibutuhkan dicatat dan bisa dibaca
+lewat adaptive_stats().
+"""
+
+import threading
+
+import cv2
+import numpy as np
+
+from core.ocr_processor import (
+    DEFAULT_TESSERACT_CONFIG,
+    image_to_text_with_confidence,
+    load_grayscale,
+)
+
+
+# Ambang confidence (0–100) untuk berhenti di tier saat ini
+DEFAULT_MIN_CONFIDENCE = 70
+
+
+# ======================================================================
+# 1. TIER PREPROCESSING (dari termurah ke termahal)
+# ======================================================================
+def _tier_fast(gray):
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return binary
+
+
+def _tier_standard(gray):
+    return cv2.GaussianBlur(_tier_fast(gray), (3, 3), 0)
+
+
+def _tier_adaptive(gray):
+    smooth = cv2.medianBlur(gray, 3)
+    return cv2.adaptiveThreshold(
+        smooth, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 10
+    )
+
+
+def estimate_skew(gray, max_angle=15.0) -> float:
+    """
+    Memperkirakan kemiringan teks (derajat) dari kotak minimum yang
+    melingkupi semua pixel tinta. 0 jika tidak terdeteksi / terlalu besar.
+    """
+    _, ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    ys, xs = np.nonzero(ink)
+    if len(xs) < 50:
+        return 0.0
+
+    points = np.column_stack((xs, ys)).astype(np.float32)
+    angle = cv2.minAreaRect(points)[-1]
+
+    # Normalisasi ke rentang (-45, 45]
+    if angle > 45:
+        angle -= 90
+    elif angle <= -45:
+        angle += 90
+
+    return angle if abs(angle) <= max_angle else 0.0
+
+
+def deskew(gray):
+    """Memutar gambar agar baris teks horizontal."""
+    angle = estimate_skew(gray)
+    if abs(angle) < 0.3:
+        return gray
+
+    height, width = gray.shape[:2]
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    return cv2.warpAffine(
+        gray, matrix, (width, height),
+        flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE
+    )
+
+
+def _tier_heavy(gray):
+    denoised = cv2.fastNlMeansDenoising(deskew(gray), None, 10, 7, 21)
+    return _tier_adaptive(denoised)
+
+
+TIERS = [
+    ("fast", _tier_fast),
+    ("standard", _tier_standard),
+    ("adaptive", _tier_adaptive),
+    ("heavy", _tier_heavy),
+]
+
+
+# ======================================================================
+# 2. STATISTIK TIER
+# ======================================================================
+_stats_lock = threading.Lock()
+_stats = {
+    "calls": 0,
+    "resolved_by": {name: 0 for name, _ in TIERS},   # tier yang mencapai ambang
+    "attempted": {name: 0 for name, _ in TIERS},     # tier yang dijalankan
+    "below_threshold": 0,                            # tidak ada tier yang lolos
+}
+
+
+def adaptive_stats() -> dict:
+    """
+    Statistik mode adaptif: berapa kali tiap tier dijalankan, berapa kali
+    tiap tier menjadi tier terakhir yang dibutuhkan, dan rasio per panggilan.
+    """
+    with _stats_lock:
+        calls = _stats["calls"]
+        return {
+            "calls": calls,
+            "attempted": dict(_stats["attempted"]),
+            "resolved_by": dict(_stats["resolved_by"]),
+            "below_threshold": _stats["below_threshold"],
+            "resolved_ratio": {
+                name: (count / calls if calls else 0.0)
+                for name, count in _stats["resolved_by"].items()
+            }
+        }
+
+
+def reset_adaptive_stats():
+    with _stats_lock:
+        _stats["calls"] = 0
+        _stats["below_threshold"] = 0
+        for name, _ in TIERS:
+            _stats["attempted"][name] = 0
+            _stats["resolved_by"][name] = 0
+
+
+# ======================================================================
+# 3. OCR ADAPTIF
+# ======================================================================
+def run_ocr_adaptive(path, min_confidence=DEFAULT_MIN_CONFIDENCE,
+                     config=DEFAULT_TESSERACT_CONFIG, target_text_height=None) -> dict:
+    """
+    Menjalankan OCR dengan eskalasi preprocessing berbasis confidence.
+
+    PARAMETER:
+    path : string
+        Path gambar struk
+    min_confidence : float
+        Ambang confidence rata-rata (0–100) untuk early exit
+    config : string
+        Config tambahan Tesseract
+    target_text_height : int atau None
+        Lihat load_grayscale()
+
+    RETURN:
+    result : dict
+        {"text", "confidence", "tier", "tiers_tried"}
+    """
+
+    # Decode sekali, dipakai ulang oleh semua tier
+    gray = load_grayscale(path, target_text_height)
+
+    best = None
+    tried = []
+    for name, tier in TIERS:
+        text, confidence = image_to_text_with_confidence(tier(gray), config)
+        tried.append(name)
+
+        with _stats_lock:
+            _stats["attempted"][name] += 1
+
+        if best is None or confidence > best["confidence"]:
+            best = {"text": text, "confidence": confidence, "tier": name}
+
+        if confidence >= min_confidence:
+            break
+
+    with _stats_lock:
+        _stats["calls"] += 1
+        if best["confidence"] >= min_confidence:
+            _stats["resolved_by"][tried[-1]] += 1
+        else:
+            _stats["below_threshold"] += 1
+
+    best["tiers_tried"] = tried
+    return best
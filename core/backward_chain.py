@@ -16,14 +16,20 @@ Alur:
 Ini memberikan penjelasan logis untuk ditampilkan di GUI.
 """
 
+from core import metrics
+from core.search_classifier import category_keywords, score_tokens
 from core.text_cleaner import clean_text
-from core.search_classifier import category_keywords
 
 
+@metrics.timed("backward_reasoning")
 def backward_reasoning(text: str, selected_category: str) -> list:
     """
     Melacak token pendukung kategori tertentu.
 
+    Jika klasifikasi dan reasoning dibutuhkan sekaligus, pakai
+    classify_and_explain() → token pendukung sudah ada di
+    result.matched_tokens tanpa tokenisasi ulang.
+
     PARAMETER:
     text : string
         Teks input dari OCR / manual
@@ -39,16 +45,11 @@ def backward_reasoning(text: str, selected_category: str) -> list:
     if selected_category not in category_keywords:
         return []
 
-    # Cleaning + tokenisasi teks
-    tokens = clean_text(text)
-
-    # Daftar kata kunci kategori terpilih
-    keywords = category_keywords[selected_category]
-
-    # Cek token mana yang cocok dengan kata kunci
-    matches = [t for t in tokens if t in keywords]
+    # Cleaning + tokenisasi + pencocokan keyword dalam satu kali lewat
+    # (score_tokens: tidak ikut terhitung sebagai klasifikasi di metrics)
+    result = score_tokens(clean_text(text))
 
-    return matches
+    return result.matched_tokens[selected_category]
 
 
 # Debugging optional untuk laporan
@@ -60,12 +61,10 @@ def debug_backward(text: str, category: str):
     Tidak digunakan di GUI, tapi bagus jika ingin menjelaskan alur reasoning
     secara detail di proposal atau laporan akhir.
     """
-    tokens = clean_text(text)
-    keywords = category_keywords.get(category, [])
-    matches = backward_reasoning(text, category)
+    result = score_tokens(clean_text(text))
 
     return {
-        "tokens": tokens,
-        "category_keywords": keywords,
-        "matched_tokens": matches
+        "tokens": result.tokens,
+        "category_keywords": category_keywords.get(category, []),
+        "matched_tokens": result.matched_tokens.get(category, [])
     }
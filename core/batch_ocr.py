@@ -0,0 +1,209 @@
+"""
+batch_ocr.py
+-------------
+Modul ini menjalankan OCR secara massal (batch) untuk banyak struk sekaligus,
+tanpa GUI.
+
+Fitur:
+1. Input berupa folder gambar ATAU file manifest (1 path per baris)
+2. preprocess_image + pytesseract dijalankan paralel di process pool
+   (jumlah worker default = jumlah core CPU), lewat cache OCR
+3. Hasil ditulis langsung ke file JSON Lines begitu tiap gambar selesai
+4. Error dicatat per file → satu gambar rusak tidak menghentikan proses
+
+Format output (1 baris JSON per gambar):
+    {"path": "...", "text": "...", "error": null, "seconds": 0.42}
+
+Dipakai oleh run_batch.py (command-line) di root projek.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from core.ocr_processor import ocr_image
+
+
+# Ekstensi gambar yang diproses saat input berupa folder
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+# ======================================================================
+# 1. KUMPULKAN DAFTAR GAMBAR
+# ======================================================================
+def collect_image_paths(source: str, recursive: bool = False) -> list:
+    """
+    Mengumpulkan path gambar dari folder atau file manifest.
+
+    PARAMETER:
+    source : string
+        Folder berisi gambar struk, atau file teks (manifest) berisi
+        satu path gambar per baris. Baris kosong dan baris diawali '#'
+        diabaikan. Path relatif di manifest dihitung dari folder manifest.
+    recursive : bool
+        Jika True dan source adalah folder, sub-folder ikut dipindai.
+
+    RETURN:
+    paths : list
+        List path gambar (urut nama)
+    """
+
+    if os.path.isdir(source):
+        paths = []
+        if recursive:
+            for root, _, files in os.walk(source):
+                for name in files:
+                    if name.lower().endswith(IMAGE_EXTENSIONS):
+                        paths.append(os.path.join(root, name))
+        else:
+            for name in os.listdir(source):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    paths.append(os.path.join(source, name))
+        return sorted(paths)
+
+    if os.path.isfile(source):
+        base_dir = os.path.dirname(os.path.abspath(source))
+        paths = []
+        with open(source, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if not os.path.isabs(line):
+                    line = os.path.join(base_dir, line)
+                paths.append(line)
+        return paths
+
+    raise FileNotFoundError(f"Folder/manifest tidak ditemukan: {source}")
+
+
+# ======================================================================
+# 2. WORKER (dijalankan di process terpisah)
+# ======================================================================
+def init_worker():
+    """
+    Dipanggil sekali per process worker.
+    OpenCV dibatasi 1 thread agar tidak berebut core dengan worker lain.
+    """
+    import cv2
+    cv2.setNumThreads(1)
+
+
+def ocr_one(path: str) -> dict:
+    """
+    OCR satu gambar. Semua exception ditangkap dan dikembalikan
+    sebagai field "error" supaya batch tetap berjalan.
+    """
+    start = time.perf_counter()
+    try:
+        text = ocr_image(path)
+        error = None
+    except Exception as e:
+        text = ""
+        error = f"{type(e).__name__}: {e}"
+
+    return {
+        "path": path,
+        "text": text,
+        "error": error,
+        "seconds": round(time.perf_counter() - start, 4)
+    }
+
+
+# ======================================================================
+# 3. BATCH OCR PARALEL
+# ======================================================================
+def iter_batch_ocr(paths, workers: int = None):
+    """
+    Generator yang menjalankan OCR paralel dan meng-yield hasil
+    segera setelah tiap gambar selesai (urutan = urutan selesai).
+
+    Jumlah task yang "in-flight" dibatasi (4x jumlah worker) supaya
+    memori tetap kecil walaupun ada ribuan gambar.
+
+    PARAMETER:
+    paths : iterable
+        Daftar path gambar
+    workers : int
+        Jumlah process worker. Default: jumlah core CPU.
+
+    YIELD:
+    result : dict
+        {"path", "text", "error", "seconds"}
+    """
+
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 4
+    path_iter = iter(paths)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        pending = set()
+
+        # Isi antrian awal
+        for path in path_iter:
+            pending.add(executor.submit(ocr_one, path))
+            if len(pending) >= max_in_flight:
+                break
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                yield future.result()
+
+            # Tambah task baru sebanyak yang selesai
+            for path in path_iter:
+                pending.add(executor.submit(ocr_one, path))
+                if len(pending) >= max_in_flight:
+                    break
+
+
+def run_batch_ocr(source: str, output_path: str, workers: int = None,
+                  recursive: bool = False, on_result=None) -> dict:
+    """
+    Menjalankan batch OCR dan menulis hasilnya ke file JSON Lines.
+
+    PARAMETER:
+    source : string
+        Folder gambar atau file manifest
+    output_path : string
+        File output .jsonl (ditulis bertahap, flush per baris)
+    workers : int
+        Jumlah process worker. Default: jumlah core CPU.
+    recursive : bool
+        Pindai sub-folder jika source adalah folder
+    on_result : callable (opsional)
+        Dipanggil dengan dict hasil setiap kali satu gambar selesai
+        (misalnya untuk progress di terminal)
+
+    RETURN:
+    summary : dict
+        {"total", "ok", "failed", "seconds"}
+    """
+
+    paths = collect_image_paths(source, recursive=recursive)
+
+    start = time.perf_counter()
+    ok = 0
+    failed = 0
+
+    with open(output_path, "w", encoding="utf-8") as out:
+        for result in iter_batch_ocr(paths, workers=workers):
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+
+            if result["error"] is None:
+                ok += 1
+            else:
+                failed += 1
+
+            if on_result is not None:
+                on_result(result)
+
+    return {
+        "total": len(paths),
+        "ok": ok,
+        "failed": failed,
+        "seconds": round(time.perf_counter() - start, 3)
+    }
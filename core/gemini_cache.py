@@ -0,0 +1,187 @@
+"""
+gemini_cache.py
+----------------
+Cache jawaban Gemini di disk (SQLite) supaya pertanyaan yang sama /
+hampir sama di TabInsight tidak perlu round trip ke API lagi.
+
+Konsep:
+- Key = SHA-256 dari (nama model + prompt yang dinormalisasi).
+  Normalisasi: lowercase, spasi berlebih dirapikan, tanda baca di akhir
+  dibuang → "Berapa total makanan?" == "berapa  total makanan".
+- TTL: jawaban kedaluwarsa setelah ttl detik.
+- Jumlah entry dibatasi (max_entries), yang paling lama tidak dipakai
+  dibuang lebih dulu (LRU).
+- Statistik: hit, miss, hit rate, dan total latency yang dihemat
+  (latency asli request disimpan bersama jawaban).
+
+Lokasi default file cache:
+    ~/.receiptsorter/gemini_cache.sqlite3
+Bisa diganti dengan environment variable RECEIPT_GEMINI_CACHE.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    "RECEIPT_GEMINI_CACHE",
+    os.path.join(os.path.expanduser("~"), ".receiptsorter", "gemini_cache.sqlite3")
+)
+
+DEFAULT_TTL = 24 * 60 * 60      # 1 hari
+DEFAULT_MAX_ENTRIES = 5000
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Menormalisasi prompt agar pertanyaan yang hampir sama
+    menghasilkan key yang sama.
+    """
+    return " ".join(prompt.lower().split()).rstrip("?!. ")
+
+
+class GeminiResponseCache:
+    """
+    Cache jawaban Gemini berbasis SQLite dengan TTL dan eviction LRU.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = DEFAULT_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS gemini_cache ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT NOT NULL,"
+            " prompt TEXT NOT NULL,"
+            " response TEXT NOT NULL,"
+            " latency REAL NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_gemini_cache_access ON gemini_cache(last_access)"
+        )
+        self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # KEY
+    # ------------------------------------------------------------------
+    @staticmethod
+    def make_key(prompt: str, model: str) -> str:
+        """
+        Key cache dari nama model + prompt yang dinormalisasi.
+        """
+        raw = model + "\n" + normalize_prompt(prompt)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # ------------------------------------------------------------------
+    # GET / PUT
+    # ------------------------------------------------------------------
+    def get(self, key: str):
+        """
+        Mengambil jawaban dari cache.
+
+        RETURN:
+        response : string, atau None jika tidak ada / sudah kedaluwarsa
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, latency, created_at FROM gemini_cache WHERE key = ?",
+                (key,)
+            ).fetchone()
+
+            if row is None or (self.ttl is not None and now - row[2] > self.ttl):
+                if row is not None:
+                    self._conn.execute("DELETE FROM gemini_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.saved_seconds += row[1]
+            self._conn.execute(
+                "UPDATE gemini_cache SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, prompt: str, model: str, response: str, latency: float):
+        """
+        Menyimpan jawaban beserta latency request aslinya.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO gemini_cache"
+                " (key, model, prompt, response, latency, created_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, prompt, response, latency, now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        """
+        Membuang entry kedaluwarsa, lalu entry LRU jika melebihi max_entries.
+        """
+        if self.ttl is not None:
+            self._conn.execute(
+                "DELETE FROM gemini_cache WHERE created_at < ?", (now - self.ttl,)
+            )
+
+        count = self._conn.execute("SELECT COUNT(*) FROM gemini_cache").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM gemini_cache WHERE key IN ("
+                " SELECT key FROM gemini_cache ORDER BY last_access ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    # ------------------------------------------------------------------
+    # UTILITAS
+    # ------------------------------------------------------------------
+    def stats(self) -> dict:
+        """
+        Statistik cache: hit, miss, hit rate, latency yang dihemat, jumlah entry.
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM gemini_cache").fetchone()[0]
+
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_seconds": round(self.saved_seconds, 3),
+            "entries": entries,
+            "max_entries": self.max_entries
+        }
+
+    def clear(self):
+        """Menghapus semua isi cache dan reset statistik."""
+        with self._lock:
+            self._conn.execute("DELETE FROM gemini_cache")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+            self.saved_seconds = 0.0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,250 @@
+"""
+gemini_classifier.py
+---------------------
+Fallback klasifikasi via Gemini untuk struk yang ambigu, dengan banyak
+struk dikemas dalam SATU request.
+
+Struk dianggap ambigu jika classify_text() menghasilkan "unknown"
+(tidak ada kata kunci yang cocok) atau skor tertinggi seri antar kategori.
+
+Konsep:
+1. Struk ambigu dipadatkan (token hasil clean_text, dipotong per struk)
+   lalu dikemas ke beberapa prompt, masing-masing di bawah batas ukuran
+   (max_chars) → jumlah request = total ukuran / budget, bukan jumlah struk
+2. Gemini diminta menjawab JSON array:
+       [{"id": "0", "category": "makanan"}, ...]
+3. Jawaban di-parse dengan toleran (code fence ```json, teks tambahan,
+   objek {"results": [...]}); id / kategori yang tidak valid dianggap gagal
+4. Hanya struk yang gagal yang dikirim ulang (maksimal max_rounds putaran)
+5. Semua prompt dalam satu putaran dikirim paralel lewat ask_many()
+"""
+
+import json
+import re
+
+from core.search_classifier import category_keywords, classify_and_explain
+from core.text_cleaner import clean_text
+
+
+# Batas ukuran satu prompt (karakter, ±4 karakter per token)
+DEFAULT_BATCH_CHARS = 12000
+
+# Batas ukuran satu struk di dalam prompt (karakter)
+MAX_RECEIPT_CHARS = 1200
+
+DEFAULT_MAX_ROUNDS = 3
+
+PROMPT_HEADER = (
+    "Klasifikasikan setiap struk belanja berikut ke SATU kategori dari daftar: {categories}.\n"
+    "Jawab HANYA dengan JSON array, satu objek per struk, tanpa teks lain:\n"
+    '[{{"id": "<id struk>", "category": "<kategori>"}}]\n'
+    'Jika tidak ada kategori yang cocok, gunakan "unknown".\n\n'
+)
+
+
+# ======================================================================
+# 1. DETEKSI STRUK AMBIGU
+# ======================================================================
+def is_ambiguous(score_table: dict, best_category: str) -> bool:
+    """True jika kategori "unknown" atau skor tertinggi seri."""
+    if best_category == "unknown":
+        return True
+
+    best = score_table[best_category]
+    if best == 0:
+        return True
+
+    return sum(1 for score in score_table.values() if score == best) > 1
+
+
+# ======================================================================
+# 2. PENGEMASAN BATCH
+# ======================================================================
+def _compact(text: str) -> str:
+    """Teks struk → token bersih dipisah spasi, dipotong MAX_RECEIPT_CHARS."""
+    return " ".join(clean_text(text))[:MAX_RECEIPT_CHARS]
+
+
+def _header() -> str:
+    return PROMPT_HEADER.format(categories=", ".join(category_keywords))
+
+
+def pack_batches(items, max_chars: int = DEFAULT_BATCH_CHARS) -> list:
+    """
+    Mengemas struk ke prompt-prompt di bawah max_chars.
+
+    PARAMETER:
+    items : list of (id, teks_ringkas)
+
+    RETURN:
+    batches : list of (prompt, list id)
+    """
+    header = _header()
+    batches = []
+    body, ids, size = [], [], len(header)
+
+    for item_id, text in items:
+        block = f"### id={item_id}\n{text}\n"
+        if ids and size + len(block) > max_chars:
+            batches.append((header + "\n".join(body), ids))
+            body, ids, size = [], [], len(header)
+        body.append(block)
+        ids.append(item_id)
+        size += len(block) + 1
+
+    if ids:
+        batches.append((header + "\n".join(body), ids))
+
+    return batches
+
+
+# ======================================================================
+# 3. PARSING JAWABAN
+# ======================================================================
+_FENCE_PATTERN = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+
+def _extract_json(response: str):
+    """Mengambil nilai JSON dari jawaban (boleh dibungkus code fence / teks lain)."""
+    fenced = _FENCE_PATTERN.search(response)
+    if fenced:
+        response = fenced.group(1)
+
+    try:
+        return json.loads(response)
+    except ValueError:
+        pass
+
+    # Ambil dari '[' pertama sampai ']' terakhir (atau '{' ... '}')
+    for open_char, close_char in (("[", "]"), ("{", "}")):
+        start, end = response.find(open_char), response.rfind(close_char)
+        if 0 <= start < end:
+            try:
+                return json.loads(response[start:end + 1])
+            except ValueError:
+                continue
+
+    return None
+
+
+def _normalize_category(value):
+    if not isinstance(value, str):
+        return None
+    value = " ".join(value.lower().split())
+    if value in category_keywords or value == "unknown":
+        return value
+    return None
+
+
+def parse_batch_response(response: str, ids) -> dict:
+    """
+    Mem-parse jawaban Gemini untuk satu batch.
+
+    RETURN:
+    answers : dict id → kategori (hanya id yang valid dan ada di batch)
+    """
+    data = _extract_json(response)
+    if isinstance(data, dict):
+        data = data.get("results", data.get("receipts", [data]))
+    if not isinstance(data, list):
+        return {}
+
+    wanted = {str(item_id): item_id for item_id in ids}
+    answers = {}
+    for entry in data:
+        if not isinstance(entry, dict):
+            continue
+        item_id = wanted.get(str(entry.get("id")).strip())
+        category = _normalize_category(entry.get("category"))
+        if item_id is not None and category is not None:
+            answers[item_id] = category
+
+    return answers
+
+
+# ======================================================================
+# 4. KLASIFIKASI BATCH
+# ======================================================================
+def gemini_classify_batch(texts: dict, max_chars: int = DEFAULT_BATCH_CHARS,
+                          max_rounds: int = DEFAULT_MAX_ROUNDS, ask_many=None) -> dict:
+    """
+    Mengklasifikasi banyak struk dengan Gemini, beberapa struk per request.
+
+    PARAMETER:
+    texts : dict id → teks struk
+    max_chars : int
+        Batas ukuran satu prompt
+    max_rounds : int
+        Jumlah putaran maksimum (putaran berikutnya hanya struk yang gagal)
+    ask_many : callable (opsional)
+        fn(prompts, use_cache) → list jawaban; default gemini_client.ask_many
+
+    RETURN:
+    answers : dict id → kategori
+        Struk yang tetap gagal setelah max_rounds tidak ada di dict.
+    """
+    if ask_many is None:
+        from core.gemini_client import ask_many
+
+    compact = {item_id: _compact(text) for item_id, text in texts.items()}
+    remaining = list(compact)
+    answers = {}
+
+    for round_index in range(max_rounds):
+        if not remaining:
+            break
+
+        batches = pack_batches([(item_id, compact[item_id]) for item_id in remaining], max_chars)
+
+        # Putaran ulang tidak memakai cache: jawaban rusak bisa ikut ter-cache
+        responses = ask_many([prompt for prompt, _ in batches], round_index == 0)
+
+        for (_, ids), response in zip(batches, responses):
+            answers.update(parse_batch_response(response, ids))
+
+        remaining = [item_id for item_id in remaining if item_id not in answers]
+
+    return answers
+
+
+def classify_with_fallback(texts, max_chars: int = DEFAULT_BATCH_CHARS,
+                           max_rounds: int = DEFAULT_MAX_ROUNDS, ask_many=None) -> list:
+    """
+    Klasifikasi heuristic untuk semua struk; struk ambigu diklasifikasi
+    ulang oleh Gemini secara batch.
+
+    PARAMETER:
+    texts : list of string
+
+    RETURN:
+    results : list of dict (urutan sama dengan texts)
+        {"category", "scores", "source"}
+        source = "heuristic", "gemini", atau "unresolved"
+        (ambigu dan Gemini gagal → kategori heuristic dipertahankan)
+    """
+    results = []
+    ambiguous = {}
+
+    for index, text in enumerate(texts):
+        result = classify_and_explain(text)
+        results.append({
+            "category": result.best_category,
+            "scores": result.score_table,
+            "source": "heuristic"
+        })
+        if is_ambiguous(result.score_table, result.best_category):
+            ambiguous[str(index)] = text
+
+    if not ambiguous:
+        return results
+
+    answers = gemini_classify_batch(ambiguous, max_chars, max_rounds, ask_many)
+    for item_id in ambiguous:
+        entry = results[int(item_id)]
+        if item_id in answers:
+            entry["category"] = answers[item_id]
+            entry["source"] = "gemini"
+        else:
+            entry["source"] = "unresolved"
+
+    return results
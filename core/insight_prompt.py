@@ -0,0 +1,144 @@
+"""
+insight_prompt.py
+------------------
+Menyusun prompt ringkas untuk ask_gemini() dari agregat pengeluaran
+(core/receipt_store.py), supaya Gemini bisa menjawab pertanyaan tentang
+pengeluaran tanpa dikirimi struk mentah.
+
+Konsep:
+1. Data diambil dari tabel agregat inkremental (bukan dari struk),
+   jadi biaya query tidak bergantung pada jumlah struk
+2. Ringkasan disusun berdasarkan prioritas:
+       bulan ini per kategori → semua waktu per kategori → total per bulan
+       (terbaru dulu, maksimal MAX_MONTHS bulan)
+3. Baris ditambahkan selama perkiraan token masih di bawah budget
+   → ukuran prompt konstan berapa pun panjang riwayat belanja
+
+Perkiraan token: ±4 karakter per token (cukup untuk membatasi ukuran,
+tidak perlu tokenizer).
+"""
+
+import datetime
+
+from core.receipt_store import _format_rupiah, get_receipt_store
+
+
+# Budget token untuk seluruh prompt (instruksi + ringkasan + pertanyaan)
+DEFAULT_TOKEN_BUDGET = 600
+
+# Riwayat bulanan terjauh yang dipertimbangkan
+MAX_MONTHS = 24
+
+CHARS_PER_TOKEN = 4
+
+PROMPT_HEADER = (
+    "Kamu adalah asisten keuangan pribadi. Jawab pertanyaan pengguna "
+    "berdasarkan ringkasan pengeluaran berikut (nominal dalam Rupiah). "
+    "Jika data tidak cukup, katakan dengan jujur.\n\n"
+    "Ringkasan pengeluaran:\n"
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _summary_sections(store, today: datetime.date) -> list:
+    """
+    RETURN:
+    sections : list of (judul, list baris), urut prioritas
+    """
+    month_start = today.replace(day=1)
+    this_month = store.spending_by_category(month_start.isoformat(), today.isoformat())
+    all_time = store.spending_by_category()
+
+    # Awal bulan MAX_MONTHS bulan yang lalu
+    year, month = today.year, today.month - (MAX_MONTHS - 1)
+    while month < 1:
+        month += 12
+        year -= 1
+    history = store.spending_by_month(start=datetime.date(year, month, 1).isoformat())
+
+    def category_lines(table):
+        return [
+            f"- {name}: {_format_rupiah(item['total'])} ({item['count']} struk)"
+            for name, item in sorted(table.items(), key=lambda kv: -kv[1]["total"])
+        ]
+
+    return [
+        (f"[Bulan ini ({month_start.strftime('%Y-%m')})]", category_lines(this_month)),
+        ("[Semua waktu]", category_lines(all_time)),
+        ("[Total per bulan, terbaru dulu]", [
+            f"- {item['month']}: {_format_rupiah(item['total'])} ({item['count']} struk)"
+            for item in reversed(history)
+        ]),
+    ]
+
+
+def build_summary_prompt(question: str, store=None, max_tokens: int = DEFAULT_TOKEN_BUDGET,
+                         today=None) -> str:
+    """
+    Menyusun prompt: instruksi + ringkasan pengeluaran + pertanyaan,
+    dibatasi max_tokens.
+
+    PARAMETER:
+    question : string
+        Pertanyaan pengguna
+    store : ReceiptStore (default: get_receipt_store())
+    max_tokens : int
+        Budget token seluruh prompt
+    today : datetime.date (default: hari ini; untuk pengujian)
+
+    RETURN:
+    prompt : string
+        Jika belum ada struk tersimpan, pertanyaan dikembalikan apa adanya.
+    """
+    store = store if store is not None else get_receipt_store()
+    today = today or datetime.date.today()
+
+    footer = f"\nPertanyaan: {question}"
+    sections = _summary_sections(store, today)
+    if not any(lines for _, lines in sections):
+        return question
+
+    used = estimate_tokens(PROMPT_HEADER) + estimate_tokens(footer)
+    body = []
+    for title, lines in sections:
+        if not lines:
+            continue
+
+        title_cost = estimate_tokens(title + "\n")
+        if used + title_cost + estimate_tokens(lines[0] + "\n") > max_tokens:
+            break
+        body.append(title)
+        used += title_cost
+
+        for line in lines:
+            cost = estimate_tokens(line + "\n")
+            if used + cost > max_tokens:
+                break
+            body.append(line)
+            used += cost
+
+    return PROMPT_HEADER + "\n".join(body) + "\n" + footer
+
+
+def ask_gemini_with_summary(question: str, store=None,
+                            max_tokens: int = DEFAULT_TOKEN_BUDGET) -> str:
+    """ask_gemini() dengan ringkasan pengeluaran sebagai konteks."""
+    from core.gemini_client import ask_gemini
+
+    return ask_gemini(build_summary_prompt(question, store, max_tokens))
+
+
+def stream_gemini_with_summary(question: str, store=None,
+                               max_tokens: int = DEFAULT_TOKEN_BUDGET, cancel_event=None):
+    """
+    Seperti ask_gemini_with_summary(), tetapi generator potongan teks (streaming).
+    cancel_event diteruskan ke stream_gemini().
+    """
+    from core.gemini_client import stream_gemini
+
+    yield from stream_gemini(
+        build_summary_prompt(question, store, max_tokens), cancel_event=cancel_event
+    )
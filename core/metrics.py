@@ -0,0 +1,311 @@
+"""
+metrics.py
+-----------
+Instrumentasi ringan: counter dan histogram latency per stage.
+
+Dipakai oleh ocr_processor, text_cleaner, search_classifier,
+backward_chain, dan gemini_client untuk mengetahui ke mana waktu pergi:
+decode gambar, threshold, Tesseract, cleaning, klasifikasi, reasoning,
+dan round trip ke Gemini.
+
+Cara pakai di kode:
+    @metrics.timed("clean_text")
+    def clean_text(...): ...
+
+    with metrics.timer("ocr_threshold"):
+        ...
+
+    metrics.inc("ocr_cache_hits")
+    metrics.inc("classify_results", category="makanan")
+
+Default NONAKTIF. Saat nonaktif, timed() hanya menambah satu pengecekan
+flag per panggilan dan timer() mengembalikan context manager kosong
+yang sama → overhead hampir nol.
+
+Mengaktifkan:
+- environment variable RECEIPT_METRICS=1, atau
+- metrics.enable() dari kode
+
+Export:
+- to_prometheus() / write_prometheus(path) : format teks Prometheus
+  (cocok untuk textfile collector node_exporter)
+- snapshot() / write_json(path)             : snapshot JSON
+- RECEIPT_METRICS_FILE=path → ditulis otomatis saat program selesai
+  (.json → JSON, selain itu → format Prometheus)
+"""
+
+import atexit
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+
+
+# Prefix nama metric di output Prometheus
+METRIC_PREFIX = "receipt_"
+
+# Batas atas bucket histogram (detik)
+DEFAULT_BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+_enabled = os.environ.get("RECEIPT_METRICS", "") not in ("", "0")
+_lock = threading.Lock()
+
+# (nama, label) → nilai / Histogram
+_counters = {}
+_histograms = {}
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    """Menghapus semua counter dan histogram."""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+# ======================================================================
+# 1. COUNTER & HISTOGRAM
+# ======================================================================
+class Histogram:
+    """
+    Histogram latency dengan bucket tetap (kumulatif saat di-export,
+    seperti histogram Prometheus).
+    """
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # elemen terakhir = +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> list:
+        """list of (batas_atas, jumlah_kumulatif), batas terakhir = +Inf."""
+        result = []
+        total = 0
+        for bound, count in zip(list(self.buckets) + [float("inf")], self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float):
+        """Perkiraan kuantil dari bucket (batas atas bucket yang memuat q)."""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return bound
+        return float("inf")
+
+
+def _key(name: str, labels: dict):
+    return (name, tuple(sorted(labels.items()))) if labels else (name, ())
+
+
+def inc(name: str, value: int = 1, **labels):
+    """Menambah counter (tidak melakukan apa-apa jika metrics nonaktif)."""
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name: str, seconds: float, **labels):
+    """Mencatat satu nilai latency (detik) ke histogram."""
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram()
+        histogram.observe(seconds)
+
+
+# ======================================================================
+# 2. TIMER & DECORATOR
+# ======================================================================
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name: str, labels: dict):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, time.perf_counter() - self.start, **self.labels)
+        if exc_type is not None:
+            inc(self.name + "_errors", **self.labels)
+        return False
+
+
+def timer(name: str, **labels):
+    """
+    Context manager pengukur latency blok kode → histogram `name`.
+    Exception di dalam blok juga menambah counter `name`_errors.
+    """
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(name, labels)
+
+
+def timed(name: str):
+    """Decorator: seperti timer(), untuk seluruh fungsi."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Timer(name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ======================================================================
+# 3. EXPORT
+# ======================================================================
+def snapshot() -> dict:
+    """
+    Snapshot semua metric dalam bentuk dict (siap json.dump).
+
+    RETURN:
+    {"enabled", "timestamp", "counters": [...], "histograms": [...]}
+    """
+    with _lock:
+        counters = [
+            {"name": name, "labels": dict(labels), "value": value}
+            for (name, labels), value in sorted(_counters.items())
+        ]
+        histograms = []
+        for (name, labels), histogram in sorted(_histograms.items(), key=lambda kv: kv[0]):
+            histograms.append({
+                "name": name,
+                "labels": dict(labels),
+                "count": histogram.count,
+                "sum": histogram.sum,
+                "mean": histogram.sum / histogram.count if histogram.count else 0.0,
+                "p50_le": histogram.quantile(0.50),
+                "p99_le": histogram.quantile(0.99),
+                "buckets": [
+                    {"le": "+Inf" if bound == float("inf") else bound, "count": total}
+                    for bound, total in histogram.cumulative()
+                ]
+            })
+
+    return {
+        "enabled": _enabled,
+        "timestamp": time.time(),
+        "counters": counters,
+        "histograms": histograms
+    }
+
+
+def _format_labels(labels: dict, extra: str = "") -> str:
+    parts = []
+    for k, v in labels.items():
+        value = str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(k + '="' + value + '"')
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def to_prometheus() -> str:
+    """Semua metric dalam format teks Prometheus (exposition format 0.0.4)."""
+    snap = snapshot()
+    lines = []
+
+    declared = set()
+    for counter in snap["counters"]:
+        metric = f"{METRIC_PREFIX}{counter['name']}_total"
+        if metric not in declared:
+            lines.append(f"# TYPE {metric} counter")
+            declared.add(metric)
+        lines.append(f"{metric}{_format_labels(counter['labels'])} {counter['value']}")
+
+    for histogram in snap["histograms"]:
+        metric = f"{METRIC_PREFIX}{histogram['name']}_seconds"
+        if metric not in declared:
+            lines.append(f"# TYPE {metric} histogram")
+            declared.add(metric)
+        labels = histogram["labels"]
+        for bucket in histogram["buckets"]:
+            le = "+Inf" if bucket["le"] == "+Inf" else repr(float(bucket["le"]))
+            bucket_labels = _format_labels(labels, 'le="' + le + '"')
+            lines.append(f"{metric}_bucket{bucket_labels} {bucket['count']}")
+        lines.append(f"{metric}_sum{_format_labels(labels)} {histogram['sum']}")
+        lines.append(f"{metric}_count{_format_labels(labels)} {histogram['count']}")
+
+    return "\n".join(lines) + "\n"
+
+
+def _atomic_write(path: str, content: str):
+    # Tulis ke file sementara lalu rename → pembaca tidak melihat file setengah jadi
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+def write_prometheus(path: str):
+    _atomic_write(path, to_prometheus())
+
+
+def write_json(path: str):
+    _atomic_write(path, json.dumps(snapshot(), indent=2))
+
+
+def _export_at_exit():
+    path = os.environ.get("RECEIPT_METRICS_FILE")
+    if not path or not _enabled:
+        return
+    if path.endswith(".json"):
+        write_json(path)
+    else:
+        write_prometheus(path)
+
+
+atexit.register(_export_at_exit)
@@ -0,0 +1,279 @@
+"""
+ocr_cache.py
+-------------
+Cache hasil OCR di disk (persistent) supaya struk yang sama tidak
+perlu di-OCR ulang oleh Tesseract.
+
+Konsep:
+- Key = SHA-256 dari (isi file gambar + parameter preprocessing + config Tesseract)
+  → content-addressed: nama file berbeda tapi isi sama tetap cache hit.
+- Disimpan di SQLite (satu file), aman dipakai beberapa process sekaligus.
+- Ukuran dibatasi (max_bytes). Jika penuh, entry yang paling lama tidak
+  dipakai dibuang lebih dulu (LRU), sekaligus sampai EVICT_TARGET × max_bytes
+  supaya put berikutnya tidak langsung evict lagi.
+- Total ukuran disimpan di tabel ocr_cache_size dan dijaga trigger SQLite
+  → put tidak perlu SUM(size) atas seluruh tabel, dan tetap benar walaupun
+  beberapa process menulis ke file yang sama.
+- last_access dari cache hit tidak ditulis per get: dikumpulkan di memori
+  lalu ditulis sekaligus (setiap TOUCH_BATCH hit / TOUCH_FLUSH_SECONDS,
+  sebelum eviction, dan saat close()).
+- Menyimpan counter hit/miss untuk monitoring.
+
+Lokasi default file cache:
+    ~/.receiptsorter/ocr_cache.sqlite3
+Bisa diganti dengan environment variable RECEIPT_OCR_CACHE.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    "RECEIPT_OCR_CACHE",
+    os.path.join(os.path.expanduser("~"), ".receiptsorter", "ocr_cache.sqlite3")
+)
+
+# Batas total ukuran teks yang disimpan (default 64 MB)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Eviction menurunkan total ukuran sampai fraksi ini dari max_bytes
+EVICT_TARGET = 0.9
+
+# Update last_access yang ditunda ditulis setelah sekian hit / detik
+TOUCH_BATCH = 64
+TOUCH_FLUSH_SECONDS = 5.0
+
+# Trigger yang menjaga ocr_cache_size.total = SUM(size)
+_SIZE_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS ocr_cache_size_insert AFTER INSERT ON ocr_cache"
+    " BEGIN UPDATE ocr_cache_size SET total = total + NEW.size WHERE id = 0; END",
+    "CREATE TRIGGER IF NOT EXISTS ocr_cache_size_delete AFTER DELETE ON ocr_cache"
+    " BEGIN UPDATE ocr_cache_size SET total = total - OLD.size WHERE id = 0; END",
+    "CREATE TRIGGER IF NOT EXISTS ocr_cache_size_update AFTER UPDATE OF size ON ocr_cache"
+    " BEGIN UPDATE ocr_cache_size SET total = total + NEW.size - OLD.size WHERE id = 0; END",
+]
+
+
+class OCRCache:
+    """
+    Cache OCR berbasis SQLite dengan eviction LRU berdasarkan ukuran.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        # key → last_access yang belum ditulis ke database
+        self._touched = {}
+        self._last_flush = time.monotonic()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+
+        # Skema + total awal dibuat dalam satu transaksi (aman jika beberapa
+        # process membuka cache yang sama bersamaan)
+        self._conn.execute("BEGIN IMMEDIATE")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_cache ("
+            " key TEXT PRIMARY KEY,"
+            " text TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ocr_cache_access ON ocr_cache(last_access)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_cache_size ("
+            " id INTEGER PRIMARY KEY CHECK (id = 0),"
+            " total INTEGER NOT NULL)"
+        )
+        # Cache lama (sebelum ada ocr_cache_size): total dihitung sekali di sini
+        self._conn.execute(
+            "INSERT OR IGNORE INTO ocr_cache_size (id, total)"
+            " SELECT 0, COALESCE(SUM(size), 0) FROM ocr_cache"
+        )
+        for trigger in _SIZE_TRIGGERS:
+            self._conn.execute(trigger)
+        self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # KEY
+    # ------------------------------------------------------------------
+    @staticmethod
+    def make_key(image_bytes: bytes, params: dict) -> str:
+        """
+        Membuat key cache dari isi gambar + parameter.
+
+        PARAMETER:
+        image_bytes : bytes
+            Isi file gambar mentah
+        params : dict
+            Parameter preprocessing & config Tesseract
+            (misalnya threshold, blur_kernel, config)
+
+        RETURN:
+        key : string (hex SHA-256)
+        """
+        h = hashlib.sha256(image_bytes)
+        h.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+        return h.hexdigest()
+
+    # ------------------------------------------------------------------
+    # GET / PUT
+    # ------------------------------------------------------------------
+    def get(self, key: str):
+        """
+        Mengambil teks OCR dari cache.
+
+        RETURN:
+        text : string, atau None jika tidak ada (miss)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text FROM ocr_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+
+            # last_access ditunda; ditulis bersama hit lain
+            self._touched[key] = time.time()
+            if (len(self._touched) >= TOUCH_BATCH
+                    or time.monotonic() - self._last_flush >= TOUCH_FLUSH_SECONDS):
+                self._flush_touches()
+                self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, text: str):
+        """
+        Menyimpan teks OCR ke cache, lalu evict entry lama jika melebihi max_bytes.
+        """
+        size = len(text.encode("utf-8"))
+
+        # Entry yang lebih besar dari seluruh kapasitas tidak disimpan
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            # UPSERT (bukan INSERT OR REPLACE): REPLACE tidak menjalankan
+            # trigger DELETE, sehingga total ukuran akan salah
+            self._conn.execute(
+                "INSERT INTO ocr_cache (key, text, size, last_access)"
+                " VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(key) DO UPDATE SET"
+                " text = excluded.text, size = excluded.size,"
+                " last_access = excluded.last_access",
+                (key, text, size, time.time())
+            )
+            self._touched.pop(key, None)
+            self._evict()
+            self._conn.commit()
+
+    def _total_bytes(self) -> int:
+        return self._conn.execute(
+            "SELECT total FROM ocr_cache_size WHERE id = 0"
+        ).fetchone()[0]
+
+    def _flush_touches(self):
+        """Menulis last_access yang tertunda (pemanggil yang commit)."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE ocr_cache SET last_access = ? WHERE key = ?",
+                [(last_access, key) for key, last_access in self._touched.items()]
+            )
+            self._touched.clear()
+        self._last_flush = time.monotonic()
+
+    def _evict(self):
+        """
+        Jika total ukuran > max_bytes, membuang entry yang paling lama
+        tidak dipakai (LRU) sampai total <= EVICT_TARGET × max_bytes.
+        """
+        total = self._total_bytes()
+        if total <= self.max_bytes:
+            return
+
+        # Hit yang tertunda harus masuk dulu supaya urutan LRU benar
+        self._flush_touches()
+        target = int(self.max_bytes * EVICT_TARGET)
+
+        rows = self._conn.execute(
+            "SELECT key, size FROM ocr_cache ORDER BY last_access ASC"
+        )
+        to_delete = []
+        for key, size in rows:
+            if total <= target:
+                break
+            to_delete.append((key,))
+            total -= size
+
+        self._conn.executemany("DELETE FROM ocr_cache WHERE key = ?", to_delete)
+
+    # ------------------------------------------------------------------
+    # UTILITAS
+    # ------------------------------------------------------------------
+    def stats(self) -> dict:
+        """
+        Statistik cache: hit, miss, hit rate, jumlah entry, total ukuran.
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM ocr_cache").fetchone()[0]
+            total = self._total_bytes()
+
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes
+        }
+
+    def clear(self):
+        """Menghapus semua isi cache dan reset counter."""
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute("DELETE FROM ocr_cache")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def close(self):
+        """Menulis last_access yang tertunda lalu menutup koneksi."""
+        with self._lock:
+            self._flush_touches()
+            self._conn.commit()
+            self._conn.close()
+
+
+# ======================================================================
+# CACHE DEFAULT (satu instance per process)
+# ======================================================================
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_ocr_cache() -> OCRCache:
+    """
+    Mengembalikan instance cache default (dibuat saat pertama dipakai).
+    """
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = OCRCache()
+        return _default_cache
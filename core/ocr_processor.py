@@ -9,85 +9,842 @@ Fitur:
    - Convert ke grayscale
    - Thresholding (biner)
    - Noise removal sederhana
-3. OCR menggunakan pytesseract
-4. Mengembalikan teks yang berhasil diekstrak
+3. OCR menggunakan pool engine Tesseract in-process (tesserocr) jika
+   tersedia, dengan pytesseract sebagai fallback
+4. Struk yang sangat panjang bisa di-OCR paralel per pita (tiled)
+5. Mengembalikan teks yang berhasil diekstrak
+6. Latency decode / threshold / Tesseract tercatat di core/metrics.py
+   (jika diaktifkan)
 
 NOTE:
 - Pastikan sudah menginstall:
   pip install pillow pytesseract opencv-python
+  (opsional, lebih cepat) pip install tesserocr
 
 - Jika Tesseract tidak terdeteksi, kamu perlu mengatur path:
   pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 """
 
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
 import cv2
+import numpy as np
 import pytesseract
 from PIL import Image
 
+from core import metrics
+from core.ocr_cache import get_ocr_cache
+
+
+# Parameter default preprocessing & Tesseract
+DEFAULT_THRESHOLD = 150
+DEFAULT_BLUR_KERNEL = (3, 3)
+DEFAULT_TESSERACT_CONFIG = ""
+
+
+# ======================================================================
+# LOADER GAMBAR: DECODE LANGSUNG KE GRAYSCALE (RESOLUSI DIKURANGI)
+# ======================================================================
+# Foto struk dari HP bisa 12–48 MP. Decode warna penuh lalu convert ke gray
+# memakan ratusan MB per worker. Loader ini:
+# - decode langsung ke grayscale (1 byte/pixel, bukan 3)
+# - untuk JPEG, decode pada skala 1/2, 1/4, atau 1/8 langsung dari libjpeg
+#   (cv2.IMREAD_REDUCED_GRAYSCALE_*), dipilih dari target tinggi huruf
+# - menolak gambar yang hasil decode-nya melebihi batas memori
+
+# Perkiraan tinggi huruf relatif terhadap lebar struk
+# (1 baris struk ≈ 32–48 karakter → tinggi huruf ≈ lebar / 40)
+TEXT_HEIGHT_RATIO = 1 / 40
+
+# Tinggi huruf yang nyaman untuk Tesseract (±20–30 px)
+DEFAULT_TARGET_TEXT_HEIGHT = 28
 
-def preprocess_image(path):
+# Batas ukuran gambar grayscale hasil decode (byte) per gambar
+DEFAULT_MAX_IMAGE_BYTES = 128 * 1024 * 1024
+
+_REDUCED_GRAYSCALE = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+
+def choose_scale(width, height, target_text_height=None,
+                 max_bytes=DEFAULT_MAX_IMAGE_BYTES, reducible=True) -> int:
     """
-    Melakukan preprocessing pada gambar agar OCR lebih akurat.
+    Memilih faktor pengecilan decode (1, 2, 4, atau 8).
+
+    PARAMETER:
+    width, height : int
+        Ukuran asli gambar
+    target_text_height : int atau None
+        Tinggi huruf minimal setelah pengecilan. None → resolusi penuh
+        (kecuali dipaksa oleh batas memori)
+    max_bytes : int
+        Batas ukuran hasil decode grayscale
+    reducible : bool
+        False jika format tidak mendukung reduced decode (non-JPEG)
+
+    RETURN:
+    factor : int
+    """
+    factor = 1
+
+    if reducible and target_text_height:
+        estimated_text_height = width * TEXT_HEIGHT_RATIO
+        for candidate in (2, 4, 8):
+            if estimated_text_height / candidate >= target_text_height:
+                factor = candidate
+
+    # Batas memori memaksa pengecilan lebih jauh (hanya untuk JPEG)
+    while reducible and factor < 8 and (width // factor) * (height // factor) > max_bytes:
+        factor *= 2
+
+    if (width // factor) * (height // factor) > max_bytes:
+        raise MemoryError(
+            f"Gambar terlalu besar ({width}x{height}) untuk batas memori "
+            f"{max_bytes // (1024 * 1024)} MB."
+        )
+
+    return factor
+
+
+@metrics.timed("ocr_decode")
+def load_grayscale(path, target_text_height=None, max_bytes=DEFAULT_MAX_IMAGE_BYTES):
+    """
+    Membaca gambar langsung sebagai grayscale, dengan resolusi dikurangi
+    jika memungkinkan.
 
     PARAMETER:
     path : string
         Lokasi file gambar struk (jpg/png)
+    target_text_height : int atau None
+        Lihat choose_scale(). None → resolusi penuh
+    max_bytes : int
+        Batas memori hasil decode per gambar
 
     RETURN:
-    preprocessed_image : numpy array
-        Hasil gambar setelah preprocessing
+    gray : numpy array (uint8, 2D)
     """
 
-    # Load gambar menggunakan OpenCV (hasil: array BGR)
-    img = cv2.imread(path)
+    # Baca header saja (tanpa decode pixel) untuk ukuran & format
+    try:
+        with Image.open(path) as header:
+            width, height = header.size
+            is_jpeg = header.format == "JPEG"
+    except Image.DecompressionBombError as e:
+        raise MemoryError(str(e))
+    except (OSError, ValueError):
+        raise FileNotFoundError("Gambar tidak ditemukan atau format tidak terbaca.")
+
+    factor = choose_scale(width, height, target_text_height, max_bytes, reducible=is_jpeg)
+    gray = cv2.imread(path, _REDUCED_GRAYSCALE[factor])
 
     # Jika gambar gagal dibaca
-    if img is None:
+    if gray is None:
         raise FileNotFoundError("Gambar tidak ditemukan atau format tidak terbaca.")
 
-    # Convert BGR -> Grayscale
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    return gray
+
+
+def preprocess_image(path, threshold=DEFAULT_THRESHOLD, blur_kernel=DEFAULT_BLUR_KERNEL,
+                     target_text_height=None, max_image_bytes=DEFAULT_MAX_IMAGE_BYTES):
+    """
+    Melakukan preprocessing pada gambar agar OCR lebih akurat.
+
+    PARAMETER:
+    path : string
+        Lokasi file gambar struk (jpg/png)
+    threshold : int
+        Nilai threshold biner (default 150)
+    blur_kernel : tuple
+        Ukuran kernel Gaussian blur (default 3x3)
+    target_text_height : int atau None
+        Jika diisi, JPEG besar di-decode pada resolusi lebih kecil
+        (lihat load_grayscale). None → resolusi penuh
+    max_image_bytes : int
+        Batas memori hasil decode per gambar
+
+    RETURN:
+    preprocessed_image : numpy array
+        Hasil gambar setelah preprocessing
+    """
 
-    # Threshold (biner) untuk meningkatkan kontras
-    _, thresh = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    # Load gambar langsung sebagai grayscale (tanpa array BGR 3 channel)
+    gray = load_grayscale(path, target_text_height, max_image_bytes)
 
-    # Noise removal (Gaussian blur)
-    blur = cv2.GaussianBlur(thresh, (3, 3), 0)
+    with metrics.timer("ocr_threshold"):
+        # Threshold (biner) untuk meningkatkan kontras
+        _, thresh = cv2.threshold(gray, threshold, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+        # Noise removal (Gaussian blur)
+        blur = cv2.GaussianBlur(thresh, tuple(blur_kernel), 0)
 
     return blur
 
 
-def run_ocr(path):
+# ======================================================================
+# BACKEND OCR (ENGINE POOL)
+# ======================================================================
+# pytesseract menjalankan process tesseract BARU untuk setiap gambar dan
+# menulis gambar ke file temporary. Untuk struk kecil, waktu spawn process
+# + load model mendominasi. Jika paket `tesserocr` terpasang, dipakai pool
+# engine Tesseract in-process yang tetap "hangat" (model sudah di-load) dan
+# menerima buffer grayscale langsung dari preprocess_image().
+#
+# Pilih backend lewat environment variable RECEIPT_OCR_BACKEND:
+#   auto (default) → tesserocr jika ada, selain itu pytesseract
+#   tesserocr      → wajib tesserocr
+#   pytesseract    → selalu pytesseract (fallback)
+OCR_BACKEND = os.environ.get("RECEIPT_OCR_BACKEND", "auto")
+OCR_LANG = os.environ.get("RECEIPT_OCR_LANG", "eng")
+
+
+def _parse_config(config: str):
+    """
+    Mengubah config gaya CLI Tesseract menjadi (psm, variables).
+    Contoh: "--psm 6 -c tessedit_char_whitelist=0123456789"
+
+    Hanya --psm dan -c yang didukung. Opsi lain (--oem, -l, --dpi, ...)
+    → ValueError, supaya tidak diam-diam diabaikan (TesserocrEngine lalu
+    memakai PytesseractEngine untuk config tersebut).
+    """
+    psm = None
+    variables = {}
+    parts = config.split()
+    i = 0
+    while i < len(parts):
+        if parts[i] == "--psm" and i + 1 < len(parts):
+            psm = int(parts[i + 1])
+            i += 2
+        elif parts[i] == "-c" and i + 1 < len(parts) and "=" in parts[i + 1]:
+            name, value = parts[i + 1].split("=", 1)
+            variables[name] = value
+            i += 2
+        else:
+            raise ValueError(f"Opsi config Tesseract tidak didukung tesserocr: {parts[i]}")
+    return psm, variables
+
+
+class OCREngine:
+    """
+    Antarmuka backend OCR: menerima array grayscale (uint8, 2D)
+    dan mengembalikan teks.
+    """
+    name = "base"
+
+    def recognize(self, gray, config: str = DEFAULT_TESSERACT_CONFIG) -> str:
+        raise NotImplementedError
+
+    def recognize_with_confidence(self, gray, config: str = DEFAULT_TESSERACT_CONFIG):
+        """
+        RETURN:
+        (text, confidence) : confidence = rata-rata confidence per kata
+        (0–100), 0 jika tidak ada kata terbaca
+        """
+        raise NotImplementedError
+
+    def recognize_lines(self, gray, config: str = DEFAULT_TESSERACT_CONFIG) -> list:
+        """
+        RETURN:
+        lines : list of (top, bottom, text) ; posisi baris dalam pixel
+                (koordinat gambar gray), urut sesuai urutan baca
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PytesseractEngine(OCREngine):
+    """
+    Backend fallback: pytesseract (1 subprocess per gambar).
+    """
+    name = "pytesseract"
+
+    def recognize(self, gray, config: str = DEFAULT_TESSERACT_CONFIG) -> str:
+        # Konversi dari array OpenCV ke image PIL
+        pil_img = Image.fromarray(gray)
+        return pytesseract.image_to_string(pil_img, config=config)
+
+    def recognize_with_confidence(self, gray, config: str = DEFAULT_TESSERACT_CONFIG):
+        # Satu panggilan image_to_data → kata + confidence; teks disusun ulang per baris
+        data = pytesseract.image_to_data(
+            Image.fromarray(gray), config=config, output_type=pytesseract.Output.DICT
+        )
+
+        lines = {}
+        confidences = []
+        for i, word in enumerate(data["text"]):
+            conf = float(data["conf"][i])
+            if conf < 0 or not word.strip():
+                continue
+            confidences.append(conf)
+            line_key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            lines.setdefault(line_key, []).append(word)
+
+        text = "\n".join(" ".join(words) for words in lines.values())
+        confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        return text, confidence
+
+    def recognize_lines(self, gray, config: str = DEFAULT_TESSERACT_CONFIG) -> list:
+        data = pytesseract.image_to_data(
+            Image.fromarray(gray), config=config, output_type=pytesseract.Output.DICT
+        )
+
+        # (block, par, line) → [top, bottom, kata]
+        lines = {}
+        for i, word in enumerate(data["text"]):
+            if float(data["conf"][i]) < 0 or not word.strip():
+                continue
+            top, bottom = data["top"][i], data["top"][i] + data["height"][i]
+            line_key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            line = lines.setdefault(line_key, [top, bottom, []])
+            line[0], line[1] = min(line[0], top), max(line[1], bottom)
+            line[2].append(word)
+
+        return [(top, bottom, " ".join(words)) for top, bottom, words in lines.values()]
+
+
+class TesserocrEngine(OCREngine):
+    """
+    Backend in-process: satu instance Tesseract API yang dipakai ulang.
+    Buffer grayscale dikirim langsung (tanpa PIL dan tanpa file temporary).
+
+    Variabel dari config (-c name=value) hanya berlaku untuk satu panggilan:
+    nilai lama dikembalikan setelah OCR, karena engine dipakai ulang oleh
+    pool. Config dengan opsi yang tidak didukung (_parse_config) atau
+    variabel yang tidak dikenal dijalankan lewat PytesseractEngine supaya
+    hasilnya sama dengan backend CLI (yang mengabaikannya dengan warning).
+    """
+    name = "tesserocr"
+
+    def __init__(self, lang: str = OCR_LANG):
+        import tesserocr
+        self._tesserocr = tesserocr
+        self._api = tesserocr.PyTessBaseAPI(lang=lang)
+        self._fallback = None
+
+    def _fallback_engine(self) -> OCREngine:
+        if self._fallback is None:
+            self._fallback = PytesseractEngine()
+        return self._fallback
+
+    def _set_image(self, gray, psm, variables: dict) -> dict:
+        """
+        RETURN:
+        previous : dict nama variabel → nilai sebelum diubah
+        """
+        api = self._api
+
+        api.SetPageSegMode(psm if psm is not None else self._tesserocr.PSM.AUTO)
+        previous = {}
+        for name, value in variables.items():
+            previous[name] = api.GetVariableAsString(name)
+            if not api.SetVariable(name, value):
+                self._restore(previous)
+                raise ValueError(f"Variabel Tesseract tidak dikenal: {name}")
+
+        gray = np.ascontiguousarray(gray, dtype=np.uint8)
+        height, width = gray.shape[:2]
+        api.SetImageBytes(gray.tobytes(), width, height, 1, width)
+        return previous
+
+    def _restore(self, previous: dict):
+        for name, value in previous.items():
+            if value is not None:
+                self._api.SetVariable(name, value)
+
+    def recognize(self, gray, config: str = DEFAULT_TESSERACT_CONFIG) -> str:
+        try:
+            psm, variables = _parse_config(config)
+            previous = self._set_image(gray, psm, variables)
+        except ValueError:
+            return self._fallback_engine().recognize(gray, config)
+
+        try:
+            return self._api.GetUTF8Text()
+        finally:
+            self._api.Clear()
+            self._restore(previous)
+
+    def recognize_with_confidence(self, gray, config: str = DEFAULT_TESSERACT_CONFIG):
+        try:
+            psm, variables = _parse_config(config)
+            previous = self._set_image(gray, psm, variables)
+        except ValueError:
+            return self._fallback_engine().recognize_with_confidence(gray, config)
+
+        try:
+            text = self._api.GetUTF8Text()
+            confidences = self._api.AllWordConfidences()
+        finally:
+            self._api.Clear()
+            self._restore(previous)
+
+        confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        return text, confidence
+
+    def recognize_lines(self, gray, config: str = DEFAULT_TESSERACT_CONFIG) -> list:
+        try:
+            psm, variables = _parse_config(config)
+            previous = self._set_image(gray, psm, variables)
+        except ValueError:
+            return self._fallback_engine().recognize_lines(gray, config)
+
+        level = self._tesserocr.RIL.TEXTLINE
+        lines = []
+        try:
+            self._api.Recognize()
+            for item in self._tesserocr.iterate_level(self._api.GetIterator(), level):
+                text = (item.GetUTF8Text(level) or "").strip()
+                box = item.BoundingBox(level)
+                if text and box is not None:
+                    lines.append((box[1], box[3], text))
+        finally:
+            self._api.Clear()
+            self._restore(previous)
+        return lines
+
+    def close(self):
+        self._api.End()
+
+
+class EnginePool:
+    """
+    Pool engine OCR yang thread-safe. Setiap thread meminjam satu engine
+    (engine dibuat saat dibutuhkan, maksimal `size`).
+    """
+
+    def __init__(self, factory, size: int):
+        self._factory = factory
+        self._size = size
+        self._created = 0
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.name = None
+
+    @contextmanager
+    def engine(self):
+        """Context manager: pinjam satu engine, kembalikan setelah selesai."""
+        engine = None
+        try:
+            engine = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                if self._created < self._size:
+                    self._created += 1
+                    create = True
+                else:
+                    create = False
+            if create:
+                try:
+                    engine = self._factory()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                engine = self._idle.get()
+
+        try:
+            yield engine
+        finally:
+            self._idle.put(engine)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_engine_pool = None
+_engine_pool_lock = threading.Lock()
+
+
+def _tesserocr_available() -> bool:
+    try:
+        import tesserocr  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def get_engine_pool() -> EnginePool:
+    """
+    Mengembalikan pool engine OCR untuk process ini (dibuat sekali).
+    Ukuran pool = jumlah core CPU.
+    """
+    global _engine_pool
+    with _engine_pool_lock:
+        if _engine_pool is None:
+            backend = OCR_BACKEND
+            if backend == "auto":
+                backend = "tesserocr" if _tesserocr_available() else "pytesseract"
+
+            factory = TesserocrEngine if backend == "tesserocr" else PytesseractEngine
+            _engine_pool = EnginePool(factory, os.cpu_count() or 1)
+            _engine_pool.name = backend
+        return _engine_pool
+
+
+@metrics.timed("ocr_tesseract")
+def image_to_text(processed, config=DEFAULT_TESSERACT_CONFIG):
+    """
+    Menjalankan Tesseract pada gambar yang sudah di-preprocess.
+
+    Berbeda dengan run_ocr(), fungsi ini TIDAK menangkap exception,
+    sehingga pemanggil (misalnya batch OCR) bisa mencatat error per file.
+
+    PARAMETER:
+    processed : numpy array
+        Hasil dari preprocess_image()
+    config : string
+        Config tambahan Tesseract (misalnya "--psm 6")
+
+    RETURN:
+    text : string
+        Teks hasil OCR
+    """
+
+    # Jalankan OCR dengan engine dari pool
+    # Jika ingin engine lebih akurat untuk number, gunakan config:
+    # config = "--psm 6"
+    with get_engine_pool().engine() as engine:
+        return engine.recognize(processed, config)
+
+
+@metrics.timed("ocr_tesseract")
+def image_to_text_with_confidence(processed, config=DEFAULT_TESSERACT_CONFIG):
+    """
+    Seperti image_to_text(), tetapi juga mengembalikan rata-rata
+    confidence per kata (0–100) dari Tesseract.
+
+    RETURN:
+    (text, confidence)
+    """
+    with get_engine_pool().engine() as engine:
+        return engine.recognize_with_confidence(processed, config)
+
+
+@metrics.timed("ocr_tesseract")
+def image_to_lines(processed, config=DEFAULT_TESSERACT_CONFIG):
+    """
+    Seperti image_to_text(), tetapi per baris beserta posisinya.
+
+    RETURN:
+    lines : list of (top, bottom, text)
+    """
+    with get_engine_pool().engine() as engine:
+        return engine.recognize_lines(processed, config)
+
+
+# ======================================================================
+# OCR BERTINGKAT (TILED) UNTUK STRUK PANJANG
+# ======================================================================
+# Struk supermarket berupa strip yang sangat tinggi. Satu panggilan
+# Tesseract untuk seluruh gambar lambat dan hanya memakai satu core.
+# Gambar dipotong menjadi pita (band) horizontal di baris kosong
+# (whitespace), pita-pita di-OCR paralel, lalu teksnya disambung kembali.
+# Pita saling tumpang tindih (overlap) agar baris di batas potongan tidak
+# terpotong. Baris di area overlap terbaca di dua pita; saat disambung,
+# setiap baris hanya diambil dari pita yang "memiliki" posisinya (titik
+# tengah baris di antara dua titik potong utama), BUKAN berdasarkan teks,
+# supaya baris yang memang berulang (item dibeli dua kali) tetap dua.
+
+# Tinggi minimal gambar yang layak dipotong-potong (px)
+TILE_MIN_HEIGHT = 2000
+# Perkiraan tinggi satu pita (px)
+TILE_BAND_HEIGHT = 1000
+# Tinggi area tumpang tindih antar pita (px)
+TILE_OVERLAP = 80
+
+
+def _whitespace_rows(binary):
+    """
+    Array boolean per baris: True jika baris tersebut kosong (tanpa tinta).
+    Gambar hasil preprocess: teks gelap di atas latar putih.
+    """
+    return (binary < 128).sum(axis=1) == 0
+
+
+def _snap_to_whitespace(white, position, lo, hi):
+    """
+    Mencari baris kosong terdekat dari `position` di rentang [lo, hi).
+    Jika tidak ada, kembalikan `position` apa adanya.
+    """
+    lo = max(lo, 0)
+    hi = min(hi, len(white))
+    candidates = np.flatnonzero(white[lo:hi])
+    if len(candidates) == 0:
+        return position
+    candidates = candidates + lo
+    return int(candidates[np.abs(candidates - position).argmin()])
+
+
+def band_layout(processed, band_height=TILE_BAND_HEIGHT, overlap=TILE_OVERLAP):
+    """
+    Posisi pita horizontal yang saling overlap, dengan batas potongan di
+    baris kosong.
+
+    RETURN:
+    layout : list of (top, bottom, own_top, own_bottom), urut dari atas
+        top/bottom         : baris gambar yang di-OCR (termasuk overlap)
+        own_top/own_bottom : bagian yang dimiliki pita ini (tanpa overlap);
+                             bagian semua pita bersambung tanpa celah
+    """
+    height = processed.shape[0]
+    white = _whitespace_rows(processed)
+    window = band_height // 4
+
+    # Titik potong utama di baris kosong terdekat
+    cuts = [0]
+    while cuts[-1] + band_height + window < height:
+        target = cuts[-1] + band_height
+        cuts.append(_snap_to_whitespace(white, target, target - window, target + window))
+    cuts.append(height)
+
+    layout = []
+    for i in range(len(cuts) - 1):
+        own_top, own_bottom = cuts[i], cuts[i + 1]
+        top, bottom = own_top, own_bottom
+
+        # Perluas pita ke atas/bawah sebesar overlap, tetap di baris kosong
+        if i > 0:
+            top = _snap_to_whitespace(white, top - overlap, top - 2 * overlap, top)
+        if i < len(cuts) - 2:
+            bottom = _snap_to_whitespace(white, bottom + overlap, bottom, bottom + 2 * overlap)
+
+        layout.append((top, bottom, own_top, own_bottom))
+
+    return layout
+
+
+def split_bands(processed, band_height=TILE_BAND_HEIGHT, overlap=TILE_OVERLAP):
+    """
+    Memotong gambar tinggi menjadi pita (lihat band_layout()).
+
+    RETURN:
+    bands : list of numpy array (urut dari atas ke bawah)
+    """
+    return [processed[top:bottom] for top, bottom, _, _ in band_layout(processed, band_height, overlap)]
+
+
+def merge_band_lines(band_lines, layout):
+    """
+    Menyambung baris OCR per pita. Baris di area overlap terbaca di dua
+    pita; baris hanya diambil dari pita yang memiliki titik tengahnya
+    (own_top <= tengah < own_bottom), jadi duplikat dibuang berdasarkan
+    posisi, bukan kesamaan teks.
+
+    PARAMETER:
+    band_lines : list (per pita) of list of (top, bottom, text),
+                 posisi relatif terhadap pita
+    layout : hasil band_layout()
+
+    RETURN:
+    text : string
+    """
+    merged = []
+    for lines, (top, _, own_top, own_bottom) in zip(band_lines, layout):
+        for line_top, line_bottom, text in lines:
+            center = top + (line_top + line_bottom) / 2
+            if own_top <= center < own_bottom and text.strip():
+                merged.append(text)
+
+    return "\n".join(merged) + ("\n" if merged else "")
+
+
+def image_to_text_tiled(processed, config=DEFAULT_TESSERACT_CONFIG, workers=None,
+                        band_height=TILE_BAND_HEIGHT, overlap=TILE_OVERLAP):
+    """
+    OCR paralel per pita untuk gambar yang tinggi. Gambar yang lebih
+    pendek dari TILE_MIN_HEIGHT langsung memakai image_to_text().
+
+    PARAMETER:
+    processed : numpy array
+        Hasil preprocess_image()
+    config : string
+        Config tambahan Tesseract
+    workers : int
+        Jumlah thread OCR (default: jumlah core CPU)
+
+    RETURN:
+    text : string
+    """
+    if processed.shape[0] < max(TILE_MIN_HEIGHT, 2 * band_height):
+        return image_to_text(processed, config)
+
+    layout = band_layout(processed, band_height, overlap)
+    workers = min(workers or os.cpu_count() or 1, len(layout))
+
+    # Thread cukup: pytesseract = subprocess, tesserocr melepas GIL
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        band_lines = list(executor.map(
+            lambda band: image_to_lines(processed[band[0]:band[1]], config), layout
+        ))
+
+    return merge_band_lines(band_lines, layout)
+
+
+@metrics.timed("ocr_image")
+def ocr_image(path, threshold=DEFAULT_THRESHOLD, blur_kernel=DEFAULT_BLUR_KERNEL,
+              config=DEFAULT_TESSERACT_CONFIG, use_cache=True, target_text_height=None,
+              tiled=False):
+    """
+    OCR satu gambar dengan cache di depannya (lihat core/ocr_cache.py).
+
+    Key cache = hash isi gambar + threshold + blur_kernel + config,
+    jadi struk yang sama dengan parameter yang sama langsung diambil
+    dari cache tanpa memanggil Tesseract. Exception TIDAK ditangkap.
+
+    PARAMETER:
+    path : string
+        Path gambar
+    threshold, blur_kernel : parameter preprocess_image()
+    config : string
+        Config tambahan Tesseract
+    use_cache : bool
+        False → selalu jalankan Tesseract (cache dilewati)
+    target_text_height : int atau None
+        Decode dengan resolusi dikurangi (lihat load_grayscale)
+    tiled : bool
+        True → struk panjang di-OCR paralel per pita (image_to_text_tiled)
+
+    RETURN:
+    text : string
+        Teks hasil OCR
+    """
+
+    cache = get_ocr_cache() if use_cache else None
+    key = None
+
+    if cache is not None:
+        try:
+            with open(path, "rb") as f:
+                image_bytes = f.read()
+        except OSError:
+            image_bytes = None  # biarkan preprocess_image yang memberi error
+
+        if image_bytes is not None:
+            key = cache.make_key(image_bytes, {
+                "threshold": threshold,
+                "blur_kernel": list(blur_kernel),
+                "config": config,
+                "engine": get_engine_pool().name,
+                "target_text_height": target_text_height,
+                # "lines": pita disambung per posisi baris (bukan per teks)
+                "tiled": "lines" if tiled else False
+            })
+            cached = cache.get(key)
+            if cached is not None:
+                metrics.inc("ocr_cache_hits")
+                return cached
+            metrics.inc("ocr_cache_misses")
+
+    processed = preprocess_image(path, threshold, blur_kernel, target_text_height)
+    if tiled:
+        text = image_to_text_tiled(processed, config)
+    else:
+        text = image_to_text(processed, config)
+
+    if key is not None:
+        cache.put(key, text)
+
+    return text
+
+
+def run_ocr(path, threshold=DEFAULT_THRESHOLD, blur_kernel=DEFAULT_BLUR_KERNEL,
+            config=DEFAULT_TESSERACT_CONFIG, use_cache=True, target_text_height=None,
+            tiled=False):
     """
     Menjalankan OCR pada gambar struk.
 
     LANGKAH:
-    1. Preprocessing gambar
-    2. Konversi ke format PIL (pytesseract memakai PIL image)
-    3. Jalankan OCR
-    4. Return teks ekstraksi
+    1. Cek cache OCR (struk yang sama → langsung return)
+    2. Preprocessing gambar
+    3. Konversi ke format PIL (pytesseract memakai PIL image)
+    4. Jalankan OCR
+    5. Return teks ekstraksi
 
     PARAMETER:
     path : string
         Path gambar lokasi file
+    threshold, blur_kernel, config, use_cache, target_text_height, tiled :
+        Lihat ocr_image()
 
     RETURN:
     text_result : string
         Teks hasil OCR
     """
 
-    # Preprocess gambar
-    processed = preprocess_image(path)
-
-    # Konversi dari array OpenCV ke image PIL
-    pil_img = Image.fromarray(processed)
-
-    # Jalankan OCR
-    # Jika ingin engine lebih akurat untuk number, gunakan config:
-    # config = "--psm 6"
     try:
-        text = pytesseract.image_to_string(pil_img)
+        text = ocr_image(path, threshold, blur_kernel, config, use_cache,
+                         target_text_height, tiled)
+    except FileNotFoundError:
+        raise
     except Exception as e:
         text = f"OCR ERROR: {str(e)}"
 
     return text
+
+
+def validate_scale(paths, target_text_height=DEFAULT_TARGET_TEXT_HEIGHT):
+    """
+    Memvalidasi akurasi OCR pada resolusi dikurangi terhadap resolusi penuh.
+
+    Untuk setiap gambar, OCR dijalankan 2x (tanpa cache): resolusi penuh
+    dan dengan target_text_height. Kemiripan dihitung dari token hasil
+    clean_text() (difflib ratio, 1.0 = identik).
+
+    PARAMETER:
+    paths : list of string
+        Gambar struk contoh
+    target_text_height : int
+        Target tinggi huruf yang ingin divalidasi
+
+    RETURN:
+    report : dict
+        {"files": [{"path", "similarity", "full_seconds", "reduced_seconds"}],
+         "mean_similarity", "speedup"}
+    """
+    import difflib
+    import time
+
+    from core.text_cleaner import clean_text
+
+    files = []
+    for path in paths:
+        start = time.perf_counter()
+        full = ocr_image(path, use_cache=False)
+        full_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        reduced = ocr_image(path, use_cache=False, target_text_height=target_text_height)
+        reduced_seconds = time.perf_counter() - start
+
+        similarity = difflib.SequenceMatcher(
+            None, clean_text(full), clean_text(reduced)
+        ).ratio()
+
+        files.append({
+            "path": path,
+            "similarity": round(similarity, 4),
+            "full_seconds": round(full_seconds, 4),
+            "reduced_seconds": round(reduced_seconds, 4)
+        })
+
+    total_full = sum(f["full_seconds"] for f in files)
+    total_reduced = sum(f["reduced_seconds"] for f in files)
+    return {
+        "files": files,
+        "mean_similarity": (sum(f["similarity"] for f in files) / len(files)) if files else 0.0,
+        "speedup": (total_full / total_reduced) if total_reduced else 0.0
+    }
@@ -0,0 +1,326 @@
+"""
+pipeline.py
+------------
+Pipeline streaming berbasis stage untuk memproses aliran struk tanpa henti:
+
+    run_ocr → clean_text → classify + backward reasoning
+
+Konsep:
+1. Setiap Stage punya fungsi, jumlah worker, dan queue input yang
+   dibatasi (bounded) → backpressure: stage yang cepat otomatis menunggu
+   stage yang lambat, memori tetap datar.
+2. Jumlah item yang sedang diproses (in-flight) juga dibatasi, termasuk
+   buffer pengurutan ulang saat output ordered.
+3. Output bisa ordered (urutan sama dengan input) atau unordered
+   (urutan selesai, latency lebih rendah).
+4. Error per item tidak menghentikan pipeline: item tersebut keluar
+   sebagai StageError dan stage berikutnya dilewati.
+5. stats() melaporkan throughput & utilisasi per stage → terlihat
+   apakah Tesseract atau klasifikasi yang menjadi bottleneck.
+
+Worker berupa thread. Untuk stage yang CPU-bound murni Python,
+pakai Stage(..., processes=True) → fungsi dijalankan di process pool
+(fungsi & data harus bisa di-pickle).
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+
+# Penanda akhir stream di dalam queue
+_END = object()
+
+
+@dataclass
+class StageError:
+    """
+    Pengganti hasil untuk item yang gagal di salah satu stage.
+    """
+    stage: str
+    item: object
+    error: Exception
+
+
+class Stage:
+    """
+    Satu tahap pipeline.
+
+    PARAMETER:
+    name : string
+        Nama stage (dipakai di statistik)
+    fn : callable(item) → hasil
+    workers : int
+        Jumlah worker paralel untuk stage ini
+    queue_size : int
+        Kapasitas queue input stage (default: 4x workers)
+    processes : bool
+        True → fn dijalankan di process pool (untuk kerja CPU-bound)
+    """
+
+    def __init__(self, name: str, fn, workers: int = 1, queue_size: int = None,
+                 processes: bool = False):
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.queue_size = queue_size or workers * 4
+        self.processes = processes
+
+        # Statistik
+        self.items = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _record(self, elapsed: float, failed: bool):
+        with self._lock:
+            self.items += 1
+            self.busy_seconds += elapsed
+            if failed:
+                self.errors += 1
+
+
+class Pipeline:
+    """
+    Menjalankan beberapa Stage berurutan dengan queue terbatas di antaranya.
+    """
+
+    def __init__(self, stages: list, ordered: bool = True):
+        self.stages = stages
+        self.ordered = ordered
+        self._wall_start = None
+        self._wall_end = None
+
+    # ------------------------------------------------------------------
+    # RUN
+    # ------------------------------------------------------------------
+    def run(self, items):
+        """
+        Generator: memproses items (boleh iterable tanpa akhir) dan
+        meng-yield hasil stage terakhir (atau StageError).
+
+        Jika generator ditutup lebih awal, semua worker dihentikan.
+        """
+        stop = threading.Event()
+        queues = [queue.Queue(maxsize=s.queue_size) for s in self.stages]
+        out_queue = queue.Queue()
+
+        # Batas item in-flight = kapasitas semua queue + semua worker
+        max_in_flight = sum(s.queue_size + s.workers for s in self.stages)
+        in_flight = threading.Semaphore(max_in_flight)
+
+        executors = [
+            ProcessPoolExecutor(max_workers=s.workers) if s.processes else None
+            for s in self.stages
+        ]
+
+        def put(q, value):
+            # put dengan timeout supaya bisa berhenti saat stop di-set
+            while not stop.is_set():
+                try:
+                    q.put(value, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def feeder():
+            try:
+                for seq, item in enumerate(items):
+                    while not in_flight.acquire(timeout=0.1):
+                        if stop.is_set():
+                            return
+                    if not put(queues[0], (seq, item, item)):
+                        return
+            except Exception as e:
+                # Sumber item error → akhiri stream dengan error tersebut
+                out_queue.put((-1, None, StageError("source", None, e)))
+            finally:
+                for _ in range(self.stages[0].workers):
+                    put(queues[0], _END)
+
+        def worker(index):
+            stage = self.stages[index]
+            q_in = queues[index]
+            last = index == len(self.stages) - 1
+            q_out = out_queue if last else queues[index + 1]
+            executor = executors[index]
+
+            while not stop.is_set():
+                try:
+                    job = q_in.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+
+                if job is _END:
+                    break
+
+                seq, source, value = job
+                if not isinstance(value, StageError):
+                    start = time.perf_counter()
+                    try:
+                        if executor is not None:
+                            value = executor.submit(stage.fn, value).result()
+                        else:
+                            value = stage.fn(value)
+                        failed = False
+                    except Exception as e:
+                        value = StageError(stage.name, source, e)
+                        failed = True
+                    stage._record(time.perf_counter() - start, failed)
+
+                if last:
+                    q_out.put((seq, source, value))
+                elif not put(q_out, (seq, source, value)):
+                    return
+
+            # Worker terakhir di stage ini meneruskan tanda akhir stream
+            with finished_lock:
+                finished[index] += 1
+                all_done = finished[index] == stage.workers
+
+            if all_done:
+                if last:
+                    q_out.put(_END)
+                else:
+                    for _ in range(self.stages[index + 1].workers):
+                        put(q_out, _END)
+
+        finished = [0] * len(self.stages)
+        finished_lock = threading.Lock()
+
+        threads = [threading.Thread(target=feeder, daemon=True)]
+        for index, stage in enumerate(self.stages):
+            for _ in range(stage.workers):
+                threads.append(threading.Thread(target=worker, args=(index,), daemon=True))
+
+        self._wall_start = time.perf_counter()
+        self._wall_end = None
+        for t in threads:
+            t.start()
+
+        try:
+            buffer = {}
+            next_seq = 0
+
+            while True:
+                job = out_queue.get()
+                if job is _END:
+                    break
+
+                seq, _, value = job
+                if seq < 0 or not self.ordered:
+                    if seq >= 0:
+                        in_flight.release()
+                    yield value
+                    continue
+
+                # Output ordered: tahan hasil sampai giliran seq-nya
+                buffer[seq] = value
+                while next_seq in buffer:
+                    in_flight.release()
+                    yield buffer.pop(next_seq)
+                    next_seq += 1
+        finally:
+            stop.set()
+            self._wall_end = time.perf_counter()
+            for executor in executors:
+                if executor is not None:
+                    executor.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+    # STATISTIK
+    # ------------------------------------------------------------------
+    def stats(self) -> dict:
+        """
+        Statistik per stage.
+
+        RETURN:
+        stats : dict
+            nama stage → {
+                "items", "errors", "workers",
+                "throughput"   : item/detik (wall clock),
+                "capacity"     : item/detik maksimum jika semua worker sibuk,
+                "utilization"  : 0..1, rasio waktu sibuk worker
+            }
+            + "bottleneck": nama stage dengan utilisasi tertinggi
+        """
+        if self._wall_start is None:
+            return {}
+
+        end = self._wall_end or time.perf_counter()
+        wall = max(end - self._wall_start, 1e-9)
+
+        result = {}
+        for stage in self.stages:
+            mean = stage.busy_seconds / stage.items if stage.items else 0.0
+            result[stage.name] = {
+                "items": stage.items,
+                "errors": stage.errors,
+                "workers": stage.workers,
+                "throughput": stage.items / wall,
+                "capacity": stage.workers / mean if mean else 0.0,
+                "utilization": stage.busy_seconds / (stage.workers * wall)
+            }
+
+        result["bottleneck"] = max(
+            (s.name for s in self.stages),
+            key=lambda name: result[name]["utilization"]
+        )
+        return result
+
+
+# ======================================================================
+# PIPELINE STRUK: OCR → CLEAN → CLASSIFY + REASONING
+# ======================================================================
+def _ocr_stage(path):
+    from core.ocr_processor import ocr_image
+    return {"path": path, "text": ocr_image(path)}
+
+
+def _clean_stage(record):
+    from core.text_cleaner import clean_text
+    record["tokens"] = clean_text(record["text"])
+    return record
+
+
+def _classify_stage(record):
+    from core.search_classifier import classify_tokens
+    result = classify_tokens(record.pop("tokens"))
+    record["category"] = result.best_category
+    record["scores"] = result.score_table
+    record["reasoning"] = result.reasoning_tokens
+    return record
+
+
+def build_receipt_pipeline(ocr_workers: int = None, clean_workers: int = 1,
+                           classify_workers: int = 1, queue_size: int = None,
+                           ordered: bool = True) -> Pipeline:
+    """
+    Membuat pipeline lengkap untuk aliran path gambar struk.
+
+    Output per item (dict):
+        {"path", "text", "category", "scores", "reasoning"}
+    atau StageError jika gagal.
+
+    PARAMETER:
+    ocr_workers : int
+        Worker OCR (default: jumlah core CPU; Tesseract berjalan
+        sebagai subprocess sehingga thread cukup)
+    clean_workers, classify_workers : int
+        Worker untuk stage cleaning & klasifikasi
+    queue_size : int
+        Kapasitas queue tiap stage (default: 4x workers stage tsb)
+    ordered : bool
+        True → output sesuai urutan input
+    """
+    ocr_workers = ocr_workers or os.cpu_count() or 1
+
+    return Pipeline([
+        Stage("ocr", _ocr_stage, ocr_workers, queue_size),
+        Stage("clean", _clean_stage, clean_workers, queue_size),
+        Stage("classify", _classify_stage, classify_workers, queue_size),
+    ], ordered=ordered)
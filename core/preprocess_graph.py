@@ -0,0 +1,267 @@
+"""
+preprocess_graph.py
+--------------------
+Pipeline preprocessing deklaratif dengan cache per stage, untuk
+eksperimen tuning OCR.
+
+Masalah:
+    Langkah di preprocess_image() ter-hardcode. Setiap eksperimen
+    (ganti threshold, tambah denoise, dll) men-decode dan memproses
+    ulang semua gambar dari awal.
+
+Solusi:
+1. Pipeline = list stage bernama + parameter, misalnya:
+       PreprocessPipeline([
+           ("threshold", {"value": 150, "otsu": True}),
+           ("blur", {"kernel": 3}),
+       ])
+2. Hasil antara di-memo dengan key (hash gambar, prefix stage).
+   Jika hanya stage terakhir yang berubah, stage sebelumnya diambil dari
+   cache → hanya stage terakhir yang dijalankan ulang.
+3. Waktu tiap stage (dan cache hit) dicatat → timings(), per posisi
+   (index, nama): stage yang sama dua kali di pipeline tercatat terpisah.
+
+Stage baru bisa ditambahkan dengan decorator @register_stage("nama").
+Stage "decode" selalu dijalankan pertama (lihat load_grayscale).
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+
+from core.ocr_processor import (
+    DEFAULT_MAX_IMAGE_BYTES,
+    load_grayscale,
+)
+
+
+# ======================================================================
+# 1. REGISTRY STAGE
+# ======================================================================
+STAGES = {}
+
+
+def register_stage(name: str):
+    """
+    Decorator untuk mendaftarkan stage: fn(gray, **params) → gambar baru.
+    Stage TIDAK boleh mengubah array input (in-place).
+    """
+    def decorator(fn):
+        STAGES[name] = fn
+        return fn
+    return decorator
+
+
+@register_stage("threshold")
+def _threshold(img, value=150, otsu=True):
+    flags = cv2.THRESH_BINARY + (cv2.THRESH_OTSU if otsu else 0)
+    return cv2.threshold(img, value, 255, flags)[1]
+
+
+@register_stage("adaptive_threshold")
+def _adaptive_threshold(img, block_size=31, c=10):
+    return cv2.adaptiveThreshold(
+        img, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, block_size, c
+    )
+
+
+@register_stage("blur")
+def _blur(img, kernel=3):
+    return cv2.GaussianBlur(img, (kernel, kernel), 0)
+
+
+@register_stage("median")
+def _median(img, kernel=3):
+    return cv2.medianBlur(img, kernel)
+
+
+@register_stage("denoise")
+def _denoise(img, h=10):
+    return cv2.fastNlMeansDenoising(img, None, h, 7, 21)
+
+
+@register_stage("deskew")
+def _deskew(img):
+    from core.adaptive_ocr import deskew
+    return deskew(img)
+
+
+@register_stage("resize")
+def _resize(img, scale=1.0):
+    if scale == 1.0:
+        return img.copy()
+    interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_CUBIC
+    return cv2.resize(img, None, fx=scale, fy=scale, interpolation=interpolation)
+
+
+# ======================================================================
+# 2. CACHE HASIL ANTARA (LRU, DIBATASI UKURAN)
+# ======================================================================
+class StageCache:
+    """
+    Cache in-memory: (hash gambar, prefix stage) → array hasil.
+    Dibatasi total byte; entry yang paling lama tidak dipakai dibuang.
+    """
+
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if value.nbytes > self.max_bytes:
+            return
+
+        # Hasil cache dibagi antar pipeline → kunci agar tidak diubah
+        value.flags.writeable = False
+
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._data[key] = value
+            self._bytes += value.nbytes
+
+            while self._bytes > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+
+# Cache bersama → pipeline berbeda dengan prefix sama saling berbagi hasil
+_shared_cache = StageCache()
+
+
+def _freeze(params: dict):
+    """Parameter → tuple yang bisa dijadikan key dict."""
+    return tuple(sorted(params.items()))
+
+
+def _image_hash(path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+# ======================================================================
+# 3. PIPELINE
+# ======================================================================
+class PreprocessPipeline:
+    """
+    Pipeline preprocessing deklaratif.
+
+    PARAMETER:
+    stages : list of (nama_stage, dict_parameter)
+    target_text_height, max_image_bytes :
+        Parameter stage "decode" (lihat load_grayscale)
+    cache : StageCache (opsional)
+        Default: cache bersama modul ini
+    """
+
+    def __init__(self, stages, target_text_height=None,
+                 max_image_bytes=DEFAULT_MAX_IMAGE_BYTES, cache=None):
+        for name, _ in stages:
+            if name not in STAGES:
+                raise ValueError(f"Stage tidak dikenal: {name}")
+
+        self.stages = [(name, dict(params)) for name, params in stages]
+        self.decode_params = {
+            "target_text_height": target_text_height,
+            "max_bytes": max_image_bytes
+        }
+        self.cache = cache if cache is not None else _shared_cache
+
+        # (index, nama stage) → {"runs", "cache_hits", "seconds"}; index 0 = decode
+        self._timings = {
+            (i, name): {"runs": 0, "cache_hits": 0, "seconds": 0.0}
+            for i, (name, _) in enumerate([("decode", None)] + self.stages)
+        }
+
+    def _record(self, index, name, seconds=0.0, hit=False):
+        entry = self._timings.setdefault(
+            (index, name), {"runs": 0, "cache_hits": 0, "seconds": 0.0}
+        )
+        if hit:
+            entry["cache_hits"] += 1
+        else:
+            entry["runs"] += 1
+            entry["seconds"] += seconds
+
+    def run(self, path):
+        """
+        Menjalankan pipeline pada satu gambar.
+
+        RETURN:
+        image : numpy array (read-only jika berasal dari cache)
+        """
+        image_hash = _image_hash(path)
+
+        # Key prefix untuk setiap posisi: decode, decode+stage1, ...
+        prefix = [("decode", _freeze(self.decode_params))]
+        keys = [(image_hash, tuple(prefix))]
+        for name, params in self.stages:
+            prefix.append((name, _freeze(params)))
+            keys.append((image_hash, tuple(prefix)))
+
+        # Cari prefix terpanjang yang sudah ada di cache
+        start_index = -1
+        image = None
+        for i in range(len(keys) - 1, -1, -1):
+            image = self.cache.get(keys[i])
+            if image is not None:
+                start_index = i
+                break
+
+        steps = [("decode", None)] + self.stages
+        for i in range(start_index + 1):
+            self._record(i, steps[i][0], hit=True)
+
+        # Jalankan stage sisanya
+        for i in range(start_index + 1, len(steps)):
+            name, params = steps[i]
+            t0 = time.perf_counter()
+            if i == 0:
+                image = load_grayscale(path, **self.decode_params)
+            else:
+                image = STAGES[name](image, **params)
+            self._record(i, name, time.perf_counter() - t0)
+            self.cache.put(keys[i], image)
+
+        return image
+
+    def timings(self) -> dict:
+        """
+        Waktu per stage: jumlah eksekusi, cache hit, total & rata-rata detik.
+
+        RETURN:
+        report : dict (index, nama stage) → statistik, urut sesuai pipeline
+                 (index 0 = decode)
+        """
+        report = {}
+        for key, entry in self._timings.items():
+            report[key] = dict(entry)
+            report[key]["mean_seconds"] = (
+                entry["seconds"] / entry["runs"] if entry["runs"] else 0.0
+            )
+        return report
+
+
+# Pipeline yang setara dengan preprocess_image() default
+DEFAULT_STAGES = [
+    ("threshold", {"value": 150, "otsu": True}),
+    ("blur", {"kernel": 3}),
+]
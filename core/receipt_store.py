@@ -0,0 +1,565 @@
+"""
+receipt_store.py
+-----------------
+Penyimpanan lokal (SQLite) untuk hasil klasifikasi struk, supaya
+pertanyaan seperti "berapa pengeluaran makanan bulan ini?" bisa dijawab
+langsung tanpa Gemini.
+
+Yang disimpan per struk:
+    tanggal struk, teks OCR, kategori, tabel skor, token pendukung
+    (matched tokens), dan nominal total (dibaca dari baris "TOTAL")
+
+Konsep:
+1. Index (category, receipt_date, amount) dan (receipt_date, category, amount)
+   untuk query per struk (recent, filter kategori / tanggal)
+2. Agregat inkremental: tabel spending_daily (kategori, hari) dan
+   spending_monthly (kategori, bulan) berisi jumlah struk + total nominal.
+   Setiap insert menambah 1 baris agregat per tabel (UPSERT, O(1)) dalam
+   transaksi yang sama → query agregat tidak pernah memindai tabel struk,
+   ukurannya hanya kategori × periode
+3. add_many(): bulk insert dalam satu transaksi (executemany); agregat
+   dijumlahkan dulu per chunk di memori
+4. answer_spending_question(): hanya pertanyaan "lookup" yang jelas
+   (kata pengeluaran + kategori / periode eksplisit, tanpa kata
+   saran / analisis) dijawab dari store; pertanyaan lain tetap dikirim
+   ke Gemini
+   (lihat juga core/insight_prompt.py untuk ringkasan yang dikirim ke Gemini)
+
+Lokasi default file store:
+    ~/.receiptsorter/receipts.sqlite3
+Bisa diganti dengan environment variable RECEIPT_STORE.
+"""
+
+import datetime
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from core.search_classifier import category_keywords, classify_and_explain
+from core.text_cleaner import clean_text
+
+
+DEFAULT_STORE_PATH = os.environ.get(
+    "RECEIPT_STORE",
+    os.path.join(os.path.expanduser("~"), ".receiptsorter", "receipts.sqlite3")
+)
+
+# Jumlah baris per executemany di add_many()
+BULK_CHUNK_SIZE = 10000
+
+# Tabel agregat inkremental: (nama tabel, kolom periode)
+_AGGREGATE_TABLES = (("spending_daily", "day"), ("spending_monthly", "month"))
+
+
+# ======================================================================
+# 1. EKSTRAKSI NOMINAL & TANGGAL DARI TEKS OCR
+# ======================================================================
+_AMOUNT_PATTERN = re.compile(r"\d{1,3}(?:[.,]\d{3})+|\d+")
+_DATE_PATTERN = re.compile(r"\b(\d{1,2})[/\-.](\d{1,2})[/\-.](\d{2,4})\b")
+
+
+def extract_total(text: str):
+    """
+    Membaca nominal total dari teks struk.
+
+    Dipakai baris terakhir yang mengandung kata "total" (bukan "subtotal"),
+    nominal = angka terbesar di baris tersebut. "12.500" dan "12,500"
+    dibaca sebagai 12500.
+
+    RETURN:
+    amount : int atau None jika tidak ditemukan
+    """
+    for line in reversed(text.lower().splitlines()):
+        if "total" not in line or "subtotal" in line or "sub total" in line:
+            continue
+        numbers = [int(re.sub(r"[.,]", "", n)) for n in _AMOUNT_PATTERN.findall(line)]
+        if numbers:
+            return max(numbers)
+    return None
+
+
+def extract_date(text: str):
+    """
+    Membaca tanggal pertama berformat dd/mm/yyyy (atau - dan .) dari teks.
+
+    RETURN:
+    date : string ISO "YYYY-MM-DD" atau None
+    """
+    for day, month, year in _DATE_PATTERN.findall(text):
+        year = int(year)
+        if year < 100:
+            year += 2000
+        try:
+            return datetime.date(year, int(month), int(day)).isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+# ======================================================================
+# 2. STORE
+# ======================================================================
+class ReceiptStore:
+    """
+    Penyimpanan struk + hasil klasifikasi di SQLite.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS receipts ("
+            " id INTEGER PRIMARY KEY,"
+            " receipt_date TEXT NOT NULL,"
+            " category TEXT NOT NULL,"
+            " amount INTEGER,"
+            " text TEXT NOT NULL,"
+            " scores TEXT NOT NULL,"
+            " matched_tokens TEXT NOT NULL,"
+            " source_path TEXT,"
+            " created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_receipts_category_date"
+            " ON receipts(category, receipt_date, amount)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_receipts_date_category"
+            " ON receipts(receipt_date, category, amount)"
+        )
+        for table, period in _AGGREGATE_TABLES:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                " category TEXT NOT NULL,"
+                f" {period} TEXT NOT NULL,"
+                " count INTEGER NOT NULL,"
+                " total INTEGER NOT NULL,"
+                f" PRIMARY KEY (category, {period})) WITHOUT ROWID"
+            )
+        self._conn.commit()
+
+        # Store lama (sebelum ada tabel agregat) → bangun agregat sekali
+        has_receipts = self._conn.execute("SELECT 1 FROM receipts LIMIT 1").fetchone()
+        has_aggregates = self._conn.execute("SELECT 1 FROM spending_monthly LIMIT 1").fetchone()
+        if has_receipts and not has_aggregates:
+            self.rebuild_aggregates()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM receipts").fetchone()[0]
+
+    # ------------------------------------------------------------------
+    # INSERT
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _row(record: dict, now: float) -> tuple:
+        """
+        dict struk → tuple kolom. Field yang tidak ada dilengkapi:
+        klasifikasi (classify_and_explain), nominal (extract_total),
+        tanggal (extract_date, lalu hari ini).
+        """
+        text = record["text"]
+
+        if record.get("category") is None or record.get("scores") is None:
+            result = classify_and_explain(text)
+            category, scores, matched = (
+                result.best_category, result.score_table, result.matched_tokens
+            )
+        else:
+            category, scores = record["category"], record["scores"]
+            matched = record.get("matched_tokens") or {}
+
+        amount = record.get("amount")
+        if amount is None:
+            amount = extract_total(text)
+
+        receipt_date = (
+            record.get("receipt_date")
+            or extract_date(text)
+            or datetime.date.today().isoformat()
+        )
+
+        return (
+            receipt_date, category, amount, text,
+            json.dumps(scores), json.dumps(matched),
+            record.get("source_path"), now
+        )
+
+    _INSERT_SQL = (
+        "INSERT INTO receipts (receipt_date, category, amount, text, scores,"
+        " matched_tokens, source_path, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+    )
+
+    def _update_aggregates(self, rows):
+        """
+        Menambahkan baris struk (tuple dari _row) ke tabel agregat.
+        Dipanggil di dalam transaksi insert (lock sudah dipegang).
+        """
+        daily = {}
+        monthly = {}
+        for row in rows:
+            receipt_date, category, amount = row[0], row[1], row[2] or 0
+            for buckets, period in ((daily, receipt_date), (monthly, receipt_date[:7])):
+                entry = buckets.get((category, period))
+                if entry is None:
+                    buckets[(category, period)] = [1, amount]
+                else:
+                    entry[0] += 1
+                    entry[1] += amount
+
+        for (table, period), buckets in zip(_AGGREGATE_TABLES, (daily, monthly)):
+            self._conn.executemany(
+                f"INSERT INTO {table} (category, {period}, count, total) VALUES (?, ?, ?, ?)"
+                f" ON CONFLICT (category, {period}) DO UPDATE SET"
+                " count = count + excluded.count, total = total + excluded.total",
+                [(category, key, count, total) for (category, key), (count, total) in buckets.items()]
+            )
+
+    def rebuild_aggregates(self):
+        """Menghitung ulang tabel agregat dari seluruh struk (sekali, untuk migrasi)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM spending_daily")
+            self._conn.execute("DELETE FROM spending_monthly")
+            self._conn.execute(
+                "INSERT INTO spending_daily (category, day, count, total)"
+                " SELECT category, receipt_date, COUNT(*), COALESCE(SUM(amount), 0)"
+                " FROM receipts GROUP BY category, receipt_date"
+            )
+            self._conn.execute(
+                "INSERT INTO spending_monthly (category, month, count, total)"
+                " SELECT category, substr(day, 1, 7), SUM(count), SUM(total)"
+                " FROM spending_daily GROUP BY category, substr(day, 1, 7)"
+            )
+            self._conn.commit()
+
+    def add(self, text: str, result=None, receipt_date: str = None,
+            amount: int = None, source_path: str = None) -> int:
+        """
+        Menyimpan satu struk.
+
+        PARAMETER:
+        text : string
+            Teks OCR / input
+        result : ClassificationResult (opsional)
+            Hasil classify_and_explain(); None → diklasifikasi di sini
+        receipt_date : string "YYYY-MM-DD" (opsional)
+        amount : int (opsional)
+            Nominal total; None → dibaca dari teks (extract_total)
+        source_path : string (opsional)
+
+        RETURN:
+        id : int
+        """
+        record = {
+            "text": text,
+            "receipt_date": receipt_date,
+            "amount": amount,
+            "source_path": source_path
+        }
+        if result is not None:
+            record["category"] = result.best_category
+            record["scores"] = result.score_table
+            record["matched_tokens"] = result.matched_tokens
+
+        row = self._row(record, time.time())
+        with self._lock:
+            cursor = self._conn.execute(self._INSERT_SQL, row)
+            self._update_aggregates([row])
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def add_many(self, records) -> int:
+        """
+        Bulk insert banyak struk dalam satu transaksi.
+
+        PARAMETER:
+        records : iterable of dict
+            {"text", "category", "scores", "matched_tokens",
+             "receipt_date", "amount", "source_path"}
+            Hanya "text" yang wajib (lihat _row untuk default).
+
+        RETURN:
+        count : int
+            Jumlah struk yang disimpan
+        """
+        now = time.time()
+        count = 0
+        chunk = []
+
+        with self._lock:
+            try:
+                for record in records:
+                    chunk.append(self._row(record, now))
+                    if len(chunk) >= BULK_CHUNK_SIZE:
+                        self._conn.executemany(self._INSERT_SQL, chunk)
+                        self._update_aggregates(chunk)
+                        count += len(chunk)
+                        chunk = []
+                if chunk:
+                    self._conn.executemany(self._INSERT_SQL, chunk)
+                    self._update_aggregates(chunk)
+                    count += len(chunk)
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+
+        return count
+
+    # ------------------------------------------------------------------
+    # QUERY
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _where(category=None, start=None, end=None, date_column="receipt_date"):
+        clauses, params = [], []
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        if start is not None:
+            clauses.append(f"{date_column} >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append(f"{date_column} <= ?")
+            params.append(end)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _aggregate_source(self, category=None, start=None, end=None):
+        """
+        Tabel agregat yang paling kecil untuk rentang tanggal ini:
+        rentang bulan penuh (start tanggal 1 / tanpa start, tanpa end)
+        → spending_monthly, selain itu → spending_daily.
+
+        RETURN:
+        (sql_from_where, params, period_column)
+        """
+        if end is None and (start is None or start.endswith("-01")):
+            start_month = start[:7] if start is not None else None
+            where, params = self._where(category, start_month, date_column="month")
+            return "spending_monthly" + where, params, "month"
+
+        where, params = self._where(category, start, end, date_column="day")
+        return "spending_daily" + where, params, "day"
+
+    def get(self, receipt_id: int):
+        """Satu struk lengkap sebagai dict, atau None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, receipt_date, category, amount, text, scores,"
+                " matched_tokens, source_path FROM receipts WHERE id = ?",
+                (receipt_id,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return {
+            "id": row[0],
+            "receipt_date": row[1],
+            "category": row[2],
+            "amount": row[3],
+            "text": row[4],
+            "scores": json.loads(row[5]),
+            "matched_tokens": json.loads(row[6]),
+            "source_path": row[7]
+        }
+
+    def total_spent(self, category: str = None, start: str = None, end: str = None) -> dict:
+        """
+        Total nominal dan jumlah struk (opsional: per kategori / rentang tanggal,
+        batas tanggal inklusif "YYYY-MM-DD").
+
+        RETURN:
+        {"count", "total"}
+        """
+        source, params, _ = self._aggregate_source(category, start, end)
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COALESCE(SUM(count), 0), COALESCE(SUM(total), 0) FROM " + source, params
+            ).fetchone()
+        return {"count": count, "total": total}
+
+    def spending_by_category(self, start: str = None, end: str = None) -> dict:
+        """
+        RETURN:
+        {kategori: {"count", "total"}} untuk rentang tanggal (opsional)
+        """
+        source, params, _ = self._aggregate_source(None, start, end)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT category, SUM(count), SUM(total) FROM " + source + " GROUP BY category",
+                params
+            ).fetchall()
+        return {category: {"count": count, "total": total} for category, count, total in rows}
+
+    def spending_by_month(self, category: str = None, start: str = None, end: str = None) -> list:
+        """
+        RETURN:
+        list of {"month": "YYYY-MM", "count", "total"} urut bulan
+        """
+        source, params, period = self._aggregate_source(category, start, end)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT substr({period}, 1, 7) AS m, SUM(count), SUM(total) FROM "
+                + source + " GROUP BY m ORDER BY m",
+                params
+            ).fetchall()
+        return [{"month": month, "count": count, "total": total} for month, count, total in rows]
+
+    def recent(self, limit: int = 20, category: str = None) -> list:
+        """Struk terbaru (tanpa teks lengkap) untuk ditampilkan di GUI."""
+        where, params = self._where(category)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, receipt_date, category, amount FROM receipts"
+                + where + " ORDER BY receipt_date DESC, id DESC LIMIT ?",
+                params + [limit]
+            ).fetchall()
+        return [
+            {"id": r[0], "receipt_date": r[1], "category": r[2], "amount": r[3]}
+            for r in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_receipt_store() -> ReceiptStore:
+    """Store default (dibuat saat pertama dipakai)."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = ReceiptStore()
+        return _default_store
+
+
+# ======================================================================
+# 3. JAWABAN LOKAL UNTUK PERTANYAAN PENGELUARAN
+# ======================================================================
+# Kata yang menandakan pertanyaan tentang jumlah pengeluaran
+SPENDING_WORDS = {
+    "berapa", "total", "habis", "pengeluaran", "belanja", "spend", "spent",
+    "spending", "jumlah", "keluar"
+}
+
+# Kata yang menandakan pertanyaan saran / analisis → selalu ke Gemini
+ANALYSIS_WORDS = {
+    "bagaimana", "kenapa", "mengapa", "cara", "saran", "tips", "anomali",
+    "jelaskan", "analisis", "analisa", "bandingkan", "apakah", "naik", "turun",
+    "hemat", "mengurangi", "kurangi", "sebaiknya", "why", "advice", "anomaly",
+    "compare", "explain"
+}
+
+
+def _format_rupiah(amount: int) -> str:
+    return "Rp " + f"{amount:,}".replace(",", ".")
+
+
+def _parse_period(tokens: list, today: datetime.date):
+    """
+    Periode dicocokkan per token (pasangan token berurutan), bukan
+    substring: "sehari ini" / "sebulan ini" tidak dianggap "hari ini" /
+    "bulan ini".
+
+    RETURN:
+    (start, end, label) ; start/end None = tanpa batas
+                          label None = periode tidak disebut
+    """
+    words = set(tokens)
+    pairs = set(zip(tokens, tokens[1:]))
+
+    if ("hari", "ini") in pairs or "today" in words:
+        return today.isoformat(), today.isoformat(), "hari ini"
+    if ("minggu", "ini") in pairs or "week" in words:
+        start = today - datetime.timedelta(days=today.weekday())
+        return start.isoformat(), today.isoformat(), "minggu ini"
+    if ("bulan", "lalu") in pairs or ("last", "month") in pairs:
+        end = today.replace(day=1) - datetime.timedelta(days=1)
+        return end.replace(day=1).isoformat(), end.isoformat(), "bulan lalu"
+    if ("bulan", "ini") in pairs or "month" in words:
+        return today.replace(day=1).isoformat(), today.isoformat(), "bulan ini"
+    if ("tahun", "ini") in pairs or "year" in words:
+        return today.replace(month=1, day=1).isoformat(), today.isoformat(), "tahun ini"
+    if ("semua", "waktu") in pairs or "keseluruhan" in words or ("all", "time") in pairs:
+        return None, None, "semua waktu"
+    return None, None, None
+
+
+def _parse_category(tokens: list):
+    """Kategori yang disebut di pertanyaan (nama kategori), atau None."""
+    token_set = set(tokens)
+    for category in category_keywords:
+        if set(category.split()) <= token_set:
+            return category
+    return None
+
+
+def answer_spending_question(question: str, store: ReceiptStore = None, today=None):
+    """
+    Menjawab pertanyaan pengeluaran sederhana dari store lokal.
+
+    Hanya pertanyaan lookup yang dijawab: ada kata pengeluaran, menyebut
+    kategori atau periode secara eksplisit, dan tidak mengandung kata
+    saran / analisis (ANALYSIS_WORDS).
+
+    Contoh dijawab lokal:
+        "berapa pengeluaran makanan bulan ini?"
+        "total belanja minggu ini"
+    Contoh diteruskan ke Gemini (RETURN None):
+        "bagaimana cara mengurangi pengeluaran makanan saya?"
+        "apakah ada anomali pada pengeluaran bulan ini?"
+        "berapa kalori dalam nasi goreng?"
+
+    PARAMETER:
+    question : string
+    store : ReceiptStore (default: get_receipt_store())
+    today : datetime.date (default: hari ini; untuk pengujian)
+
+    RETURN:
+    answer : string, atau None jika bukan pertanyaan pengeluaran
+             (pemanggil sebaiknya meneruskan ke Gemini)
+    """
+    tokens = clean_text(question)
+    if not SPENDING_WORDS.intersection(tokens) or ANALYSIS_WORDS.intersection(tokens):
+        return None
+
+    today = today or datetime.date.today()
+    start, end, period = _parse_period(tokens, today)
+    category = _parse_category(tokens)
+    if category is None and period is None:
+        return None
+
+    store = store if store is not None else get_receipt_store()
+    period = period or "semua waktu"
+
+    if category is not None:
+        result = store.total_spent(category, start, end)
+        return (
+            f"Pengeluaran {category} ({period}): {_format_rupiah(result['total'])} "
+            f"dari {result['count']} struk."
+        )
+
+    per_category = store.spending_by_category(start, end)
+    if not per_category:
+        return f"Belum ada struk tersimpan untuk periode ini ({period})."
+
+    total = sum(item["total"] for item in per_category.values())
+    count = sum(item["count"] for item in per_category.values())
+    lines = [f"Total pengeluaran ({period}): {_format_rupiah(total)} dari {count} struk."]
+    for name, item in sorted(per_category.items(), key=lambda kv: -kv[1]["total"]):
+        lines.append(f" - {name:<22} {_format_rupiah(item['total'])} ({item['count']} struk)")
+    return "\n".join(lines)
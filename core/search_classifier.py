@@ -13,18 +13,143 @@ Modul ini dipakai oleh TabClassify.
 Alur:
 1. Teks → clean_text() → list token
 2. Hitung skor kecocokan token terhadap kata kunci setiap kategori
+   (lewat inverted index token → kategori, satu kali lewat token)
 3. Simpan skor ke dictionary
 4. Pilih kategori dengan skor terbesar (Greedy)
 """
 
-from core.text_cleaner import clean_text
+from dataclasses import dataclass, field
+
+from core import metrics
+from core.text_cleaner import clean_text, clean_batch
 
 
 # ======================================================================
 # 1. DEFINISI KATA KUNCI UNTUK SETIAP KATEGORI
 # ======================================================================
+class KeywordList(list):
+    """
+    List kata kunci satu kategori. Setiap perubahan (append, edit in-place,
+    hapus, sort, ...) menaikkan versi Taxonomy pemiliknya.
+    """
+
+    def __init__(self, keywords=(), owner=None):
+        super().__init__(keywords)
+        self._owner = owner
+
+    def _changed(self):
+        if self._owner is not None:
+            self._owner.touch()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed()
+
+    def __iadd__(self, other):
+        result = super().__iadd__(other)
+        self._changed()
+        return result
+
+    def __imul__(self, other):
+        result = super().__imul__(other)
+        self._changed()
+        return result
+
+    def append(self, value):
+        super().append(value)
+        self._changed()
+
+    def extend(self, values):
+        super().extend(values)
+        self._changed()
+
+    def insert(self, index, value):
+        super().insert(index, value)
+        self._changed()
+
+    def pop(self, index=-1):
+        value = super().pop(index)
+        self._changed()
+        return value
+
+    def remove(self, value):
+        super().remove(value)
+        self._changed()
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._changed()
+
+    def reverse(self):
+        super().reverse()
+        self._changed()
+
+
+class Taxonomy(dict):
+    """
+    dict kategori → KeywordList dengan nomor versi yang naik pada SETIAP
+    perubahan (kategori ditambah / dihapus / diganti, atau kata kunci
+    diubah in-place). Nilai list biasa otomatis dibungkus KeywordList.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self.version = 0
+        self.update(*args, **kwargs)
+
+    def touch(self):
+        self.version += 1
+
+    def _wrap(self, keywords) -> KeywordList:
+        return KeywordList(keywords, owner=self)
+
+    def __setitem__(self, category, keywords):
+        super().__setitem__(category, self._wrap(keywords))
+        self.touch()
+
+    def __delitem__(self, category):
+        super().__delitem__(category)
+        self.touch()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def update(self, *args, **kwargs):
+        for category, keywords in dict(*args, **kwargs).items():
+            super().__setitem__(category, self._wrap(keywords))
+        self.touch()
+
+    def setdefault(self, category, keywords=()):
+        if category not in self:
+            self[category] = keywords
+        return self[category]
+
+    def pop(self, category, *default):
+        value = super().pop(category, *default)
+        self.touch()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self.touch()
+        return item
+
+    def clear(self):
+        super().clear()
+        self.touch()
+
+
 # Kamu bisa memperluas daftar kategori kapan pun
-category_keywords = {
+category_keywords = Taxonomy({
     "makanan": [
         "mie", "ayam", "nasi", "minum", "air", "kopi", "gula", "coklat",
         "roti", "snack", "teh", "susu", "burger", "kentang", "ikan"
@@ -45,60 +170,342 @@ category_keywords = {
         "obat", "vitamin", "masker", "handsanitizer", "paracetamol",
         "supplement"
     ]
-}
+})
 
 
 # ======================================================================
-# 2. BEST-FIRST SEARCH / GREEDY HEURISTIC
+# 2. INVERTED INDEX: TOKEN → KATEGORI
 # ======================================================================
-def classify_text(text: str):
+# Daripada mengecek "token in keywords" untuk setiap kategori
+# (O(kategori × token × keyword)), kata kunci dikompilasi sekali menjadi
+# hash map token → tuple kategori. Skoring cukup satu kali lewat token.
+#
+# Index otomatis dibangun ulang jika category_keywords berubah: Taxonomy
+# menaikkan versi pada setiap perubahan (termasuk edit in-place seperti
+# category_keywords["makanan"][0] = "bakso"), jadi cukup membandingkan
+# versi (O(1)).
+_keyword_index = None
+_index_signature = None
+
+
+def _taxonomy_signature():
     """
-    Melakukan klasifikasi kategori berdasarkan heuristic kecocokan kata.
+    Sidik jari category_keywords untuk mendeteksi perubahan taksonomi.
+
+    Taxonomy → (id, versi). Jika category_keywords diganti dict biasa,
+    dipakai seluruh isinya (O(jumlah kata kunci)) supaya tetap akurat.
+    """
+    if isinstance(category_keywords, Taxonomy):
+        return id(category_keywords), category_keywords.version
+
+    return (
+        id(category_keywords),
+        tuple((cat, tuple(kws)) for cat, kws in category_keywords.items())
+    )
+
+
+def build_keyword_index(taxonomy: dict) -> dict:
+    """
+    Membangun inverted index dari dictionary kategori → kata kunci.
 
     PARAMETER:
-    text : string
-        Teks input (hasil OCR atau manual)
+    taxonomy : dict
+        kategori → list kata kunci
 
     RETURN:
+    index : dict
+        token → tuple kategori yang memuat token tersebut
+        (urutan kategori mengikuti urutan di taxonomy)
+    """
+    index = {}
+    for category, keywords in taxonomy.items():
+        for keyword in set(keywords):
+            index.setdefault(keyword, []).append(category)
+
+    return {token: tuple(cats) for token, cats in index.items()}
+
+
+def get_keyword_index() -> dict:
+    """
+    Mengembalikan inverted index untuk category_keywords saat ini.
+    Dibangun ulang otomatis jika taksonomi berubah.
+    """
+    global _keyword_index, _index_signature
+
+    signature = _taxonomy_signature()
+    if signature != _index_signature:
+        _keyword_index = build_keyword_index(category_keywords)
+        _index_signature = signature
+
+    return _keyword_index
+
+
+def rebuild_keyword_index():
+    """
+    Memaksa inverted index dibangun ulang. Biasanya tidak perlu:
+    perubahan category_keywords terdeteksi otomatis.
+    """
+    global _index_signature
+    _index_signature = None
+    return get_keyword_index()
+
+
+# ======================================================================
+# 3. BEST-FIRST SEARCH / GREEDY HEURISTIC
+# ======================================================================
+@dataclass
+class ClassificationResult:
+    """
+    Hasil klasifikasi + penjelasan dalam satu objek.
+
+    ATRIBUT:
     best_category : str
-        Kategori dengan skor heuristic tertinggi
+        Kategori dengan skor heuristic tertinggi ("unknown" jika teks kosong)
     score_table : dict
-        Dictionary: kategori → skor heuristic
+        kategori → skor heuristic
+    matched_tokens : dict
+        kategori → list token input yang cocok dengan kata kunci kategori
+        (urutan sesuai urutan token, duplikat tetap dihitung)
+    tokens : list
+        Token hasil clean_text()
     """
+    best_category: str
+    score_table: dict
+    matched_tokens: dict
+    tokens: list = field(default_factory=list)
 
-    # ---------------------------------------------------------------
-    # STEP 1: CLEANING → ubah teks menjadi token bersih
-    # ---------------------------------------------------------------
-    tokens = clean_text(text)
+    @property
+    def reasoning_tokens(self) -> list:
+        """Token pendukung kategori terbaik (hasil backward chaining)."""
+        return self.matched_tokens.get(self.best_category, [])
+
+
+def score_tokens(tokens: list) -> ClassificationResult:
+    """
+    Skor + pengumpulan token pendukung dari token yang SUDAH bersih,
+    tanpa metrics.
+
+    Skor dan token pendukung tiap kategori dikumpulkan dalam satu kali
+    lewat token, sehingga penjelasan (reasoning) tidak butuh biaya tambahan.
+    Dipakai langsung oleh backward_reasoning() supaya reasoning tidak
+    ikut terhitung sebagai klasifikasi.
+
+    PARAMETER:
+    tokens : list
+        Token hasil clean_text()
+
+    RETURN:
+    result : ClassificationResult
+    """
 
     # Jika teks kosong setelah cleaning → tidak bisa diklasifikasi
     if len(tokens) == 0:
-        return "unknown", {k: 0 for k in category_keywords}
+        return ClassificationResult(
+            "unknown",
+            {k: 0 for k in category_keywords},
+            {k: [] for k in category_keywords},
+            tokens
+        )
 
     # ---------------------------------------------------------------
-    # STEP 2: Hitung skor heuristic untuk setiap kategori
+    # Hitung skor heuristic untuk setiap kategori
+    # Satu kali lewat token, lookup kategori di inverted index
     # ---------------------------------------------------------------
-    score_table = {}
-
-    for category, keywords in category_keywords.items():
+    index = get_keyword_index()
+    matched_tokens = {k: [] for k in category_keywords}
 
-        # Hitung jumlah kata yang cocok
-        score = sum(1 for token in tokens if token in keywords)
+    for token in tokens:
+        for category in index.get(token, ()):
+            matched_tokens[category].append(token)
 
-        # Simpan skor kategori
-        score_table[category] = score
+    score_table = {k: len(v) for k, v in matched_tokens.items()}
 
     # ---------------------------------------------------------------
-    # STEP 3: BEST-FIRST SEARCH (Greedy)
+    # BEST-FIRST SEARCH (Greedy)
     # Pilih kategori dengan skor terbesar → O(N) sederhana
     # ---------------------------------------------------------------
     best_category = max(score_table, key=score_table.get)
 
-    return best_category, score_table
+    return ClassificationResult(best_category, score_table, matched_tokens, tokens)
+
+
+@metrics.timed("classify")
+def classify_tokens(tokens: list) -> ClassificationResult:
+    """
+    Klasifikasi dari token yang SUDAH bersih: score_tokens() + metrics
+    klasifikasi ("classify" dan classify_results per kategori).
+
+    PARAMETER:
+    tokens : list
+        Token hasil clean_text()
+
+    RETURN:
+    result : ClassificationResult
+    """
+    result = score_tokens(tokens)
+    metrics.inc("classify_results", category=result.best_category)
+    return result
+
+
+def classify_and_explain(text: str) -> ClassificationResult:
+    """
+    Klasifikasi + reasoning dengan SATU kali tokenisasi.
+
+    Dipakai GUI (TabClassify) menggantikan pasangan
+    classify_text() + backward_reasoning().
+
+    PARAMETER:
+    text : string
+        Teks input (hasil OCR atau manual)
+
+    RETURN:
+    result : ClassificationResult
+    """
+    return classify_tokens(clean_text(text))
+
+
+def classify_text(text: str):
+    """
+    Melakukan klasifikasi kategori berdasarkan heuristic kecocokan kata.
+
+    PARAMETER:
+    text : string
+        Teks input (hasil OCR atau manual)
+
+    RETURN:
+    best_category : str
+        Kategori dengan skor heuristic tertinggi
+    score_table : dict
+        Dictionary: kategori → skor heuristic
+    """
+    result = classify_and_explain(text)
+    return result.best_category, result.score_table
+
+
+# ======================================================================
+# 4. BATCH CLASSIFIER (VEKTORISASI NUMPY / SCIPY)
+# ======================================================================
+# Untuk jutaan teks, skor dihitung sebagai perkalian matriks:
+#     skor (dokumen × kategori) = C (dokumen × vocab) · K (vocab × kategori)
+# C = jumlah kemunculan token keyword di tiap dokumen (sparse)
+# K = 1 jika keyword termasuk kategori, 0 jika tidak
+# Hasilnya identik dengan classify_text() per teks.
+_keyword_matrix = None
+_matrix_index = None
+
+
+def _get_keyword_matrix():
+    """
+    Mengembalikan (vocab, K) untuk taksonomi saat ini.
+    vocab : dict token → indeks kolom
+    K     : numpy array (vocab × kategori), dibangun ulang jika taksonomi berubah
+    """
+    global _keyword_matrix, _matrix_index
+    import numpy as np
+
+    # Matriks mengikuti objek index: index baru (taksonomi berubah atau
+    # rebuild_keyword_index()) → matriks dibangun ulang
+    index = get_keyword_index()
+    if _matrix_index is not index:
+        categories = list(category_keywords)
+        cat_pos = {cat: j for j, cat in enumerate(categories)}
+        vocab = {token: i for i, token in enumerate(index)}
+
+        K = np.zeros((len(vocab), len(categories)), dtype=np.int64)
+        for token, cats in index.items():
+            for cat in cats:
+                K[vocab[token], cat_pos[cat]] = 1
+
+        _keyword_matrix = (vocab, K)
+        _matrix_index = index
+
+    return _keyword_matrix
+
+
+@metrics.timed("classify_batch")
+def classify_batch(texts, chunk_size: int = 10000):
+    """
+    Klasifikasi banyak teks sekaligus dengan perkalian matriks.
+
+    Jika SciPy terpasang, matriks dokumen × vocab dibuat sparse (CSR);
+    jika tidak, dipakai matriks NumPy biasa per chunk.
+
+    PARAMETER:
+    texts : iterable of string
+        Teks-teks input (hasil OCR atau manual)
+    chunk_size : int
+        Jumlah teks per perkalian matriks (membatasi pemakaian memori)
+
+    RETURN:
+    best_categories : list of str
+        Kategori terbaik per teks ("unknown" jika teks kosong)
+    score_tables : list of dict
+        Skor per kategori untuk setiap teks
+    """
+    import numpy as np
+    try:
+        from scipy import sparse
+    except ImportError:
+        sparse = None
+
+    vocab, K = _get_keyword_matrix()
+    categories = list(category_keywords)
+
+    best_categories = []
+    score_tables = []
+
+    texts = list(texts)
+    for start in range(0, len(texts), chunk_size):
+        chunk = texts[start:start + chunk_size]
+
+        # -----------------------------------------------------------
+        # STEP 1: token → indeks kolom (token di luar vocab dibuang)
+        # -----------------------------------------------------------
+        indptr = [0]
+        indices = []
+        empty = []
+        for tokens in clean_batch(chunk):
+            empty.append(len(tokens) == 0)
+            indices.extend(vocab[t] for t in tokens if t in vocab)
+            indptr.append(len(indices))
+
+        # -----------------------------------------------------------
+        # STEP 2: matriks hitungan C (dokumen × vocab) lalu C · K
+        # -----------------------------------------------------------
+        n_docs = len(chunk)
+        if sparse is not None:
+            data = np.ones(len(indices), dtype=np.int64)
+            C = sparse.csr_matrix(
+                (data, np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)),
+                shape=(n_docs, len(vocab))
+            )
+            C.sum_duplicates()
+            scores = np.asarray(C @ K)
+        else:
+            C = np.zeros((n_docs, len(vocab)), dtype=np.int64)
+            rows = np.repeat(np.arange(n_docs), np.diff(indptr))
+            np.add.at(C, (rows, np.asarray(indices, dtype=np.int64)), 1)
+            scores = C @ K
+
+        # -----------------------------------------------------------
+        # STEP 3: Greedy → argmax (indeks pertama jika seri, sama
+        # seperti max() di classify_text)
+        # -----------------------------------------------------------
+        best_idx = scores.argmax(axis=1).tolist()
+        for is_empty, row, best in zip(empty, scores.tolist(), best_idx):
+            if is_empty:
+                best_categories.append("unknown")
+                score_tables.append({k: 0 for k in categories})
+                continue
+
+            score_tables.append(dict(zip(categories, row)))
+            best_categories.append(categories[best])
+
+    return best_categories, score_tables
 
 
 # ======================================================================
-# 3. DEBUGGING FUNCTION
+# 5. DEBUGGING FUNCTION
 # ======================================================================
 def debug_classify(text: str):
     """
@@ -107,11 +514,10 @@ def debug_classify(text: str):
 
     Tidak dipakai GUI, tapi bagus untuk laporan.
     """
-    tokens = clean_text(text)
-    best_cat, scores = classify_text(text)
+    result = score_tokens(clean_text(text))
 
     return {
-        "tokens": tokens,
-        "scores": scores,
-        "best_category": best_cat
+        "tokens": result.tokens,
+        "scores": result.score_table,
+        "best_category": result.best_category
     }
@@ -0,0 +1,310 @@
+"""
+server.py
+----------
+Mode server HTTP lokal (tanpa GUI) untuk OCR dan klasifikasi struk,
+supaya engine bisa dipanggil dari service lain.
+
+Endpoint (semua respons JSON):
+    POST /ocr        multipart/form-data, field "image" = file gambar
+                     ?classify=1 → sekalian klasifikasi + reasoning
+                     → {"text", "error", "seconds"[, "category", "scores", "reasoning"]}
+    POST /classify   {"text": "..."}
+                     → {"category", "scores", "reasoning"}
+    POST /reasoning  {"text": "...", "category": "makanan"}
+                     → {"category", "matches"}
+    GET  /health     → {"status", "workers", "pending", "max_pending", ...}
+    GET  /metrics    → metric server dalam format teks Prometheus
+
+Konsep:
+1. Semua pekerjaan (OCR, klasifikasi, reasoning) dijalankan di process
+   pool (default: jumlah core CPU) → throughput naik sesuai jumlah core
+2. Antrian dibatasi max_pending: jika penuh, request langsung ditolak
+   dengan 503 + header Retry-After (tidak menumpuk tanpa batas)
+3. Upload gambar di-stream ke file sementara (dibatasi max_upload_bytes),
+   lalu dihapus setelah OCR selesai. Slot antrian diambil SEBELUM upload
+   dibaca, jadi saat server penuh tidak ada file yang ditulis ke disk
+4. Modul ini hanya memakai core.*; GUI (screen/*) tidak di-import sama sekali
+
+Dipakai oleh run_server.py (command-line) di root projek.
+
+Catatan:
+    Metric per stage (core/metrics.py) dari process worker tidak ikut
+    di /metrics; yang tercatat adalah latency & jumlah request per endpoint.
+
+Dependency:
+    pip install aiohttp
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from aiohttp import web
+
+from core import metrics
+from core.batch_ocr import init_worker, ocr_one
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+
+# Batas ukuran satu file upload
+DEFAULT_MAX_UPLOAD_BYTES = 20 * 1024 * 1024
+
+# Jumlah request yang boleh menunggu/berjalan per worker sebelum ditolak
+PENDING_PER_WORKER = 4
+
+
+# ======================================================================
+# 1. PEKERJAAN DI PROCESS WORKER
+# ======================================================================
+def _classify_one(text: str) -> dict:
+    from core.search_classifier import classify_and_explain
+
+    result = classify_and_explain(text)
+    return {
+        "category": result.best_category,
+        "scores": result.score_table,
+        "reasoning": result.reasoning_tokens
+    }
+
+
+def _reasoning_one(text: str, category: str) -> dict:
+    from core.backward_chain import backward_reasoning
+
+    return {"category": category, "matches": backward_reasoning(text, category)}
+
+
+def _ocr_classify_one(path: str) -> dict:
+    result = ocr_one(path)
+    if result["error"] is None:
+        result.update(_classify_one(result["text"]))
+    return result
+
+
+# ======================================================================
+# 2. HELPER HTTP
+# ======================================================================
+def _json_error(error_class, message: str, **kwargs):
+    """Exception HTTP aiohttp dengan body JSON {"error": message}."""
+    return error_class(
+        text=json.dumps({"error": message}),
+        content_type="application/json",
+        **kwargs
+    )
+
+
+async def _read_json(request, *fields) -> dict:
+    """Membaca body JSON dan memastikan field wajib ada (string)."""
+    try:
+        body = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise _json_error(web.HTTPBadRequest, "ERROR: Body harus JSON.")
+
+    if not isinstance(body, dict):
+        raise _json_error(web.HTTPBadRequest, "ERROR: Body harus objek JSON.")
+
+    for field in fields:
+        if not isinstance(body.get(field), str):
+            raise _json_error(web.HTTPBadRequest, f"ERROR: Field '{field}' (string) wajib diisi.")
+
+    return body
+
+
+# ======================================================================
+# 3. SERVER
+# ======================================================================
+class ReceiptServer:
+    """
+    Server HTTP aiohttp + process pool.
+
+    PARAMETER:
+    workers : int
+        Jumlah process worker (default: jumlah core CPU)
+    max_pending : int
+        Maksimum request di antrian + sedang diproses
+        (default: PENDING_PER_WORKER × workers)
+    max_upload_bytes : int
+        Batas ukuran file gambar yang di-upload
+    """
+
+    def __init__(self, workers: int = None, max_pending: int = None,
+                 max_upload_bytes: int = DEFAULT_MAX_UPLOAD_BYTES):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * PENDING_PER_WORKER
+        self.max_upload_bytes = max_upload_bytes
+
+        self.executor = None
+        self.pending = 0
+
+        # Statistik sederhana untuk /health
+        self.stats = {"accepted": 0, "rejected": 0, "completed": 0}
+
+    # ------------------------------------------------------------------
+    # LIFECYCLE
+    # ------------------------------------------------------------------
+    def make_app(self) -> web.Application:
+        # Body multipart sedikit lebih besar dari file (header part)
+        app = web.Application(client_max_size=self.max_upload_bytes + 64 * 1024)
+        app.add_routes([
+            web.post("/ocr", self.handle_ocr),
+            web.post("/classify", self.handle_classify),
+            web.post("/reasoning", self.handle_reasoning),
+            web.get("/health", self.handle_health),
+            web.get("/metrics", self.handle_metrics),
+        ])
+        app.on_startup.append(self._start_pool)
+        app.on_cleanup.append(self._stop_pool)
+        return app
+
+    async def _start_pool(self, app):
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker)
+
+    async def _stop_pool(self, app):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    # ------------------------------------------------------------------
+    # ANTRIAN
+    # ------------------------------------------------------------------
+    def _acquire(self, endpoint: str):
+        """
+        Mengambil satu slot antrian.
+        Antrian penuh → 503 + Retry-After.
+        """
+        if self.pending >= self.max_pending:
+            self.stats["rejected"] += 1
+            metrics.inc("server_rejected", endpoint=endpoint)
+            raise _json_error(
+                web.HTTPServiceUnavailable,
+                "ERROR: Server sibuk, coba lagi.",
+                headers={"Retry-After": "1"}
+            )
+
+        self.stats["accepted"] += 1
+        self.pending += 1
+
+    def _release(self):
+        """Mengembalikan slot yang diambil _acquire()."""
+        self.pending -= 1
+        self.stats["completed"] += 1
+
+    async def _run(self, endpoint: str, fn, *args):
+        """Menjalankan fn(*args) di process pool (slot sudah diambil)."""
+        with metrics.timer("server_request", endpoint=endpoint):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, fn, *args)
+
+    async def _submit(self, endpoint: str, fn, *args):
+        """
+        Menjalankan fn(*args) di process pool, dengan batas antrian.
+        Antrian penuh → 503 + Retry-After.
+        """
+        self._acquire(endpoint)
+        try:
+            return await self._run(endpoint, fn, *args)
+        finally:
+            self._release()
+
+    # ------------------------------------------------------------------
+    # UPLOAD
+    # ------------------------------------------------------------------
+    async def _save_upload(self, request) -> str:
+        """
+        Menyimpan field multipart "image" ke file sementara.
+
+        RETURN:
+        path : string (pemanggil wajib menghapus file)
+        """
+        if not request.content_type.startswith("multipart/"):
+            raise _json_error(web.HTTPBadRequest, "ERROR: Gunakan multipart/form-data dengan field 'image'.")
+
+        reader = await request.multipart()
+        async for part in reader:
+            if part.name != "image":
+                continue
+
+            suffix = os.path.splitext(part.filename or "")[1].lower() or ".img"
+            fd, path = tempfile.mkstemp(prefix="receipt_upload_", suffix=suffix)
+            size = 0
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    while True:
+                        chunk = await part.read_chunk()
+                        if not chunk:
+                            break
+                        size += len(chunk)
+                        if size > self.max_upload_bytes:
+                            raise web.HTTPRequestEntityTooLarge(
+                                max_size=self.max_upload_bytes, actual_size=size
+                            )
+                        f.write(chunk)
+            except BaseException:
+                os.remove(path)
+                raise
+
+            if size == 0:
+                os.remove(path)
+                raise _json_error(web.HTTPBadRequest, "ERROR: File gambar kosong.")
+            return path
+
+        raise _json_error(web.HTTPBadRequest, "ERROR: Field 'image' tidak ditemukan.")
+
+    # ------------------------------------------------------------------
+    # ENDPOINT
+    # ------------------------------------------------------------------
+    async def handle_ocr(self, request):
+        fn = _ocr_classify_one if request.query.get("classify") in ("1", "true") else ocr_one
+
+        # Cek kapasitas dulu: server penuh → 503 tanpa membaca / menyimpan upload
+        self._acquire("ocr")
+        try:
+            path = await self._save_upload(request)
+            try:
+                result = await self._run("ocr", fn, path)
+            finally:
+                os.remove(path)
+        finally:
+            self._release()
+
+        # Path sementara tidak berguna bagi pemanggil
+        result.pop("path", None)
+
+        if result["error"] is None:
+            status = 200
+        elif result["error"].startswith(("FileNotFoundError", "MemoryError")):
+            status = 422   # gambar tidak terbaca / terlalu besar
+        else:
+            status = 500
+        return web.json_response(result, status=status)
+
+    async def handle_classify(self, request):
+        body = await _read_json(request, "text")
+        return web.json_response(await self._submit("classify", _classify_one, body["text"]))
+
+    async def handle_reasoning(self, request):
+        body = await _read_json(request, "text", "category")
+        result = await self._submit("reasoning", _reasoning_one, body["text"], body["category"])
+        return web.json_response(result)
+
+    async def handle_health(self, request):
+        return web.json_response({
+            "status": "ok",
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            **self.stats
+        })
+
+    async def handle_metrics(self, request):
+        return web.Response(text=metrics.to_prometheus(), content_type="text/plain")
+
+
+def run_server(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, workers: int = None,
+               max_pending: int = None, max_upload_bytes: int = DEFAULT_MAX_UPLOAD_BYTES):
+    """Menjalankan server sampai dihentikan (Ctrl+C)."""
+    server = ReceiptServer(workers, max_pending, max_upload_bytes)
+    web.run_app(server.make_app(), host=host, port=port)
@@ -1,4 +1,13 @@
+import sys
+
+# Mode pengukuran waktu startup: python main.py --startup-profile
+# (harus diaktifkan sebelum import lain supaya semua import tercatat)
+if "--startup-profile" in sys.argv:
+    from screen import startup_profiler
+    startup_profiler.enable()
+
 import customtkinter as ctk
+from screen import startup_profiler
 from screen.welcome_screen import WelcomeScreen
 
 ctk.set_appearance_mode("dark")
@@ -17,4 +26,5 @@ class App(ctk.CTk):
 
 if __name__ == "__main__":
     app = App()
+    app.after_idle(startup_profiler.mark, "welcome screen")
     app.mainloop()
@@ -0,0 +1,53 @@
+"""
+run_batch.py
+-------------
+Entry point command-line (tanpa GUI) untuk OCR massal.
+
+Contoh:
+    python run_batch.py folder_struk/ -o hasil.jsonl
+    python run_batch.py manifest.txt -o hasil.jsonl --workers 8
+"""
+
+import argparse
+import sys
+
+from core.batch_ocr import run_batch_ocr
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Batch OCR struk belanja (tanpa GUI)."
+    )
+    parser.add_argument("source", help="Folder gambar atau file manifest (1 path per baris)")
+    parser.add_argument("-o", "--output", default="ocr_results.jsonl",
+                        help="File output JSON Lines (default: ocr_results.jsonl)")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="Jumlah process worker (default: jumlah core CPU)")
+    parser.add_argument("-r", "--recursive", action="store_true",
+                        help="Pindai sub-folder juga")
+    args = parser.parse_args()
+
+    count = 0
+
+    def show_progress(result):
+        nonlocal count
+        count += 1
+        status = "OK " if result["error"] is None else "ERR"
+        print(f"[{count}] {status} {result['path']}", file=sys.stderr)
+
+    summary = run_batch_ocr(
+        args.source,
+        args.output,
+        workers=args.workers,
+        recursive=args.recursive,
+        on_result=show_progress
+    )
+
+    print(
+        f"Selesai: {summary['ok']} OK, {summary['failed']} gagal, "
+        f"{summary['total']} total dalam {summary['seconds']} detik → {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
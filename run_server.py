@@ -0,0 +1,50 @@
+"""
+run_server.py
+--------------
+Entry point command-line untuk server HTTP lokal (tanpa GUI).
+
+Contoh:
+    python run_server.py --port 8080 --workers 8
+    curl -F image=@struk.jpg "http://127.0.0.1:8080/ocr?classify=1"
+    curl -d '{"text": "nasi goreng ayam"}' http://127.0.0.1:8080/classify
+"""
+
+import argparse
+
+from core import metrics
+from core.server import DEFAULT_HOST, DEFAULT_MAX_UPLOAD_BYTES, DEFAULT_PORT, run_server
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Server HTTP OCR & klasifikasi struk (tanpa GUI)."
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST,
+                        help=f"Alamat bind (default: {DEFAULT_HOST})")
+    parser.add_argument("-p", "--port", type=int, default=DEFAULT_PORT,
+                        help=f"Port (default: {DEFAULT_PORT})")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="Jumlah process worker (default: jumlah core CPU)")
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help="Maksimum request di antrian sebelum ditolak 503")
+    parser.add_argument("--max-upload-mb", type=float,
+                        default=DEFAULT_MAX_UPLOAD_BYTES / (1024 * 1024),
+                        help="Batas ukuran upload gambar (MB)")
+    parser.add_argument("--metrics", action="store_true",
+                        help="Aktifkan metric (GET /metrics)")
+    args = parser.parse_args()
+
+    if args.metrics:
+        metrics.enable()
+
+    run_server(
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        max_pending=args.max_pending,
+        max_upload_bytes=int(args.max_upload_mb * 1024 * 1024)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+background.py
+--------------
+Executor latar belakang bersama untuk semua tab di folder screen/.
+
+Masalah:
+    run_ocr() dan ask_gemini() butuh waktu beberapa detik. Jika dipanggil
+    langsung di callback Tkinter, seluruh window freeze.
+
+Solusi:
+1. Pekerjaan berat dijalankan di ThreadPoolExecutor bersama
+   (Tesseract berjalan sebagai subprocess & OpenCV melepas GIL,
+   jadi thread sudah cukup untuk membuat UI tetap responsif)
+2. Hasil dikirim kembali ke thread Tk lewat antrian yang dipoll
+   dengan after() setiap ~16 ms (≈ 60 fps)
+3. Setiap task mengembalikan BackgroundTask yang bisa di-cancel:
+   - task yang belum mulai → dibatalkan
+   - task yang sedang berjalan → hasilnya diabaikan (callback tidak dipanggil)
+4. stream_in_background(): untuk generator (misalnya stream_gemini),
+   setiap potongan dikirim ke on_chunk begitu tersedia
+
+Semua callback (on_chunk / on_done / on_error) SELALU dipanggil di thread Tk,
+jadi aman untuk mengubah widget.
+"""
+
+import os
+import queue
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Interval polling antrian hasil (ms) → ±60 fps
+POLL_INTERVAL_MS = 16
+
+_executor = ThreadPoolExecutor(
+    max_workers=max(4, os.cpu_count() or 1),
+    thread_name_prefix="gui-worker"
+)
+
+# Hasil dari worker thread: (task, callback, value)
+_results = queue.Queue()
+
+# Toplevel yang sedang menjalankan loop polling
+_polling_root = None
+
+
+class BackgroundTask:
+    """
+    Handle untuk satu pekerjaan latar belakang.
+    """
+
+    def __init__(self, future):
+        self.future = future
+        self.cancelled = False
+
+        # Di-set saat cancel(); pekerjaan yang sedang berjalan (misalnya
+        # stream_gemini) bisa memantaunya untuk berhenti lebih awal
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        """
+        Membatalkan task. Jika sudah berjalan, hasilnya tidak akan
+        dikirim ke callback.
+        """
+        self.cancelled = True
+        self.cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def done(self) -> bool:
+        return self.cancelled or self.future.done()
+
+
+def _poll():
+    """
+    Dipanggil di thread Tk: kirim semua hasil yang sudah siap ke callback.
+
+    Exception dari satu callback (misalnya TclError karena widget sudah
+    dihancurkan) dicetak lalu diabaikan, supaya hasil lain tetap terkirim
+    dan polling tetap berjalan.
+    """
+    global _polling_root
+
+    try:
+        while True:
+            try:
+                task, callback, value = _results.get_nowait()
+            except queue.Empty:
+                break
+
+            if task.cancelled or callback is None:
+                continue
+
+            try:
+                callback(value)
+            except Exception:
+                traceback.print_exc()
+    finally:
+        try:
+            _polling_root.after(POLL_INTERVAL_MS, _poll)
+        except Exception:
+            # Window sudah ditutup
+            _polling_root = None
+
+
+def _ensure_polling(widget):
+    global _polling_root
+
+    if _polling_root is None:
+        _polling_root = widget.winfo_toplevel()
+        _polling_root.after(POLL_INTERVAL_MS, _poll)
+
+
+def run_in_background(widget, fn, *args, on_done=None, on_error=None) -> BackgroundTask:
+    """
+    Menjalankan fn(*args) di executor latar belakang.
+
+    PARAMETER:
+    widget : widget Tk apa pun (dipakai untuk memulai polling after())
+    fn : callable
+        Pekerjaan berat (misalnya run_ocr, ask_gemini)
+    on_done : callable(result) (opsional)
+        Dipanggil di thread Tk dengan hasil fn
+    on_error : callable(exception) (opsional)
+        Dipanggil di thread Tk jika fn melempar exception
+
+    RETURN:
+    task : BackgroundTask
+    """
+    _ensure_polling(widget)
+
+    future = _executor.submit(fn, *args)
+    task = BackgroundTask(future)
+
+    def _finished(f):
+        # Berjalan di worker thread → JANGAN sentuh widget di sini
+        if f.cancelled():
+            return
+        error = f.exception()
+        if error is None:
+            _results.put((task, on_done, f.result()))
+        else:
+            _results.put((task, on_error, error))
+
+    future.add_done_callback(_finished)
+    return task
+
+
+def stream_in_background(widget, gen_fn, *args, on_chunk=None, on_done=None,
+                         on_error=None) -> BackgroundTask:
+    """
+    Menjalankan generator gen_fn(*args, cancel_event=...) di executor
+    latar belakang dan meneruskan setiap potongan ke on_chunk.
+
+    PARAMETER:
+    widget : widget Tk apa pun (dipakai untuk memulai polling after())
+    gen_fn : callable yang mengembalikan iterator (misalnya stream_gemini)
+        Harus menerima keyword cancel_event (threading.Event yang di-set
+        saat task di-cancel)
+    on_chunk : callable(chunk) (opsional)
+        Dipanggil di thread Tk untuk setiap potongan, sesuai urutan
+    on_done : callable(list_of_chunks) (opsional)
+        Dipanggil di thread Tk setelah generator habis
+    on_error : callable(exception) (opsional)
+
+    Jika task di-cancel, cancel_event di-set: generator yang memantaunya
+    berhenti tanpa menunggu potongan berikutnya, lalu ditutup (sehingga
+    request di baliknya ikut dihentikan dan thread worker bebas lagi).
+
+    RETURN:
+    task : BackgroundTask
+    """
+    _ensure_polling(widget)
+
+    # Task dibuat sebelum submit supaya potongan pertama sudah punya task
+    task = BackgroundTask(None)
+
+    def _consume():
+        chunks = []
+        iterator = gen_fn(*args, cancel_event=task.cancel_event)
+        try:
+            for chunk in iterator:
+                if task.cancelled:
+                    break
+                chunks.append(chunk)
+                _results.put((task, on_chunk, chunk))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+        return chunks
+
+    future = _executor.submit(_consume)
+    task.future = future
+
+    def _finished(f):
+        if f.cancelled():
+            return
+        error = f.exception()
+        if error is None:
+            _results.put((task, on_done, f.result()))
+        else:
+            _results.put((task, on_error, error))
+
+    future.add_done_callback(_finished)
+    return task
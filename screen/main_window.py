@@ -13,14 +13,25 @@ Tab:
 3. Insight → generative AI Gemini chatbot
 
 Semua tab sudah didefinisikan di folder screen/tabs/.
+
+Setiap tab (beserta dependency beratnya: OpenCV, pytesseract, aiohttp)
+baru di-import dan dibuat saat tab tersebut pertama kali dipilih,
+supaya window utama muncul secepat mungkin.
 """
 
+import importlib
+
 import customtkinter as ctk
 
-# Import Tab Classes
-from screen.tabs.tab_ocr import TabOCR
-from screen.tabs.tab_classify import TabClassify
-from screen.tabs.tab_insight import TabInsight
+from screen import startup_profiler
+
+
+# Nama tab → (modul, nama class, nama atribut di MainWindow)
+TAB_SPECS = {
+    "OCR": ("screen.tabs.tab_ocr", "TabOCR", "tab_ocr"),
+    "Classification": ("screen.tabs.tab_classify", "TabClassify", "tab_classify"),
+    "Insight": ("screen.tabs.tab_insight", "TabInsight", "tab_insight"),
+}
 
 
 class MainWindow(ctk.CTkFrame):
@@ -48,31 +59,44 @@ class MainWindow(ctk.CTkFrame):
             segmented_button_selected_hover_color="#5A2B8A",
             segmented_button_unselected_color="#2A2A2A",
             segmented_button_unselected_hover_color="#333333",
-            text_color="#FFFFFF"
+            text_color="#FFFFFF",
+            command=self._on_tab_selected
         )
 
         self.tab_view.pack(fill="both", expand=True, padx=20, pady=20)
 
         # ------------------------------------------------------------
-        # BUAT TAB-TAB
+        # BUAT TAB-TAB (isi tab dibuat saat pertama kali dipilih)
         # ------------------------------------------------------------
-        # Tab 1: OCR
-        tab_ocr_frame = self.tab_view.add("OCR")
-        self.tab_ocr = TabOCR(tab_ocr_frame)
-        self.tab_ocr.pack(fill="both", expand=True)
-
-        # Tab 2: Classification
-        tab_classify_frame = self.tab_view.add("Classification")
-        self.tab_classify = TabClassify(tab_classify_frame)
-        self.tab_classify.pack(fill="both", expand=True)
+        # Tab 1: OCR, Tab 2: Classification, Tab 3: Insight
+        for name, (_, _, attr) in TAB_SPECS.items():
+            self.tab_view.add(name)
+            setattr(self, attr, None)
 
-        # Tab 3: Insight
-        tab_insight_frame = self.tab_view.add("Insight")
-        self.tab_insight = TabInsight(tab_insight_frame)
-        self.tab_insight.pack(fill="both", expand=True)
+        # Tab pertama (OCR) langsung terlihat → buat sekarang
+        self._build_tab(self.tab_view.get())
 
 
         # ------------------------------------------------------------
         # NOTE:
         # Semua Tab adalah CTkFrame yang otomatis tampil dalam TabView.
         # ------------------------------------------------------------
+
+    def _on_tab_selected(self):
+        """Dipanggil CTkTabview setiap kali user berpindah tab."""
+        self._build_tab(self.tab_view.get())
+
+    def _build_tab(self, name):
+        """
+        Import modul tab dan buat isinya jika belum pernah dibuat.
+        """
+        module_name, class_name, attr = TAB_SPECS[name]
+        if getattr(self, attr) is not None:
+            return
+
+        tab_class = getattr(importlib.import_module(module_name), class_name)
+        tab = tab_class(self.tab_view.tab(name))
+        tab.pack(fill="both", expand=True)
+        setattr(self, attr, tab)
+
+        startup_profiler.mark(f"tab {name}")
@@ -0,0 +1,111 @@
+"""
+startup_profiler.py
+--------------------
+Mode pengukuran waktu startup aplikasi.
+
+Cara pakai:
+    python main.py --startup-profile
+
+Saat aktif:
+1. Setiap import modul baru dicatat waktunya
+   - total : waktu import termasuk sub-modul yang ikut di-import
+   - self  : waktu import modul itu sendiri (tanpa sub-modul)
+2. mark(label) mencetak laporan ke stderr: waktu sejak start dan
+   modul-modul yang di-import sejak mark sebelumnya (diurutkan
+   dari yang paling mahal)
+
+Jika tidak diaktifkan, mark() tidak melakukan apa pun.
+
+Import dari thread lain (misalnya task latar belakang) ikut tercatat:
+stack sub-import disimpan per thread dan _records dijaga lock.
+"""
+
+import builtins
+import sys
+import threading
+import time
+
+
+_enabled = False
+_original_import = builtins.__import__
+_start = None
+
+# (nama modul, total detik, self detik) sejak mark terakhir
+_records = []
+_records_lock = threading.Lock()
+
+# Akumulasi waktu sub-import untuk setiap level import yang sedang berjalan
+# (per thread: import di thread lain tidak boleh tercampur)
+_local = threading.local()
+
+
+def _stack() -> list:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # Jalur cepat: modul sudah pernah di-import
+    if level == 0 and name in sys.modules and not fromlist:
+        return _original_import(name, globals, locals, fromlist, level)
+
+    stack = _stack()
+    loaded_before = len(sys.modules)
+    stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - start
+        children = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+
+        # Hanya catat import yang benar-benar memuat modul baru
+        if len(sys.modules) > loaded_before:
+            with _records_lock:
+                _records.append((("." * level) + name, elapsed, elapsed - children))
+
+
+def enable():
+    """Mengaktifkan pencatatan waktu import."""
+    global _enabled, _start
+    if _enabled:
+        return
+    _enabled = True
+    _start = time.perf_counter()
+    builtins.__import__ = _timed_import
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def mark(label: str, top: int = 15):
+    """
+    Mencetak laporan startup untuk fase yang baru selesai.
+
+    PARAMETER:
+    label : string
+        Nama fase (misalnya "welcome screen", "main window")
+    top : int
+        Jumlah modul termahal yang ditampilkan
+    """
+    if not _enabled:
+        return
+
+    with _records_lock:
+        records = sorted(_records, key=lambda r: r[1], reverse=True)
+        _records.clear()
+
+    total_import = sum(r[2] for r in records)
+    print(
+        f"[startup] {label}: {time.perf_counter() - _start:.3f}s sejak start, "
+        f"{len(records)} import baru ({total_import:.3f}s)",
+        file=sys.stderr
+    )
+    for name, total, self_time in records[:top]:
+        print(f"    {total * 1000:9.1f} ms total  {self_time * 1000:9.1f} ms self  {name}",
+              file=sys.stderr)
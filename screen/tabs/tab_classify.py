@@ -8,12 +8,17 @@ Tab ini berfungsi untuk:
 3. Menampilkan skor kategori dan kategori terbaik
 4. Menjalankan reasoning (Backward Chaining):
    - Menampilkan token kunci yang menyebabkan kategori tersebut dipilih
+5. Tombol "Simpan Struk": hasil klasifikasi terakhir baru disimpan ke
+   store lokal (core/receipt_store.py) jika user menekannya, supaya teks
+   percobaan / potongan tidak ikut terhitung sebagai pengeluaran.
+   TabInsight memakai store ini untuk menjawab pertanyaan pengeluaran
+   tanpa Gemini
 """
 
 import customtkinter as ctk
 
-from core.search_classifier import classify_text
-from core.backward_chain import backward_reasoning
+from core.receipt_store import get_receipt_store
+from core.search_classifier import classify_and_explain
 
 
 class TabClassify(ctk.CTkFrame):
@@ -27,6 +32,9 @@ class TabClassify(ctk.CTkFrame):
     def __init__(self, master):
         super().__init__(master, fg_color="#101010")
 
+        # Hasil klasifikasi terakhir yang belum disimpan: (teks, hasil)
+        self._unsaved = None
+
         # Layout
         self.grid_columnconfigure(0, weight=1)
         self.grid_columnconfigure(1, weight=1)
@@ -66,6 +74,17 @@ class TabClassify(ctk.CTkFrame):
         )
         classify_btn.pack(pady=10)
 
+        # Tombol simpan (aktif hanya jika ada hasil klasifikasi yang belum disimpan)
+        self.save_btn = ctk.CTkButton(
+            left_frame,
+            text="Simpan Struk",
+            fg_color="#2A2A2A",
+            hover_color="#333333",
+            state="disabled",
+            command=self.save_receipt
+        )
+        self.save_btn.pack(pady=(0, 10))
+
         # -------------------------------------------------------------
         # FRAME KANAN: HASIL KLASIFIKASI
         # -------------------------------------------------------------
@@ -96,12 +115,13 @@ class TabClassify(ctk.CTkFrame):
     def run_classification(self):
         """
         - Ambil teks dari input box
-        - Jalankan classify_text() → Best-First Search
-        - Jalankan backward_reasoning() → token yang relevan
+        - Jalankan classify_and_explain() → Best-First Search
+          + backward chaining (token yang relevan) dalam satu kali tokenisasi
         - Tampilkan:
             * Skor tiap kategori
             * Kategori terbaik
             * Token kunci hasil reasoning
+        - Aktifkan tombol "Simpan Struk" (tidak menyimpan otomatis)
         """
         text = self.input_box.get("0.0", "end").strip()
 
@@ -110,11 +130,13 @@ class TabClassify(ctk.CTkFrame):
             self.result_box.insert("0.0", "ERROR: Text input is empty.")
             return
 
-        # STEP 1 → Klasifikasi dengan heuristic
-        best_category, score_table = classify_text(text)
+        # STEP 1 → Klasifikasi dengan heuristic + reasoning backward chaining
+        result = classify_and_explain(text)
+        best_category = result.best_category
+        score_table = result.score_table
 
-        # STEP 2 → Reasoning backward chaining
-        reasoning_tokens = backward_reasoning(text, best_category)
+        # STEP 2 → Token pendukung kategori terbaik (sudah terkumpul di STEP 1)
+        reasoning_tokens = result.reasoning_tokens
 
         # Susun output yang rapi
         output = "=== CLASSIFICATION RESULT ===\n\n"
@@ -132,6 +154,34 @@ class TabClassify(ctk.CTkFrame):
         else:
             output += "Tidak ditemukan token pendukung.\n"
 
+        # STEP 3 → Belum disimpan; user memilih lewat tombol "Simpan Struk"
+        output += "\nBelum disimpan. Tekan \"Simpan Struk\" untuk mencatat sebagai pengeluaran.\n"
+        self._unsaved = (text, result)
+        self.save_btn.configure(state="normal")
+
         # Munculkan di textbox
         self.result_box.delete("0.0", "end")
         self.result_box.insert("0.0", output)
+
+    # ======================================================================
+    # FUNCTION: SAVE RECEIPT
+    # ======================================================================
+    def save_receipt(self):
+        """
+        Menyimpan hasil klasifikasi terakhir ke store lokal sebagai struk
+        (hanya lewat tombol "Simpan Struk"), lalu menampilkan nomor struk.
+        Setiap hasil hanya bisa disimpan sekali.
+        """
+        if self._unsaved is None:
+            return
+
+        text, result = self._unsaved
+        try:
+            receipt_id = get_receipt_store().add(text, result)
+        except Exception as e:
+            self.result_box.insert("end", f"\nERROR: Gagal menyimpan struk: {str(e)}\n")
+            return
+
+        self._unsaved = None
+        self.save_btn.configure(state="disabled")
+        self.result_box.insert("end", f"\nTersimpan sebagai struk #{receipt_id} (dipakai Insight).\n")
@@ -10,12 +10,23 @@ Fitur:
 2. Input field untuk mengirim pertanyaan
 3. Tombol Send
 4. Terhubung dengan core/gemini_client.py (fungsi ask_gemini)
+5. Pertanyaan pengeluaran sederhana ("berapa pengeluaran makanan bulan ini?")
+   dijawab langsung dari store lokal (core/receipt_store.py)
+6. Pertanyaan lain dikirim ke Gemini bersama ringkasan pengeluaran
+   berukuran tetap (core/insight_prompt.py), bukan struk mentah
+7. Jawaban Gemini di-stream: potongan teks ditampilkan begitu tiba
 
 UI tetap memakai tema gelap modern.
 """
 
 import customtkinter as ctk
-from core.gemini_client import ask_gemini
+from core.insight_prompt import stream_gemini_with_summary
+from core.receipt_store import answer_spending_question
+from screen.background import stream_in_background
+
+
+# Teks sementara selama menunggu jawaban Gemini
+PENDING_TEXT = "(menunggu jawaban...)"
 
 
 class TabInsight(ctk.CTkFrame):
@@ -26,6 +37,13 @@ class TabInsight(ctk.CTkFrame):
     def __init__(self, master):
         super().__init__(master, fg_color="#101010")
 
+        # Request Gemini yang sedang berjalan: mark posisi jawaban → task
+        self.pending = {}
+        self._mark_counter = 0
+
+        # Mark yang jawabannya sudah mulai mengalir (teks sementara sudah dihapus)
+        self._streaming = set()
+
         # Layout
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(1, weight=0)
@@ -73,6 +91,21 @@ class TabInsight(ctk.CTkFrame):
         )
         send_btn.grid(row=0, column=1, padx=(0, 10), pady=10)
 
+        # Indikator proses + tombol cancel (hanya tampil saat ada request)
+        self.progress = ctk.CTkProgressBar(
+            input_frame,
+            mode="indeterminate",
+            progress_color="#7A3DB8"
+        )
+        self.cancel_btn = ctk.CTkButton(
+            input_frame,
+            text="Cancel",
+            fg_color="#2A2A2A",
+            hover_color="#333333",
+            width=80,
+            command=self.cancel_requests
+        )
+
     # =================================================================
     # FUNCTION: SEND MESSAGE
     # =================================================================
@@ -81,8 +114,14 @@ class TabInsight(ctk.CTkFrame):
         Proses kirim pesan ke Gemini:
         1. Ambil teks dari entry
         2. Tampilkan di chat_box
-        3. Panggil ask_gemini(prompt)
-        4. Tampilkan respons AI
+        3. Jika pertanyaan lookup pengeluaran (kategori / periode eksplisit,
+           bukan minta saran / analisis) → jawab dari store lokal
+        4. Jika tidak, stream jawaban Gemini (prompt + ringkasan pengeluaran)
+           di thread latar belakang
+        5. Tambahkan setiap potongan jawaban di posisi pesan tersebut begitu tiba
+
+        Beberapa pertanyaan boleh berjalan bersamaan; setiap jawaban
+        ditulis di tempatnya masing-masing.
 
         Jika input kosong → tidak melakukan apa pun.
         """
@@ -98,9 +137,91 @@ class TabInsight(ctk.CTkFrame):
         # Kosongkan entry
         self.entry.delete(0, "end")
 
-        # Dapatkan jawaban dari Gemini
-        ai_response = ask_gemini(user_text)
+        # Lookup pengeluaran → jawab dari store lokal (milidetik);
+        # None = pertanyaan saran / analisis / lainnya → Gemini
+        try:
+            local_answer = answer_spending_question(user_text)
+        except Exception as e:
+            local_answer = f"ERROR: Gagal membaca store lokal: {str(e)}"
+
+        if local_answer is not None:
+            self.chat_box.insert("end", f"Insight (lokal): {local_answer}\n")
+            self.chat_box.see("end")
+            return
+
+        # Tempat jawaban ditandai dengan mark (jawaban bisa datang tidak berurutan)
+        self._mark_counter += 1
+        mark = f"gemini_{self._mark_counter}"
+        self.chat_box.insert("end", "Gemini: ")
+        self.chat_box.mark_set(mark, "end-1c")
+        self.chat_box.mark_gravity(mark, "left")
+        self.chat_box.insert("end", f"{PENDING_TEXT}\n")
+        self.chat_box.see("end")
 
-        # Tampilkan respons
-        self.chat_box.insert("end", f"Gemini: {ai_response}\n")
+        # Stream jawaban dari Gemini di latar belakang
+        self.pending[mark] = stream_in_background(
+            self,
+            stream_gemini_with_summary,
+            user_text,
+            on_chunk=lambda chunk: self._append_chunk(mark, chunk),
+            on_done=lambda chunks: self._finish_response(mark, None if chunks else "(jawaban kosong)"),
+            on_error=lambda error: self._finish_response(mark, f"ERROR: {error}")
+        )
+        self._set_busy(True)
+
+    def _append_chunk(self, mark, chunk):
+        """Callback (thread Tk): tambahkan satu potongan jawaban."""
+        end_mark = f"{mark}_end"
+        if mark not in self._streaming:
+            # Potongan pertama: hapus teks sementara, pasang mark akhir
+            # (gravity kanan → ikut bergeser setiap kali teks ditambahkan)
+            self._streaming.add(mark)
+            self.chat_box.delete(mark, f"{mark} + {len(PENDING_TEXT)}c")
+            self.chat_box.mark_set(end_mark, mark)
+            self.chat_box.mark_gravity(end_mark, "right")
+
+        self.chat_box.insert(end_mark, chunk)
         self.chat_box.see("end")
+
+    def _finish_response(self, mark, text=None):
+        """Callback (thread Tk): stream selesai, opsional dengan pesan tambahan."""
+        self.pending.pop(mark, None)
+        self._replace_pending(mark, text)
+        self.chat_box.see("end")
+        self._set_busy(bool(self.pending))
+
+    def _replace_pending(self, mark, text):
+        """
+        Menutup jawaban di mark: sebelum ada potongan → teks sementara diganti
+        text; jika sudah mengalir → text (jika ada) ditambahkan di akhir.
+        """
+        if mark in self._streaming:
+            self._streaming.discard(mark)
+            end_mark = f"{mark}_end"
+            if text:
+                self.chat_box.insert(end_mark, f" {text}")
+            self.chat_box.mark_unset(end_mark)
+        else:
+            self.chat_box.delete(mark, f"{mark} + {len(PENDING_TEXT)}c")
+            self.chat_box.insert(mark, text or "")
+        self.chat_box.mark_unset(mark)
+
+    def cancel_requests(self):
+        """Membatalkan semua request Gemini yang sedang berjalan."""
+        for mark, task in list(self.pending.items()):
+            task.cancel()
+            self._replace_pending(mark, "(dibatalkan)")
+
+        self.pending.clear()
+        self._set_busy(False)
+
+    def _set_busy(self, busy):
+        """Tampilkan / sembunyikan progress bar dan tombol cancel."""
+        if busy:
+            self.progress.grid(row=1, column=0, sticky="ew", padx=10, pady=(0, 10))
+            self.progress.start()
+            self.cancel_btn.grid(row=1, column=1, padx=(0, 10), pady=(0, 10))
+        else:
+            self.progress.stop()
+            self.progress.grid_forget()
+            self.cancel_btn.grid_forget()
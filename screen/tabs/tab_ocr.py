@@ -17,8 +17,16 @@ import customtkinter as ctk
 from tkinter import filedialog
 from PIL import Image, ImageTk
 
-# Import modul OCR dari folder core
-from core.ocr_processor import run_ocr
+from screen.background import run_in_background
+
+
+def _run_ocr(path):
+    """
+    Import modul OCR (OpenCV + pytesseract) baru saat OCR pertama
+    dijalankan, di thread latar belakang → tidak memperlambat startup.
+    """
+    from core.ocr_processor import run_ocr
+    return run_ocr(path)
 
 
 class TabOCR(ctk.CTkFrame):
@@ -46,6 +54,7 @@ class TabOCR(ctk.CTkFrame):
         # Variabel internal
         self.loaded_image_path = None
         self.preview_image = None  # untuk menahan image agar tidak garbage collected
+        self.ocr_task = None       # task OCR latar belakang yang sedang berjalan
 
         # ---------------------------------------------------------------
         # FRAME KIRI: PREVIEW + UPLOAD BUTTON
@@ -109,6 +118,20 @@ class TabOCR(ctk.CTkFrame):
         )
         ocr_btn.pack(pady=10)
 
+        # Indikator proses + tombol cancel (hanya tampil saat OCR berjalan)
+        self.progress = ctk.CTkProgressBar(
+            right_frame,
+            mode="indeterminate",
+            progress_color="#7A3DB8"
+        )
+        self.cancel_btn = ctk.CTkButton(
+            right_frame,
+            text="Cancel",
+            fg_color="#2A2A2A",
+            hover_color="#333333",
+            command=self.cancel_ocr
+        )
+
     # ------------------------------------------------------------------
     # FUNCTION: UPLOAD IMAGE
     # ------------------------------------------------------------------
@@ -144,17 +167,60 @@ class TabOCR(ctk.CTkFrame):
 
         LANGKAH:
         1. Pastikan ada gambar
-        2. Panggil run_ocr(path)
-        3. Tampilkan hasil di textbox
+        2. Panggil run_ocr(path) di thread latar belakang (UI tidak freeze)
+        3. Tampilkan hasil di textbox saat selesai
         """
         if self.loaded_image_path is None:
             self.ocr_textbox.delete("0.0", "end")
             self.ocr_textbox.insert("0.0", "ERROR: No image uploaded.")
             return
 
-        # Jalankan OCR
-        text_result = run_ocr(self.loaded_image_path)
+        # OCR sebelumnya yang belum selesai dibatalkan (hasil terbaru yang dipakai)
+        if self.ocr_task is not None and not self.ocr_task.done():
+            self.ocr_task.cancel()
 
-        # Tampilkan hasil OCR
+        self.ocr_textbox.delete("0.0", "end")
+        self.ocr_textbox.insert("0.0", "Processing OCR...")
+        self._set_busy(True)
+
+        # Jalankan OCR di latar belakang
+        self.ocr_task = run_in_background(
+            self,
+            _run_ocr,
+            self.loaded_image_path,
+            on_done=self._show_ocr_result,
+            on_error=self._show_ocr_error
+        )
+
+    def _show_ocr_result(self, text_result):
+        """Callback (thread Tk): tampilkan hasil OCR."""
+        self._set_busy(False)
         self.ocr_textbox.delete("0.0", "end")
         self.ocr_textbox.insert("0.0", text_result)
+
+    def _show_ocr_error(self, error):
+        """Callback (thread Tk): tampilkan error OCR."""
+        self._set_busy(False)
+        self.ocr_textbox.delete("0.0", "end")
+        self.ocr_textbox.insert("0.0", f"OCR ERROR: {error}")
+
+    def cancel_ocr(self):
+        """Membatalkan OCR yang sedang berjalan."""
+        if self.ocr_task is not None:
+            self.ocr_task.cancel()
+            self.ocr_task = None
+
+        self._set_busy(False)
+        self.ocr_textbox.delete("0.0", "end")
+        self.ocr_textbox.insert("0.0", "OCR dibatalkan.")
+
+    def _set_busy(self, busy):
+        """Tampilkan / sembunyikan progress bar dan tombol cancel."""
+        if busy:
+            self.progress.pack(padx=10, pady=(0, 5), fill="x")
+            self.progress.start()
+            self.cancel_btn.pack(pady=(0, 10))
+        else:
+            self.progress.stop()
+            self.progress.pack_forget()
+            self.cancel_btn.pack_forget()
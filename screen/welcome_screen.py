@@ -10,10 +10,14 @@ Menampilkan:
 Setelah tombol ditekan:
 - WelcomeScreen dihancurkan (destroy)
 - MainWindow diload (dari screen/main_window.py)
+
+MainWindow (dan seluruh tab + dependency beratnya) baru di-import
+saat tombol Start ditekan, supaya welcome screen tampil secepat mungkin.
 """
 
 import customtkinter as ctk
-from screen.main_window import MainWindow
+
+from screen import startup_profiler
 
 
 class WelcomeScreen(ctk.CTkFrame):
@@ -84,7 +88,11 @@ class WelcomeScreen(ctk.CTkFrame):
         - Menghancurkan welcome screen
         - Membuka MainWindow
         """
+        master = self.master
         self.destroy()  # hilangkan welcome screen
 
-        # Load window utama
-        MainWindow(master=self.master)
+        # Load window utama (import di sini → lazy)
+        from screen.main_window import MainWindow
+        MainWindow(master=master)
+
+        startup_profiler.mark("main window")
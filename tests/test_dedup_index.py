@@ -0,0 +1,164 @@
+"""
+Deteksi duplikat: struk berbeda tidak boleh dianggap sama, foto ulang
+dari struk yang sama tetap dikenali.
+"""
+
+import random
+import sqlite3
+
+import numpy as np
+import pytest
+
+from benchmarks.receipt_bench import _load_font, generate_dataset, make_receipt, render_receipt
+from core import dedup_index
+from core.dedup_index import BKTree, DuplicateIndex, ReceiptSignature, hamming, run_ocr_dedup
+
+
+@pytest.fixture
+def fake_ocr(monkeypatch):
+    """OCR diganti teks ground truth (Tesseract tidak dibutuhkan)."""
+    texts = {}
+    monkeypatch.setattr("core.ocr_processor.ocr_image", lambda path: texts[str(path)])
+    return texts
+
+
+def test_distinct_receipts_are_not_duplicates(tmp_path, fake_ocr):
+    samples = generate_dataset(str(tmp_path), 30)
+    fake_ocr.update({sample["path"]: sample["text"] for sample in samples})
+
+    index = DuplicateIndex(":memory:")
+    results = [run_ocr_dedup(sample["path"], index) for sample in samples]
+
+    assert [result["duplicate_of"] for result in results] == [None] * len(samples)
+    assert [result["text"] for result in results] == [sample["text"] for sample in samples]
+
+
+def test_rephotographed_receipt_is_duplicate(tmp_path, fake_ocr):
+    lines, _ = make_receipt(random.Random(3))
+    font = _load_font(28)
+    first, second = tmp_path / "a.png", tmp_path / "b.jpg"
+    render_receipt(lines, random.Random(1), font).save(first)
+    render_receipt(lines, random.Random(2), font).save(second, quality=80)
+    fake_ocr[str(first)] = "\n".join(lines)
+
+    index = DuplicateIndex(":memory:")
+    original = run_ocr_dedup(str(first), index)
+    again = run_ocr_dedup(str(second), index)
+
+    assert again["duplicate_of"] is not None
+    assert again["text"] == original["text"]
+
+
+def test_empty_index_is_used_instead_of_global(tmp_path, fake_ocr, monkeypatch):
+    samples = generate_dataset(str(tmp_path), 1)
+    fake_ocr[samples[0]["path"]] = samples[0]["text"]
+
+    def fail():
+        raise AssertionError("index global dipakai")
+
+    monkeypatch.setattr(dedup_index, "get_dedup_index", fail)
+
+    index = DuplicateIndex(":memory:")
+    run_ocr_dedup(samples[0]["path"], index)
+    assert len(index) == 1
+
+
+def test_candidates_failing_verification_are_rejected():
+    index = DuplicateIndex(":memory:")
+    signature = ReceiptSignature(phash=5, detail=1, aspect=0.5)
+    index.add(signature, "struk")
+
+    assert index.find(signature)["text"] == "struk"
+
+    # pHash sama, isi (hash detail) jauh berbeda → bukan duplikat
+    other = ReceiptSignature(phash=5, detail=(1 << 512) - 1, aspect=0.5)
+    assert index.find(other) is None
+
+    # pHash & detail sama, rasio aspek berbeda → bukan duplikat
+    wider = ReceiptSignature(phash=5, detail=1, aspect=0.6)
+    assert index.find(wider) is None
+
+
+# ----------------------------------------------------------------------
+# BK-tree: bulk build, snapshot, dan pembukaan ulang index
+# ----------------------------------------------------------------------
+def _clustered_hashes(count, seed=1):
+    """pHash berkelompok (seperti foto ulang) termasuk yang persis sama."""
+    rng = random.Random(seed)
+    bases = [rng.getrandbits(64) for _ in range(count // 20)]
+    values = []
+    for _ in range(count):
+        value = rng.choice(bases)
+        for _ in range(rng.randint(0, 6)):
+            value ^= 1 << rng.randrange(64)
+        values.append(value)
+    return values
+
+
+def test_bulk_built_tree_matches_brute_force():
+    values = _clustered_hashes(3000)
+    ids = list(range(10, 10 + len(values)))
+
+    bulk = BKTree.from_items(np.array(values, dtype=np.uint64), ids)
+    incremental = BKTree()
+    for value, item_id in zip(values, ids):
+        incremental.add(value, item_id)
+    restored = BKTree.from_blobs(bulk.to_blobs())
+
+    assert len(bulk) == len(incremental) == len(restored) == len(values)
+    rng = random.Random(2)
+    for _ in range(50):
+        query = rng.choice(values) ^ (1 << rng.randrange(64))
+        for radius in (0, 4, 10):
+            expected = sorted(
+                (hamming(query, value), item_id)
+                for value, item_id in zip(values, ids) if hamming(query, value) <= radius
+            )
+            assert bulk.search(query, radius) == expected
+            assert incremental.search(query, radius) == expected
+            assert restored.search(query, radius) == expected
+
+
+def _signature(value):
+    return ReceiptSignature(value, 0, 0.5)
+
+
+def test_reopen_loads_snapshot_and_new_rows(tmp_path, monkeypatch):
+    path = str(tmp_path / "dedup.sqlite3")
+    values = _clustered_hashes(200)
+
+    index = DuplicateIndex(path)
+    for value in values[:150]:
+        index.add(_signature(value), "teks")
+    index.close()
+
+    # Process lain menambah baris tanpa menyimpan snapshot
+    other = DuplicateIndex(path)
+    for value in values[150:]:
+        other.add(_signature(value), "teks")
+    other._conn.close()
+
+    def no_rebuild(self):
+        raise AssertionError("tree dibangun ulang padahal snapshot valid")
+
+    monkeypatch.setattr(DuplicateIndex, "_rebuild_tree", no_rebuild)
+    reopened = DuplicateIndex(path)
+    assert len(reopened) == 200
+    assert reopened.find(_signature(values[180]))["id"] is not None
+    reopened.close()
+
+
+def test_stale_snapshot_is_rebuilt(tmp_path):
+    path = str(tmp_path / "dedup.sqlite3")
+    index = DuplicateIndex(path)
+    for value in _clustered_hashes(100):
+        index.add(_signature(value), "teks")
+    index.close()
+
+    with sqlite3.connect(path) as conn:
+        conn.execute("DELETE FROM receipt_phash WHERE id <= 10")
+
+    reopened = DuplicateIndex(path)
+    assert len(reopened) == 90
+    assert all(item_id > 10 for _, item_id in reopened.tree.search(0, 64))
+    reopened.close()
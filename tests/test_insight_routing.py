@@ -0,0 +1,168 @@
+"""
+Routing pertanyaan tab Insight: lookup pengeluaran dijawab dari store
+lokal, pertanyaan saran / analisis / lainnya dikirim ke Gemini.
+"""
+
+import datetime
+
+import pytest
+
+from core import receipt_store
+from core.receipt_store import ReceiptStore, answer_spending_question
+
+
+TODAY = datetime.date(2024, 5, 20)
+
+LOCAL_QUESTIONS = [
+    "berapa pengeluaran makanan bulan ini?",
+    "total belanja minggu ini",
+    "Berapa total pengeluaran fashion tahun ini?",
+    "jumlah pengeluaran kesehatan",
+    "berapa total belanja semua waktu?",
+]
+
+GEMINI_QUESTIONS = [
+    "Bagaimana cara mengurangi pengeluaran makanan saya?",
+    "Apakah ada anomali pada pengeluaran bulan ini?",
+    "jelaskan kenapa total belanja saya naik",
+    "Berapa kalori dalam nasi goreng?",
+    "berapa total pengeluaran saya?",
+    "beri saran hemat untuk belanja elektronik bulan ini",
+    "halo, apa kabar?",
+]
+
+
+@pytest.fixture
+def store():
+    store = ReceiptStore(":memory:")
+    store.add_many([
+        {"text": "nasi goreng", "category": "makanan", "scores": {"makanan": 1},
+         "receipt_date": "2024-05-10", "amount": 25000},
+        {"text": "kaos", "category": "fashion", "scores": {"fashion": 1},
+         "receipt_date": "2024-02-03", "amount": 80000},
+    ])
+    yield store
+    store.close()
+
+
+class _ExplodingStore:
+    """Store yang tidak boleh disentuh (pertanyaan harus ke Gemini)."""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"store.{name} dipanggil untuk pertanyaan non-lookup")
+
+
+@pytest.mark.parametrize("question", LOCAL_QUESTIONS)
+def test_lookup_answered_locally(store, question):
+    answer = answer_spending_question(question, store, TODAY)
+    assert answer is not None
+    assert "Rp" in answer or "Belum ada struk" in answer
+
+
+def test_lookup_uses_category_and_period(store):
+    answer = answer_spending_question("berapa pengeluaran makanan bulan ini?", store, TODAY)
+    assert answer == "Pengeluaran makanan (bulan ini): Rp 25.000 dari 1 struk."
+
+
+@pytest.mark.parametrize("question, period", [
+    ("berapa pengeluaran makanan hari ini", "hari ini"),
+    ("berapa pengeluaran makanan sehari ini", "semua waktu"),
+    ("berapa pengeluaran makanan sebulan ini", "semua waktu"),
+    ("berapa pengeluaran makanan bulan lalu", "bulan lalu"),
+    ("berapa pengeluaran makanan last month", "bulan lalu"),
+])
+def test_period_matches_whole_tokens(store, question, period):
+    answer = answer_spending_question(question, store, TODAY)
+    assert answer.startswith(f"Pengeluaran makanan ({period}):")
+
+
+@pytest.mark.parametrize("question", [
+    "berapa total belanja sehari ini",
+    "berapa total belanja sebulan ini",
+])
+def test_period_fragment_is_not_a_period(question):
+    # Tanpa kategori dan tanpa periode yang sah → bukan lookup, ke Gemini
+    assert answer_spending_question(question, _ExplodingStore(), TODAY) is None
+
+
+@pytest.mark.parametrize("question", GEMINI_QUESTIONS)
+def test_other_questions_go_to_gemini(question):
+    assert answer_spending_question(question, _ExplodingStore(), TODAY) is None
+
+
+# ----------------------------------------------------------------------
+# TabInsight.send_message (widget diganti objek tiruan)
+# ----------------------------------------------------------------------
+class _FakeEntry:
+    def __init__(self, text):
+        self.text = text
+
+    def get(self):
+        return self.text
+
+    def delete(self, *args):
+        self.text = ""
+
+
+class _FakeText:
+    def __init__(self):
+        self.content = ""
+
+    def insert(self, index, text):
+        self.content += text
+
+    def mark_set(self, *args):
+        pass
+
+    def mark_gravity(self, *args):
+        pass
+
+    def see(self, *args):
+        pass
+
+
+class _FakeTab:
+    def __init__(self, text):
+        self.entry = _FakeEntry(text)
+        self.chat_box = _FakeText()
+        self.pending = {}
+        self._mark_counter = 0
+        self._streaming = set()
+        self.busy = False
+
+    def _set_busy(self, busy):
+        self.busy = busy
+
+
+@pytest.fixture
+def tab_insight(monkeypatch, store):
+    tab_insight = pytest.importorskip("screen.tabs.tab_insight")
+
+    streamed = []
+    monkeypatch.setattr(receipt_store, "get_receipt_store", lambda: store)
+    monkeypatch.setattr(
+        tab_insight, "stream_in_background",
+        lambda widget, fn, question, **callbacks: streamed.append((fn, question)) or object()
+    )
+    tab_insight.streamed = streamed
+    return tab_insight
+
+
+@pytest.mark.parametrize("question", LOCAL_QUESTIONS)
+def test_tab_answers_lookup_locally(tab_insight, question):
+    tab = _FakeTab(question)
+    tab_insight.TabInsight.send_message(tab)
+
+    assert "Insight (lokal):" in tab.chat_box.content
+    assert tab_insight.streamed == []
+    assert not tab.busy
+
+
+@pytest.mark.parametrize("question", GEMINI_QUESTIONS)
+def test_tab_streams_other_questions_from_gemini(tab_insight, question):
+    tab = _FakeTab(question)
+    tab_insight.TabInsight.send_message(tab)
+
+    assert "Insight (lokal):" not in tab.chat_box.content
+    assert tab_insight.streamed == [(tab_insight.stream_gemini_with_summary, question)]
+    assert tab.busy
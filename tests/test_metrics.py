@@ -0,0 +1,43 @@
+"""
+Metrics klasifikasi vs reasoning: backward_reasoning() tidak boleh ikut
+terhitung sebagai klasifikasi.
+"""
+
+import pytest
+
+from core import metrics
+from core.backward_chain import backward_reasoning
+from core.search_classifier import classify_text
+
+
+@pytest.fixture
+def enabled_metrics():
+    was_enabled = metrics.is_enabled()
+    metrics.reset()
+    metrics.enable()
+    yield
+    metrics.reset()
+    if not was_enabled:
+        metrics.disable()
+
+
+def _counters():
+    return {
+        (item["name"], tuple(sorted(item["labels"].items()))): item["value"]
+        for item in metrics.snapshot()["counters"]
+    }
+
+
+def _histogram_counts():
+    return {item["name"]: item["count"] for item in metrics.snapshot()["histograms"]}
+
+
+def test_reasoning_is_not_counted_as_classification(enabled_metrics):
+    text = "nasi ayam kopi"
+    category, _ = classify_text(text)
+    assert backward_reasoning(text, category) == ["nasi", "ayam", "kopi"]
+
+    assert _counters()[("classify_results", (("category", "makanan"),))] == 1
+    counts = _histogram_counts()
+    assert counts["classify"] == 1
+    assert counts["backward_reasoning"] == 1
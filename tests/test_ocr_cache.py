@@ -0,0 +1,95 @@
+"""
+OCRCache: total ukuran berjalan (tanpa SUM per put), eviction LRU
+bertahap, dan penulisan last_access yang ditunda.
+"""
+
+import sqlite3
+
+import pytest
+
+from core import ocr_cache
+from core.ocr_cache import OCRCache
+
+
+def _sum_size(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_cache").fetchone()[0]
+
+
+def _last_access(path, key):
+    with sqlite3.connect(path) as conn:
+        return conn.execute(
+            "SELECT last_access FROM ocr_cache WHERE key = ?", (key,)
+        ).fetchone()[0]
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "ocr_cache.sqlite3")
+
+
+def test_running_total_matches_table(cache_path):
+    cache = OCRCache(cache_path, max_bytes=1000)
+    cache.put("a", "x" * 100)
+    cache.put("b", "y" * 200)
+    cache.put("a", "z" * 50)    # ganti entry → total ikut turun
+    assert cache.stats()["bytes"] == _sum_size(cache_path) == 250
+
+    # Instance lain (process lain) pada file yang sama memakai total yang sama
+    other = OCRCache(cache_path, max_bytes=1000)
+    other.put("c", "w" * 300)
+    assert cache.stats()["bytes"] == _sum_size(cache_path) == 550
+
+    cache.clear()
+    assert other.stats()["bytes"] == 0
+    cache.close()
+    other.close()
+
+
+def test_existing_cache_is_migrated(cache_path):
+    with sqlite3.connect(cache_path) as conn:
+        conn.execute(
+            "CREATE TABLE ocr_cache (key TEXT PRIMARY KEY, text TEXT NOT NULL,"
+            " size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        conn.execute("INSERT INTO ocr_cache VALUES ('old', 'abc', 3, 0)")
+
+    cache = OCRCache(cache_path)
+    assert cache.stats()["bytes"] == 3
+    cache.close()
+
+
+def test_eviction_is_lru_and_batched(cache_path):
+    cache = OCRCache(cache_path, max_bytes=1000)
+    for i in range(10):
+        cache.put(f"k{i}", "x" * 100)
+
+    # Hit pada k0 masih tertunda di memori, tapi tetap dihitung oleh eviction
+    assert cache.get("k0") is not None
+    cache.put("k10", "x" * 100)
+
+    # Turun sampai EVICT_TARGET (900 byte), bukan hanya sampai max_bytes
+    assert cache.stats()["bytes"] == _sum_size(cache_path) == 900
+    assert cache.get("k0") is not None
+    assert cache.get("k1") is None and cache.get("k2") is None
+    cache.close()
+
+
+def test_hits_are_written_in_batches(cache_path, monkeypatch):
+    monkeypatch.setattr(ocr_cache, "TOUCH_BATCH", 3)
+    cache = OCRCache(cache_path)
+    for key in ("a", "b", "c"):
+        cache.put(key, key)
+    before = {key: _last_access(cache_path, key) for key in ("a", "b", "c")}
+
+    cache.get("a")
+    cache.get("b")
+    assert _last_access(cache_path, "a") == before["a"]
+
+    cache.get("c")   # batch penuh → ditulis sekaligus
+    assert all(_last_access(cache_path, key) > before[key] for key in ("a", "b", "c"))
+
+    flushed = _last_access(cache_path, "a")
+    cache.get("a")
+    cache.close()    # sisa yang tertunda ditulis saat close
+    assert _last_access(cache_path, "a") > flushed
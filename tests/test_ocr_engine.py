@@ -0,0 +1,95 @@
+"""
+TesserocrEngine dipakai ulang oleh pool: variabel config (-c) tidak boleh
+terbawa ke panggilan berikutnya, dan opsi / variabel yang tidak didukung
+dijalankan lewat pytesseract (hasil sama dengan backend CLI). tesserocr
+diganti API tiruan.
+"""
+
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from core import ocr_processor
+
+
+class _FakeTessAPI:
+    def __init__(self, lang=None):
+        self.variables = {"tessedit_char_whitelist": ""}
+
+    def SetPageSegMode(self, mode):
+        self.psm = mode
+
+    def GetVariableAsString(self, name):
+        return self.variables.get(name)
+
+    def SetVariable(self, name, value):
+        if name not in self.variables:
+            return False
+        self.variables[name] = value
+        return True
+
+    def SetImageBytes(self, *args):
+        pass
+
+    def GetUTF8Text(self):
+        return "whitelist=" + self.variables["tessedit_char_whitelist"]
+
+    def AllWordConfidences(self):
+        return [80, 90]
+
+    def Clear(self):
+        pass
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    fake = types.SimpleNamespace(PyTessBaseAPI=_FakeTessAPI, PSM=types.SimpleNamespace(AUTO=3))
+    monkeypatch.setitem(sys.modules, "tesserocr", fake)
+    return ocr_processor.TesserocrEngine()
+
+
+GRAY = np.zeros((8, 8), dtype=np.uint8)
+
+
+def test_config_variables_do_not_leak_between_calls(engine):
+    assert engine.recognize(GRAY, "-c tessedit_char_whitelist=0123456789") == "whitelist=0123456789"
+    assert engine.recognize(GRAY, "") == "whitelist="
+
+    text, confidence = engine.recognize_with_confidence(GRAY, "--psm 6 -c tessedit_char_whitelist=01")
+    assert (text, confidence) == ("whitelist=01", 85.0)
+    assert engine.recognize(GRAY, "") == "whitelist="
+
+
+@pytest.fixture
+def fallback_calls(monkeypatch):
+    calls = []
+
+    class _FakePytesseract(ocr_processor.OCREngine):
+        def recognize(self, gray, config=""):
+            calls.append(config)
+            return "pytesseract"
+
+        def recognize_with_confidence(self, gray, config=""):
+            calls.append(config)
+            return "pytesseract", 70.0
+
+    monkeypatch.setattr(ocr_processor, "PytesseractEngine", _FakePytesseract)
+    return calls
+
+
+def test_unsupported_options_fall_back_to_pytesseract(engine, fallback_calls):
+    assert engine.recognize(GRAY, "--oem 1 --psm 6") == "pytesseract"
+    assert engine.recognize(GRAY, "-l ind") == "pytesseract"
+    assert fallback_calls == ["--oem 1 --psm 6", "-l ind"]
+
+
+def test_unknown_variable_falls_back_to_pytesseract(engine, fallback_calls):
+    config = "-c tessedit_char_whitelist=01 -c bukan_variabel=1"
+    assert engine.recognize(GRAY, config) == "pytesseract"
+    assert engine.recognize_with_confidence(GRAY, config) == ("pytesseract", 70.0)
+    assert fallback_calls == [config, config]
+
+    # Variabel yang sempat di-set sudah dikembalikan
+    assert engine.recognize(GRAY, "") == "whitelist="
@@ -0,0 +1,84 @@
+"""
+OCR bertingkat (tiled): baris di area overlap dibuang berdasarkan posisi,
+jadi baris yang memang berulang di batas pita (item dibeli dua kali)
+tidak ikut hilang. Engine OCR diganti engine tiruan yang "membaca" baris
+dari lebar balok tinta.
+"""
+
+from contextlib import contextmanager
+
+import numpy as np
+import pytest
+
+from core import ocr_processor
+from core.ocr_processor import image_to_text_tiled
+
+LINE_HEIGHT = 12
+LINE_GAP = 14
+BASE_WIDTH = 20
+
+
+class _BarEngine(ocr_processor.OCREngine):
+    """Setiap balok tinta = satu baris; lebar balok menentukan teksnya."""
+
+    def __init__(self, labels):
+        self.labels = labels
+
+    def recognize_lines(self, gray, config=""):
+        ink = (gray < 128)
+        rows = ink.any(axis=1)
+        lines = []
+        top = None
+        for y, has_ink in enumerate(list(rows) + [False]):
+            if has_ink and top is None:
+                top = y
+            elif not has_ink and top is not None:
+                width = int(ink[top].sum())
+                lines.append((top, y, self.labels[(width - BASE_WIDTH) // 4]))
+                top = None
+        return lines
+
+
+def _receipt(lines):
+    """Gambar struk: satu balok per baris, lebar balok = id teks."""
+    labels = sorted(set(lines))
+    height = len(lines) * (LINE_HEIGHT + LINE_GAP) + LINE_GAP
+    image = np.full((height, 200), 255, dtype=np.uint8)
+    for i, text in enumerate(lines):
+        top = LINE_GAP + i * (LINE_HEIGHT + LINE_GAP)
+        width = BASE_WIDTH + 4 * labels.index(text)
+        image[top:top + LINE_HEIGHT, 10:10 + width] = 0
+    return image, labels
+
+
+@pytest.fixture
+def bar_engine(monkeypatch):
+    holder = {}
+
+    class _Pool:
+        name = "bar"
+
+        @contextmanager
+        def engine(self):
+            yield holder["engine"]
+
+    monkeypatch.setattr(ocr_processor, "get_engine_pool", lambda: _Pool())
+    monkeypatch.setattr(ocr_processor, "TILE_MIN_HEIGHT", 0)
+    return holder
+
+
+@pytest.mark.parametrize("band_height", [150, 200, 260, 333])
+def test_repeated_lines_on_band_boundary_are_kept(bar_engine, band_height):
+    lines = [f"ITEM {i} 1.000" for i in range(40)]
+    # Item yang sama dibeli enam kali berturut-turut, di beberapa tempat
+    # (lebih panjang dari area overlap → penyambungan per teks membuangnya)
+    for position in (4, 16, 28):
+        lines[position:position + 6] = ["1 x AQUA 5.000"] * 6
+    image, labels = _receipt(lines)
+    bar_engine["engine"] = _BarEngine(labels)
+
+    layout = ocr_processor.band_layout(image, band_height, overlap=40)
+    assert len(layout) > 2
+    text = image_to_text_tiled(image, band_height=band_height, overlap=40)
+
+    assert text.splitlines() == lines
@@ -0,0 +1,37 @@
+"""
+PreprocessPipeline.timings(): stage yang muncul dua kali di pipeline
+dicatat terpisah per posisi.
+"""
+
+import cv2
+import numpy as np
+
+from core.preprocess_graph import PreprocessPipeline, StageCache
+
+
+def test_repeated_stage_is_timed_per_position(tmp_path):
+    path = str(tmp_path / "struk.png")
+    image = np.full((60, 80), 255, dtype=np.uint8)
+    cv2.putText(image, "TOTAL", (5, 35), cv2.FONT_HERSHEY_SIMPLEX, 0.8, 0, 2)
+    cv2.imwrite(path, image)
+
+    pipeline = PreprocessPipeline(
+        [("blur", {"kernel": 3}), ("threshold", {"value": 150}), ("blur", {"kernel": 5})],
+        cache=StageCache()
+    )
+    pipeline.run(path)
+    pipeline.run(path)
+
+    timings = pipeline.timings()
+    assert list(timings) == [(0, "decode"), (1, "blur"), (2, "threshold"), (3, "blur")]
+
+    # Run pertama menjalankan semua stage; run kedua diambil dari cache
+    for entry in timings.values():
+        assert (entry["runs"], entry["cache_hits"]) == (1, 1)
+
+    # Ganti parameter blur terakhir → hanya posisi 3 yang dijalankan ulang
+    pipeline.stages[2] = ("blur", {"kernel": 7})
+    pipeline.run(path)
+    timings = pipeline.timings()
+    assert timings[(1, "blur")]["runs"] == 1
+    assert timings[(3, "blur")]["runs"] == 2
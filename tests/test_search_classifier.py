@@ -0,0 +1,65 @@
+"""
+Inverted index / matriks kata kunci search_classifier harus mengikuti
+setiap perubahan category_keywords, termasuk edit in-place.
+"""
+
+import pytest
+
+from core import search_classifier
+from core.search_classifier import KeywordList, classify_batch, classify_text
+
+
+@pytest.fixture
+def taxonomy():
+    original = {cat: list(kws) for cat, kws in search_classifier.category_keywords.items()}
+    yield search_classifier.category_keywords
+    search_classifier.category_keywords.clear()
+    search_classifier.category_keywords.update(original)
+
+
+def _both(text):
+    return classify_text(text)[0], classify_batch([text])[0]
+
+
+def test_in_place_edit_is_picked_up(taxonomy):
+    assert _both("sepatu") == ("fashion", ["fashion"])
+
+    position = taxonomy["fashion"].index("sepatu")
+    taxonomy["fashion"][position] = "sendal"
+    taxonomy["elektronik"][0] = "sepatu"
+
+    assert _both("sepatu") == ("elektronik", ["elektronik"])
+    assert _both("sendal") == ("fashion", ["fashion"])
+
+
+@pytest.mark.parametrize("mutate", [
+    lambda t: t["fashion"].append("rok"),
+    lambda t: t["fashion"].extend(["rok"]),
+    lambda t: t["fashion"].insert(0, "rok"),
+    lambda t: t["fashion"].__iadd__(["rok"]),
+    lambda t: t.__setitem__("fashion", t["fashion"] + ["rok"]),
+    lambda t: t.update({"fashion": ["rok"]}),
+])
+def test_mutations_bump_version(taxonomy, mutate):
+    version = taxonomy.version
+    mutate(taxonomy)
+
+    assert taxonomy.version > version
+    assert _both("rok") == ("fashion", ["fashion"])
+
+
+def test_new_category_values_are_wrapped(taxonomy):
+    taxonomy["hobi"] = ["lego"]
+    assert isinstance(taxonomy["hobi"], KeywordList)
+
+    taxonomy["hobi"].append("puzzle")
+    assert _both("puzzle") == ("hobi", ["hobi"])
+
+    taxonomy.setdefault("buku", []).append("novel")
+    assert _both("novel") == ("buku", ["buku"])
+
+
+def test_removed_keyword_no_longer_matches(taxonomy):
+    taxonomy["fashion"].remove("sepatu")
+    assert classify_text("sepatu")[0] != "fashion"
+    assert classify_batch(["sepatu"])[0] != ["fashion"]
@@ -0,0 +1,75 @@
+"""
+Batas antrian /ocr: saat server penuh, upload harus ditolak (503)
+sebelum file sementara ditulis ke disk.
+"""
+
+import asyncio
+
+import aiohttp
+from aiohttp.test_utils import TestClient, TestServer
+
+from core import server as server_module
+from core.server import ReceiptServer
+
+
+def _post_image(server, body=b"fake image bytes"):
+    async def run():
+        client = TestClient(TestServer(server.make_app()))
+        await client.start_server()
+        try:
+            form = aiohttp.FormData()
+            form.add_field("image", body, filename="struk.png")
+            response = await client.post("/ocr", data=form)
+            return response.status, dict(response.headers), await response.json()
+        finally:
+            await client.close()
+
+    return asyncio.run(run())
+
+
+def _record_uploads(monkeypatch):
+    created = []
+    mkstemp = server_module.tempfile.mkstemp
+
+    def recording_mkstemp(*args, **kwargs):
+        fd, path = mkstemp(*args, **kwargs)
+        created.append(path)
+        return fd, path
+
+    monkeypatch.setattr(server_module.tempfile, "mkstemp", recording_mkstemp)
+    return created
+
+
+def test_full_server_rejects_before_saving_upload(monkeypatch):
+    created = _record_uploads(monkeypatch)
+    server = ReceiptServer(workers=1, max_pending=1)
+    server.pending = 1   # slot satu-satunya sedang dipakai
+
+    status, headers, body = _post_image(server)
+
+    assert status == 503
+    assert headers["Retry-After"] == "1"
+    assert body["error"].startswith("ERROR")
+    assert created == []
+    assert server.stats["rejected"] == 1
+
+
+def test_upload_holds_slot_and_is_removed(monkeypatch):
+    created = _record_uploads(monkeypatch)
+    server = ReceiptServer(workers=1, max_pending=1)
+    seen = {}
+
+    async def fake_run(endpoint, fn, path):
+        seen["pending"] = server.pending
+        with open(path, "rb") as f:
+            seen["body"] = f.read()
+        return {"path": path, "text": "nasi goreng", "error": None, "seconds": 0.0}
+
+    monkeypatch.setattr(server, "_run", fake_run)
+    status, _, body = _post_image(server)
+
+    assert status == 200
+    assert body == {"text": "nasi goreng", "error": None, "seconds": 0.0}
+    assert seen == {"pending": 1, "body": b"fake image bytes"}
+    assert server.pending == 0
+    assert len(created) == 1 and not server_module.os.path.exists(created[0])
@@ -0,0 +1,62 @@
+"""
+startup_profiler: import yang berjalan bersamaan di beberapa thread
+tidak boleh saling mencampur stack sub-import.
+"""
+
+import builtins
+import sys
+import threading
+
+import pytest
+
+from screen import startup_profiler
+
+THREADS = 8
+
+
+@pytest.fixture
+def modules(tmp_path, monkeypatch):
+    # parent_i meng-import child_i; child_i tidur sebentar supaya
+    # import di thread-thread lain saling tumpang tindih
+    for i in range(THREADS):
+        (tmp_path / f"profiler_child_{i}.py").write_text("import time\ntime.sleep(0.02)\n")
+        (tmp_path / f"profiler_parent_{i}.py").write_text(f"import profiler_child_{i}\n")
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(builtins, "__import__", startup_profiler._timed_import)
+    monkeypatch.setattr(startup_profiler, "_records", [])
+    yield
+    for i in range(THREADS):
+        sys.modules.pop(f"profiler_child_{i}", None)
+        sys.modules.pop(f"profiler_parent_{i}", None)
+
+
+def test_concurrent_imports_keep_separate_stacks(modules):
+    barrier = threading.Barrier(THREADS)
+    errors = []
+
+    def worker(i):
+        try:
+            barrier.wait()
+            __import__(f"profiler_parent_{i}")
+            assert startup_profiler._stack() == []
+        except BaseException as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+
+    records = {name: (total, self_time) for name, total, self_time in startup_profiler._records}
+    for i in range(THREADS):
+        parent_total, parent_self = records[f"profiler_parent_{i}"]
+        child_total, _ = records[f"profiler_child_{i}"]
+
+        # Self time parent = total dikurangi HANYA child miliknya sendiri
+        assert child_total >= 0.02
+        assert 0 <= parent_self < 0.02
+        assert parent_total == pytest.approx(parent_self + child_total, abs=1e-3)
@@ -0,0 +1,73 @@
+"""
+Tab Classification: klasifikasi tidak menyimpan struk; hanya tombol
+"Simpan Struk" yang menulis ke store lokal.
+"""
+
+import pytest
+
+from core.receipt_store import ReceiptStore
+
+
+class _FakeText:
+    def __init__(self, text=""):
+        self.content = text
+
+    def get(self, *args):
+        return self.content
+
+    def delete(self, *args):
+        self.content = ""
+
+    def insert(self, index, text):
+        self.content = text + self.content if index == "0.0" else self.content + text
+
+
+class _FakeButton:
+    def __init__(self):
+        self.state = "disabled"
+
+    def configure(self, state):
+        self.state = state
+
+
+class _FakeTab:
+    def __init__(self, text):
+        self.input_box = _FakeText(text)
+        self.result_box = _FakeText()
+        self.save_btn = _FakeButton()
+        self._unsaved = None
+
+
+@pytest.fixture
+def tab_classify(monkeypatch):
+    tab_classify = pytest.importorskip("screen.tabs.tab_classify")
+    store = ReceiptStore(":memory:")
+    monkeypatch.setattr(tab_classify, "get_receipt_store", lambda: store)
+    tab_classify.store = store
+    yield tab_classify
+    store.close()
+
+
+def test_classify_does_not_save(tab_classify):
+    tab = _FakeTab("nasi goreng 25.000")
+    tab_classify.TabClassify.run_classification(tab)
+    tab_classify.TabClassify.run_classification(tab)
+
+    assert "MAKANAN" in tab.result_box.content
+    assert "Belum disimpan" in tab.result_box.content
+    assert tab.save_btn.state == "normal"
+    assert tab_classify.store.total_spent()["count"] == 0
+
+
+def test_save_button_saves_once(tab_classify):
+    tab = _FakeTab("nasi goreng\nTOTAL 25.000")
+    tab_classify.TabClassify.run_classification(tab)
+    tab.input_box.content = "teks yang diedit setelah klasifikasi"
+
+    tab_classify.TabClassify.save_receipt(tab)
+    tab_classify.TabClassify.save_receipt(tab)
+
+    assert tab_classify.store.total_spent()["count"] == 1
+    assert "Tersimpan sebagai struk #1" in tab.result_box.content
+    assert tab.save_btn.state == "disabled"
+    assert tab_classify.store.get(1)["text"] == "nasi goreng\nTOTAL 25.000"
@@ -0,0 +1,83 @@
+"""
+Ekuivalensi fast path clean_text() / clean_batch() dengan
+clean_text_reference() (versi 2x re.sub + split).
+"""
+
+import random
+
+import pytest
+
+from core.text_cleaner import check_clean_equivalence, clean_batch, clean_text, clean_text_reference
+
+
+CASES = [
+    "",
+    " ",
+    "\n\t  \r\n",
+    "NASI GORENG 2x 25.000",
+    "Kopi Susu @15,000 -- TOTAL: Rp 30.000",
+    "TOKO MAJU JAYA\nNO 1234\n\nMIE AYAM 1x 12000\nTERIMA KASIH",
+    "a\x1cb\x1dc\x1ed\x1ff",
+    "tab\tand\x0bvertical\x0cfeed",
+    "!!!???...,,,",
+    "ÉCLAIR café crème",
+    "İSTANBUL İ",
+    "Ｋopi ＫＡＰＡＬ",
+    "\u212a Kelvin sign",
+    "straße STRASSE",
+    "non\u00a0breaking\u2028line\u2029para",
+    "٣ angka arab ²³ superscript",
+    "emoji 🍜 mie 🍗 ayam",
+    "ǅ ǆ Ǆ digraph",
+    "x" * 5000,
+]
+
+# Alfabet fuzz: ASCII cetak & kontrol + karakter Unicode yang lowercase-nya
+# berubah panjang / menjadi ASCII / bukan huruf latin
+FUZZ_ALPHABET = (
+    [chr(code) for code in range(128)]
+    + list("İıＫｋ\u212aßẞÉéñÑ\u00a0\u2028\u2029\u3000٣²ǅǆǄΣσςЖж🍜\u0307\u200b")
+)
+
+
+def _fuzz_texts(count: int, seed: int = 1234):
+    rng = random.Random(seed)
+    for _ in range(count):
+        length = rng.randint(0, 60)
+        yield "".join(rng.choice(FUZZ_ALPHABET) for _ in range(length))
+
+
+def _ascii_fuzz_texts(count: int, seed: int = 99):
+    rng = random.Random(seed)
+    for _ in range(count):
+        length = rng.randint(0, 80)
+        yield "".join(chr(rng.randrange(128)) for _ in range(length))
+
+
+@pytest.mark.parametrize("raw_text", CASES)
+def test_clean_text_matches_reference(raw_text):
+    assert clean_text(raw_text) == clean_text_reference(raw_text)
+
+
+def test_clean_batch_matches_reference():
+    assert list(clean_batch(CASES)) == [clean_text_reference(text) for text in CASES]
+
+
+def test_clean_batch_accepts_generator_and_empty_input():
+    assert list(clean_batch(iter([]))) == []
+    assert list(clean_batch(text for text in ["A-B", ""])) == [["a", "b"], []]
+
+
+@pytest.mark.parametrize("texts", [
+    pytest.param(list(_ascii_fuzz_texts(2000)), id="ascii"),
+    pytest.param(list(_fuzz_texts(2000)), id="unicode"),
+])
+def test_fuzz_equivalence(texts):
+    assert check_clean_equivalence(texts) == []
+    assert list(clean_batch(texts)) == [clean_text_reference(text) for text in texts]
+
+
+def test_tokens_are_lowercase_ascii_alphanumeric():
+    for text in _fuzz_texts(500, seed=7):
+        for token in clean_text(text):
+            assert token and token.isascii() and token.isalnum() and token == token.lower()